@@ -0,0 +1,100 @@
+"""Times real ybload runs of exported files with the fixed settings and with the ones of the LoadTuner.
+
+Loads the files of one exported table into a scratch table of the target with up to --workers loads at once,
+once per mode, and truncates the table before every run. It needs the YB* environment variables of the import
+and ybload on the PATH:
+    python benchmarks/load_tuning.py --table Elysium.T0_bench --input-dir out/Elysium.T0 [--workers 4] [--batch-mb 0]
+
+Fixed runs every load with YB_NUM_READERS and YB_NUM_CORES, tuned lets the LoadTuner choose them.
+The scratch table is truncated, never point it at a table that holds data.
+"""
+import argparse
+import concurrent.futures
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from elysium_migration.configuration.constants import ConstantCatalog
+from elysium_migration.migration.compression import Codec
+from elysium_migration.migration.execute import Execution
+from elysium_migration.migration.importer import Importer
+from elysium_migration.migration.loadtuning import LoadTuner
+
+MB = 1024 ** 2
+
+
+def run(table, batches, sizes, workers, field_delimiter, tuner=None):
+    """Loads every batch into the table and returns the seconds it took
+
+    Arguments:
+        table (str): The scratch table in 'schema.table' format
+        batches (list[list[str]]): The files of every load
+        sizes (dict[str:int]): The bytes of every file
+        workers (int): The max amount of loads at once
+        field_delimiter (str): The field delimiter of the files
+        tuner (LoadTuner): The tuner of the loads, None for the fixed settings
+    Raises:
+        CalledProcessError: If a ybload fails
+    Returns:
+        elapsed (float): The seconds until the last load finished
+    """
+    Execution.ybsql(f"TRUNCATE TABLE {table}")
+
+    def load(files):
+        if tuner is None:
+            return Execution.ybload(table, " ".join(files), field_delimiter=field_delimiter)
+        with tuner.load(len(files), sum(sizes[fi] for fi in files), table) as (num_readers, num_cores):
+            return Execution.ybload(
+                table,
+                " ".join(files),
+                field_delimiter=field_delimiter,
+                num_readers=num_readers,
+                num_cores=num_cores,
+            )
+
+    before_load = time.monotonic()
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        for fut in [executor.submit(load, files) for files in batches]:
+            fut.result()
+    return time.monotonic() - before_load
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--table", required=True, help="The scratch table to load, it is truncated")
+    parser.add_argument("--input-dir", required=True, help="The export directory of one table")
+    parser.add_argument("--workers", type=int, default=4, help="Loads at once, e.g. --import-workers")
+    parser.add_argument("--batch-mb", type=int, default=ConstantCatalog.IMPORT_BATCH_TARGET_MB)
+    parser.add_argument("--field-delimiter", default=r"\t")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per mode, the fastest counts")
+    args = parser.parse_args()
+
+    files = Codec.data_files(args.input_dir)
+    sizes = {fi: os.path.getsize(fi) for fi in files}
+    batches = Importer.file_batches(
+        files, ConstantCatalog.IMPORT_FILES_BATCH_SIZE, sizes=sizes, target_bytes=args.batch_mb * MB
+    )
+    total_mb = sum(sizes.values()) / MB
+    print(f"{len(files)} files, {total_mb:.0f} MB in {len(batches)} loads, {args.workers} at once")
+
+    results = {}
+    for mode in ("fixed", "tuned"):
+        results[mode] = min(
+            run(
+                args.table,
+                batches,
+                sizes,
+                args.workers,
+                args.field_delimiter,
+                LoadTuner(slots=args.workers) if mode == "tuned" else None,
+            )
+            for _ in range(args.repeat)
+        )
+        print(f"{mode}: {results[mode]:8.1f}s  {total_mb / results[mode]:7.1f} MB/s")
+    print(f"tuned / fixed throughput: {results['fixed'] / results['tuned']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,14 @@ class Logger:
     handler = None
     log_path = None
     
-    def __init__(self, log_level="DEBUG", log_path="app.log"):
-        self.log = logging.getLogger(__name__)
+    def __init__(self, log_name=__name__, log_level="DEBUG", log_path=None):
+        self.log = logging.getLogger(log_name)
         self.log.setLevel(os.environ.get("LOGLEVEL", log_level))
-        
-        if not self.__class__.get_handler():
+
+        # the first logger with a path sets the log file of the application, e.g. the '--log-path' option
+        if log_path is None or self.__class__.get_handler():
+            return
+        self.__class__.set_log_path(log_path)
         handler = logging.handlers.WatchedFileHandler(log_path, mode="w")
         self.__class__.set_handler(handler)
         logging.basicConfig(
@@ -50,3 +53,4 @@ class Logger:
         )
 
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
+logger = Logger()
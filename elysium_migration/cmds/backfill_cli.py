@@ -0,0 +1,114 @@
+from pathlib import Path
+
+import click
+from dotenv import load_dotenv
+
+from elysium_migration.migration.coordinator import BackfillCoordinator
+from elysium_migration.cmds.config import (
+    envs_check,
+    verify_dates,
+    validation_dir_option,
+    validate_option,
+    inject_envs_file_option,
+    script_dir_option,
+    env_dir_option,
+    config_path_option,
+    output_path_option,
+    window_days_option,
+    days_in_flight_option,
+    extractor_option,
+    compression_option,
+    compression_level_option,
+    resume_option,
+    metadata_cache_option,
+    cache_dir_option,
+    log_level_option,
+    log_path_option,
+    write_cli_log_messages,
+)
+
+
+@click.group()
+def backfill():
+    pass
+
+
+@backfill.command("backfill")
+@click.option(
+    "--from-date",
+    "-fd",
+    type=click.STRING,
+    required=True,
+    help="This option of type date is the min date of the first window.",
+)
+@click.option(
+    "--to-date",
+    "-td",
+    type=click.STRING,
+    required=True,
+    help="This option of type date is the max date of the last window. Records of this date are not migrated.",
+)
+@validation_dir_option
+@validate_option
+@inject_envs_file_option
+@script_dir_option
+@env_dir_option
+@config_path_option
+@output_path_option
+@window_days_option
+@days_in_flight_option
+@extractor_option
+@compression_option
+@compression_level_option
+@resume_option
+@metadata_cache_option
+@cache_dir_option
+@log_level_option
+@log_path_option
+def backfill_cli(
+    config_path,
+    output_path,
+    inject_envs_from_env_file,
+    validate,
+    val_dir,
+    script_dir,
+    from_date,
+    to_date,
+    env_dir,
+    window_days,
+    days_in_flight,
+    extractor,
+    compression,
+    compression_level,
+    resume,
+    metadata_cache,
+    cache_dir,
+    log_level,
+    log_path
+):
+    if inject_envs_from_env_file:
+        load_dotenv(env_dir)
+
+    verify_dates(from_date, to_date)
+    write_cli_log_messages()
+    envs_check(inject_envs_from_env_file=inject_envs_from_env_file, env_dir=env_dir)
+
+    BackfillCoordinator.backfill(
+        config_file_path=Path(config_path),
+        output_path=Path(output_path),
+        inject_envs=inject_envs_from_env_file,
+        validate=validate,
+        val_dir=Path(val_dir),
+        script_dir=script_dir,
+        from_date=from_date,
+        to_date=to_date,
+        env_dir=env_dir,
+        window_days=window_days,
+        days_in_flight=days_in_flight,
+        extractor=extractor,
+        compression=compression,
+        compression_level=compression_level,
+        resume=resume,
+        metadata_cache=metadata_cache,
+        cache_dir=Path(cache_dir) if cache_dir else None,
+    )
@@ -19,6 +19,7 @@ from elysium_migration.migration.coordinator import (
 from elysium_migration.cmds.housekeeper_cli import housekeep
 from elysium_migration.cmds.export_cli import export
 from elysium_migration.cmds.import_cli import apply
+from elysium_migration.cmds.backfill_cli import backfill
 
 
 @click.group()
@@ -26,7 +27,7 @@ def cli():
     pass
 
 
-cli = click.CommandCollection(sources=[housekeep, export, apply])
+cli = click.CommandCollection(sources=[housekeep, export, apply, backfill])
 
 if __name__ == "__main__":
     cli()
@@ -5,6 +5,7 @@ import os
 import click
 
 from elysium_migration import Logger
+from elysium_migration.configuration.constants import ConstantCatalog
 from elysium_migration.migration.utility import MigrationUtility
 
 log_messages = []
@@ -47,6 +48,13 @@ def conflicting_sample_check(from_date, to_date, sample_size):
         )
 
 
+def conflicting_incremental_check(from_date, to_date, sample_size, incremental):
+    if incremental and any([from_date, to_date, sample_size]):
+        raise click.ClickException(
+            "\n\tPredicate conflict: --incremental exports the rows above the watermarks, it can not be provided with '--from-date', '--to-date' or '--sample-size'.\n"
+        )
+
+
 def envs_check(inject_envs_from_env_file, env_dir):
     inputs = [inject_envs_from_env_file, env_dir]
 
@@ -209,6 +217,26 @@ def validation_dir_option(f):
     )(f)
 
 
+def pipeline_validation_dir_option(f):
+    def pipeline_validation_dir_callback(ctx, param, value):
+        if value:
+            log_messages.append(
+                f"-------------- Pipeline validation directory set to '{value}'. --------------"
+            )
+        return value
+
+    return click.option(
+        "--val-dir",
+        "-vd",
+        callback=pipeline_validation_dir_callback,
+        type=click.Path(),
+        required=False,
+        help="""
+            This option is the path where the ybload logs and the validation results of --pipeline or --stream will go. The default is 
+            the '_pipeline' dir in the parent of the output path, so they survive the data being cleared between runs.""",
+    )(f)
+
+
 def sample_size_option(f):
     def sample_size_callback(ctx, param, value):
         if value > 0:
@@ -227,6 +255,279 @@ def sample_size_option(f):
     )(f)
 
 
+def pipeline_option(f):
+    def pipeline_callback(ctx, param, value):
+        if value is True:
+            log_messages.append(
+                f"-------------- Pipeline is set to 'True'. Files are loaded while exporting. --------------"
+            )
+        return value
+
+    return click.option(
+        "--pipeline/--no-pipeline",
+        "-p/-np",
+        is_flag=True,
+        callback=pipeline_callback,
+        default=False,
+        help="""
+            This option when set will load every exported file into the target while the export is still running.
+            There is no need to run an import after an export with '-p'.""",
+    )(f)
+
+
+def stream_option(f):
+    def stream_callback(ctx, param, value):
+        if value is True:
+            log_messages.append(
+                f"-------------- Stream is set to 'True'. Chunks are loaded through named pipes, no files are staged. --------------"
+            )
+        return value
+
+    return click.option(
+        "--stream",
+        "-st",
+        is_flag=True,
+        callback=stream_callback,
+        default=False,
+        help="""
+            This option when set will write every chunk into a named pipe that a ybload reads at the same time, 
+            instead of a file. Nothing is staged on disk and nothing can be replayed, a failed chunk is exported again.
+            Implies '-p'. Without it, only the 'streamed_tables' of the config file are streamed when pipelining.""",
+    )(f)
+
+
+def extractor_option(f):
+    def extractor_callback(ctx, param, value):
+        log_messages.append(
+            f"-------------- Extractor is set to '{value}' --------------"
+        )
+        return value
+
+    return click.option(
+        "--extractor",
+        "-ex",
+        callback=extractor_callback,
+        type=click.Choice(["vsql", "odbc"]),
+        default=ConstantCatalog.EXPORT_EXTRACTOR,
+        help="""
+            This option is the backend that executes the export queries. 'vsql' starts one vsql process per query, 
+            'odbc' streams the results over reused ODBC connections.""",
+    )(f)
+
+
+def compression_option(f):
+    def compression_callback(ctx, param, value):
+        log_messages.append(
+            f"-------------- Compression is set to '{value}' --------------"
+        )
+        return value
+
+    return click.option(
+        "--compression",
+        "-cmp",
+        callback=compression_callback,
+        type=click.Choice(["gzip", "zstd", "lz4", "none"]),
+        default=ConstantCatalog.EXPORT_COMPRESSION_CODEC
+        if ConstantCatalog.EXPORT_COMPRESSED
+        else "none",
+        help="""
+            This option is the codec every exported file is compressed with, on every export path. 
+            ybload must be able to read the codec.""",
+    )(f)
+
+
+def compression_level_option(f):
+    def compression_level_callback(ctx, param, value):
+        if value > 0:
+            log_messages.append(
+                f"-------------- Compression level set to '{value}' --------------"
+            )
+        return value
+
+    return click.option(
+        "--compression-level",
+        "-cl",
+        callback=compression_level_callback,
+        type=click.INT,
+        default=ConstantCatalog.EXPORT_COMPRESSION_LEVEL,
+        help="This option is the compression level of the codec. 0 means the default level of the codec.",
+    )(f)
+
+
+def resume_option(f):
+    def resume_callback(ctx, param, value):
+        if value is True:
+            log_messages.append(
+                f"-------------- Resume is set to 'True' --------------"
+            )
+        return value
+
+    return click.option(
+        "--resume",
+        "-r",
+        is_flag=True,
+        callback=resume_callback,
+        default=False,
+        help="""
+            This option when set will resume the export in the output path, if its manifest is from a run with the same 
+            dates and tables. Only the chunks that are missing or failed are exported. Otherwise everything is exported.""",
+    )(f)
+
+
+def metadata_cache_option(f):
+    def metadata_cache_callback(ctx, param, value):
+        if value is False:
+            log_messages.append(
+                f"-------------- Metadata cache is turned off --------------"
+            )
+        return value
+
+    return click.option(
+        "--metadata-cache/--no-metadata-cache",
+        "-mc/-nmc",
+        is_flag=True,
+        callback=metadata_cache_callback,
+        default=ConstantCatalog.METADATA_CACHE_FLAG,
+        help="""
+            This option when set will read table sizes, chunk sizes and column lists from an on-disk cache 
+            instead of querying them again on every run.""",
+    )(f)
+
+
+def cache_dir_option(f):
+    def cache_dir_callback(ctx, param, value):
+        if value:
+            log_messages.append(
+                f"-------------- Metadata cache directory is '{value}' --------------"
+            )
+        return value
+
+    return click.option(
+        "--cache-dir",
+        "-cd",
+        callback=cache_dir_callback,
+        type=click.Path(),
+        required=False,
+        help="""
+            This option is the path of the dir where the metadata cache and the watermarks are stored. The default is the parent of the 
+            output path, so they survive the data being cleared between runs.""",
+    )(f)
+
+
+def invalidate_cache_option(f):
+    def invalidate_cache_callback(ctx, param, value):
+        if value is True:
+            log_messages.append(
+                f"-------------- Invalidating the metadata cache --------------"
+            )
+        return value
+
+    return click.option(
+        "--invalidate-cache",
+        "-ic",
+        is_flag=True,
+        callback=invalidate_cache_callback,
+        default=False,
+        help="This option when set will clear the metadata cache before the export, so every value is queried again.",
+    )(f)
+
+
+def incremental_option(f):
+    def incremental_callback(ctx, param, value):
+        if value is True:
+            log_messages.append(
+                f"-------------- Incremental export is set to 'True' --------------"
+            )
+        return value
+
+    return click.option(
+        "--incremental",
+        "-inc",
+        is_flag=True,
+        callback=incremental_callback,
+        default=False,
+        help="""
+            This option when set will only export the rows above the high-water mark of every table, instead of a date range. 
+            The marks are stored in the cache dir and move once the import of the rows succeeded.""",
+    )(f)
+
+
+def disk_budget_option(f):
+    def disk_budget_callback(ctx, param, value):
+        if value:
+            log_messages.append(
+                f"-------------- Disk budget is set to {value} MB --------------"
+            )
+        return value
+
+    return click.option(
+        "--disk-budget-mb",
+        "-dbm",
+        callback=disk_budget_callback,
+        type=click.IntRange(min=0),
+        default=ConstantCatalog.EXPORT_DISK_BUDGET_MB,
+        help="""
+            This option is the max amount of MB of exported files staged in the output path. With '-p' every loaded
+            file is deleted and new chunks wait while the budget is used up. The free space of the output path is
+            checked before planning. 0 means no budget.""",
+    )(f)
+
+
+def import_workers_option(f):
+    def import_workers_callback(ctx, param, value):
+        log_messages.append(
+            f"-------------- Concurrent table loads is set to {value} --------------"
+        )
+        return value
+
+    return click.option(
+        "--import-workers",
+        "-iw",
+        callback=import_workers_callback,
+        type=click.IntRange(min=1),
+        default=ConstantCatalog.IMPORT_MAX_WORKERS,
+        help="""
+            This option is the max amount of tables loaded at once, each with its own ybload. A failed table 
+            doesn't stop the others, every table is reported when it finishes. 1 loads the tables one after the other.""",
+    )(f)
+
+
+def window_days_option(f):
+    def window_days_callback(ctx, param, value):
+        log_messages.append(
+            f"-------------- Backfill windows are {value} days --------------"
+        )
+        return value
+
+    return click.option(
+        "--window-days",
+        "-wd",
+        callback=window_days_callback,
+        type=click.IntRange(min=1),
+        default=ConstantCatalog.BACKFILL_WINDOW_DAYS,
+        help="This option is the amount of days exported and imported at once by the backfill.",
+    )(f)
+
+
+def days_in_flight_option(f):
+    def days_in_flight_callback(ctx, param, value):
+        log_messages.append(
+            f"-------------- Backfill windows in flight is set to {value} --------------"
+        )
+        return value
+
+    return click.option(
+        "--days-in-flight",
+        "-dif",
+        callback=days_in_flight_callback,
+        type=click.IntRange(min=1),
+        default=ConstantCatalog.BACKFILL_DAYS_IN_FLIGHT,
+        help="""
+            This option is the max amount of windows that are exported but not yet imported. The export of a window 
+            overlaps the imports of the previous ones. 1 migrates one window at a time.""",
+    )(f)
+
+
 def log_level_option(f):
     def log_level_callback(ctx, param, value):
         os.environ["LOGLEVEL"] = value
@@ -2,11 +2,12 @@ import typing as t
 from pathlib import Path
 
 import click
-from dotenv import loadenv
+from dotenv import load_dotenv
 
 from elysium_migration.migration.coordinator import ExportCoordinator
 from elysium_migration.cmds.config import (
     conflicting_sample_check,
+    conflicting_incremental_check,
     envs_check,
     verify_dates,
     validate_option,
@@ -16,6 +17,18 @@ from elysium_migration.cmds.config import (
     config_path_option,
     output_path_option,
     sample_size_option,
+    pipeline_option,
+    stream_option,
+    pipeline_validation_dir_option,
+    extractor_option,
+    compression_option,
+    compression_level_option,
+    resume_option,
+    metadata_cache_option,
+    cache_dir_option,
+    invalidate_cache_option,
+    incremental_option,
+    disk_budget_option,
     log_level_option,
     log_path_option,
     write_cli_log_messages,
@@ -49,6 +62,18 @@ def export():
 @config_path_option
 @output_path_option
 @sample_size_option
+@pipeline_option
+@stream_option
+@pipeline_validation_dir_option
+@extractor_option
+@compression_option
+@compression_level_option
+@resume_option
+@metadata_cache_option
+@cache_dir_option
+@invalidate_cache_option
+@incremental_option
+@disk_budget_option
 @log_level_option
 @log_path_option
 def export_cli(
@@ -61,6 +86,18 @@ def export_cli(
     from_date,
     to_date,
     env_dir,
+    pipeline,
+    stream,
+    val_dir,
+    extractor,
+    compression,
+    compression_level,
+    resume,
+    metadata_cache,
+    cache_dir,
+    invalidate_cache,
+    incremental,
+    disk_budget_mb,
     log_level,
     log_path
 ):
@@ -70,6 +107,7 @@ def export_cli(
     verify_dates(from_date, to_date)
     write_cli_log_messages()
     conflicting_sample_check(from_date, to_date, sample_size)
+    conflicting_incremental_check(from_date, to_date, sample_size, incremental)
     envs_check(inject_envs_from_env_file=inject_envs_from_env_file, env_dir=env_dir)
 
     ExportCoordinator.export(
@@ -82,4 +120,16 @@ def export_cli(
         from_date=from_date,
         to_date=to_date,
         env_dir=env_dir,
+        pipeline=pipeline,
+        stream=stream,
+        val_dir=Path(val_dir) if val_dir else None,
+        extractor=extractor,
+        compression=compression,
+        compression_level=compression_level,
+        resume=resume,
+        metadata_cache=metadata_cache,
+        cache_dir=Path(cache_dir) if cache_dir else None,
+        invalidate_cache=invalidate_cache,
+        incremental=incremental,
+        disk_budget_mb=disk_budget_mb,
     )
@@ -13,6 +13,8 @@ from elysium_migration.cmds.config import (
     env_dir_option,
     config_path_option,
     output_path_option,
+    cache_dir_option,
+    import_workers_option,
     log_level_option,
     log_path_option,
     write_cli_log_messages,
@@ -32,6 +34,8 @@ def apply():
 @env_dir_option
 @config_path_option
 @output_path_option
+@cache_dir_option
+@import_workers_option
 @log_level_option
 @log_path_option
 def import_cli(
@@ -42,6 +46,8 @@ def import_cli(
     val_dir,
     inject_envs_from_env_file,
     validate,
+    cache_dir,
+    import_workers,
     log_level,
     log_path
 ):
@@ -56,4 +62,6 @@ def import_cli(
         val_dir=Path(val_dir),
         script_dir=script_dir,
         env_dir=env_dir,
+        cache_dir=Path(cache_dir) if cache_dir else None,
+        import_workers=import_workers,
     )
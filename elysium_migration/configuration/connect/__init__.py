@@ -1,10 +1,3 @@
-import os
-from getpass import getpass
-
-import snowflake.connector
-from enum import Enum
-
-
 class Connection:
     """
     This class is an interface for handling connections to data sources that involve long lived connections 
@@ -24,8 +17,8 @@ class Connection:
         return self._ctx
 
     @ctx.setter
-    def ctx(self):
-        self._ctx = None
+    def ctx(self, value):
+        self._ctx = value
 
     def __enter__(self):
         return self.ctx
@@ -0,0 +1,311 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from elysium_migration import Logger
+from elysium_migration.configuration import Platform
+from elysium_migration.configuration.constants import ConstantCatalog
+
+
+class ConnectionPoolExhaustedError(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Pool of reusable DB-API connections, so queries don't pay a new login and handshake each time.
+
+    Connections idle for longer than the idle timeout are closed. Connections idle for longer than the
+    health check interval are checked with a cheap query before they are handed out again.
+
+    Args:
+        connect (callable): Returns a new DB-API connection.
+        max_size (int): The max amount of open connections.
+        idle_timeout_s (int): Idle connections older than this are closed.
+        health_check_interval_s (int): Idle connections older than this are checked before being reused.
+        health_check_query (str): The query of the health check.
+        acquire_timeout_s (int): How long to wait for a free connection when the pool is full.
+
+    Attributes:
+        connect (callable): This is where we store the connect function.
+        max_size (int): This is where we store the max_size.
+        idle_timeout_s (int): This is where we store the idle_timeout_s.
+        health_check_interval_s (int): This is where we store the health_check_interval_s.
+        health_check_query (str): This is where we store the health_check_query.
+        acquire_timeout_s (int): This is where we store the acquire_timeout_s.
+    """
+
+    logger = None
+
+    @classmethod
+    def get_logger(cls):
+        if cls.logger is None:
+            cls.logger = Logger(log_name=__name__)
+        return cls.logger
+
+    __pools = {}
+    __pools_lock = threading.Lock()
+
+    def __init__(
+        self,
+        connect,
+        max_size=ConstantCatalog.POOL_MAX_SIZE,
+        idle_timeout_s=ConstantCatalog.POOL_IDLE_TIMEOUT_S,
+        health_check_interval_s=ConstantCatalog.POOL_HEALTH_CHECK_INTERVAL_S,
+        health_check_query="SELECT 1",
+        acquire_timeout_s=ConstantCatalog.POOL_ACQUIRE_TIMEOUT_S,
+    ):
+        self.connect = connect
+        self.max_size = max_size
+        self.idle_timeout_s = idle_timeout_s
+        self.health_check_interval_s = health_check_interval_s
+        self.health_check_query = health_check_query
+        self.acquire_timeout_s = acquire_timeout_s
+        self._idle = []
+        self._size = 0
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def for_platform(platform):
+        """Returns the shared pool of the platform, it is created on first use.
+
+        Arguments:
+            platform (Enum.Platform): The database system
+
+        Raises:
+            ValueError: If there is no pool for the platform
+        Returns:
+            pool (ConnectionPool): The pool of the platform
+        """
+        with ConnectionPool.__pools_lock:
+            if platform not in ConnectionPool.__pools:
+                ConnectionPool.__pools[platform] = ConnectionPool(
+                    connect=ConnectionPool.platform_connect(platform)
+                )
+            return ConnectionPool.__pools[platform]
+
+    @staticmethod
+    def close_all():
+        """Closes the shared pools of every platform.
+
+        Arguments:
+            None
+        Raises:
+            None
+        Returns:
+            None
+        """
+        with ConnectionPool.__pools_lock:
+            for pool in ConnectionPool.__pools.values():
+                pool.close()
+            ConnectionPool.__pools = {}
+
+    @staticmethod
+    def platform_connect(platform):
+        """Returns the function that opens a new connection to the platform.
+
+        Arguments:
+            platform (Enum.Platform): The database system
+
+        Raises:
+            ValueError: If there is no connection for the platform
+        Returns:
+            connect (callable): Returns a new DB-API connection
+        """
+        # imported on connect so the drivers are only needed for the platforms actually used
+        def connect_vertica():
+            from elysium_migration.configuration.connect.vertica import (
+                VerticaConnection,
+            )
+
+            return VerticaConnection().ctx
+
+        def connect_yellowbrick():
+            from elysium_migration.configuration.connect.yellowbrick import (
+                YellowBrickConnection,
+            )
+
+            return YellowBrickConnection().ctx
+
+        if platform == Platform.VERTICA:
+            return connect_vertica
+        elif platform == Platform.YELLOWBRICK:
+            return connect_yellowbrick
+        raise ValueError(f"There is no connection pool for platform '{platform}'.")
+
+    def acquire(self):
+        """Hands out an idle connection or opens a new one. Waits when the pool is full.
+
+        Arguments:
+            None
+        Raises:
+            ConnectionPoolExhaustedError: If no connection is free before the acquire timeout
+        Returns:
+            conn: A DB-API connection
+        """
+        deadline = time.monotonic() + self.acquire_timeout_s
+        while True:
+            with self._cond:
+                self._evict_idle()
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                    conn = last_used = None
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise ConnectionPoolExhaustedError(
+                            f"No connection was free within {self.acquire_timeout_s} seconds. Pool size: {self.max_size}."
+                        )
+                    self._cond.wait(remaining)
+                    continue
+
+            if conn is None:
+                try:
+                    return self.connect()
+                except Exception:
+                    self._forget()
+                    raise
+
+            if time.monotonic() - last_used < self.health_check_interval_s:
+                return conn
+            if self._healthy(conn):
+                return conn
+            ConnectionPool.get_logger().log.debug(
+                "Discarding pooled connection that failed its health check."
+            )
+            self._close(conn)
+            self._forget()
+
+    def release(self, conn, broken=False):
+        """Gives a connection back to the pool. Broken connections are closed instead.
+
+        Arguments:
+            conn: The DB-API connection from `acquire`
+            broken (bool): Whether the connection had an error and should not be reused
+        Raises:
+            None
+        Returns:
+            None
+        """
+        if broken:
+            self._close(conn)
+            self._forget()
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager around `acquire` and `release`. The connection is discarded on errors.
+
+        Arguments:
+            None
+        Raises:
+            None
+        Returns:
+            conn: A DB-API connection
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+        except Exception:
+            self.release(conn, broken=True)
+            raise
+        self.release(conn)
+
+    def query(self, sql):
+        """Executes a query on a pooled connection and returns all the rows.
+
+        Arguments:
+            sql (str): The query
+        Raises:
+            Error: Any DB-API error of the query
+        Returns:
+            rows (list[tuple]): The rows of the result
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql)
+                return [tuple(row) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+
+    def execute(self, sql):
+        """Executes a statement on a pooled connection and commits it.
+
+        Arguments:
+            sql (str): The statement
+        Raises:
+            Error: Any DB-API error of the statement
+        Returns:
+            None
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql)
+                conn.commit()
+            finally:
+                cursor.close()
+
+    def close(self):
+        """Closes every idle connection. Connections that are handed out are closed when released broken.
+
+        Arguments:
+            None
+        Raises:
+            None
+        Returns:
+            None
+        """
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close(conn)
+
+    def _evict_idle(self):
+        # called while holding the lock
+        now = time.monotonic()
+        expired = [c for c, last_used in self._idle if now - last_used > self.idle_timeout_s]
+        if expired:
+            self._idle = [
+                (c, last_used)
+                for c, last_used in self._idle
+                if now - last_used <= self.idle_timeout_s
+            ]
+            self._size -= len(expired)
+            self._cond.notify_all()
+            ConnectionPool.get_logger().log.debug(
+                f"Closing {len(expired)} pooled connections idle for more than {self.idle_timeout_s} seconds."
+            )
+            for conn in expired:
+                self._close(conn)
+
+    def _healthy(self, conn):
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(self.health_check_query)
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _forget(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception as e:
+            ConnectionPool.get_logger().log.debug(f"Error when closing connection: {e}")
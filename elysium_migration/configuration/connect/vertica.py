@@ -4,6 +4,7 @@ from getpass import getpass
 import pyodbc
 
 from elysium_migration.configuration.connect import Connection
+from elysium_migration.configuration.constants import ConstantCatalog
 from elysium_migration.migration.config import DataSourceType
 
 
@@ -20,7 +21,9 @@ class VerticaConnection(Connection):
         """
             return the connection obect
         """
-        vertica_pwd = getpass("Enter your password: ")
+        vertica_pwd = os.environ.get(ConstantCatalog.VSQL_PASSWORD) or getpass(
+            ConstantCatalog.VSQL_PWORD_PROMPT
+        )
 
         vertica_conn = pyodbc.connect(
             DRIVER="Vertica",
@@ -1,11 +1,13 @@
 import os
 from getpass import getpass
 
+import pyodbc
+
 from elysium_migration.configuration.connect import Connection
+from elysium_migration.configuration.constants import ConstantCatalog
 from elysium_migration.migration.config import DataSourceType
 
 
-# TODO: use configs as parameter to constructor
 class YellowBrickConnection(Connection):
     """
     Connection object for YellowBrick
@@ -13,19 +15,23 @@ class YellowBrickConnection(Connection):
 
     def __init__(self):
         super(YellowBrickConnection, self).__init__(DataSourceType.YELLOWBRICK)
-
-    @property
-    def ctx(self):
-        return self._ctx
-
-    @ctx.setter
-    def ctx(self):
-        self._ctx = _connect(self)
+        self.ctx = self._connect()
 
     def _connect(self):
         """
             return the connection obect
         """
-        yellowbrick_pwd = getpass("Enter your password: ")
-
-        os.environ[YBLOAD_PASSWORD] = yellowbrick_pwd
+        yellowbrick_pwd = os.environ.get(ConstantCatalog.YB_PASSWORD) or getpass(
+            ConstantCatalog.YB_PWORD_PROMPT
+        )
+
+        yellowbrick_conn = pyodbc.connect(
+            DRIVER=ConstantCatalog.YB_ODBC_DRIVER,
+            SERVER=os.environ[ConstantCatalog.YB_HOST],
+            DATABASE=os.environ[ConstantCatalog.YB_DATABASE],
+            PORT=ConstantCatalog.YB_PORT,
+            UID=os.environ[ConstantCatalog.YB_USER],
+            PWD=yellowbrick_pwd,
+        )
+
+        return yellowbrick_conn
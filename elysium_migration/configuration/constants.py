@@ -17,20 +17,77 @@ class ConstantCatalog:
     YB_USER = "YBUSER"
     YB_NUM_READERS = 12
     YB_NUM_CORES = 32
+    YB_LOAD_AUTO_TUNE = False
+    YB_LOAD_MB_PER_READER = 1024
+    YB_LOAD_MB_PER_CORE = 512
+    YB_PORT = 5432
+    YB_ODBC_DRIVER = "PostgreSQL Unicode"
+
+    METADATA_USE_POOL = True
+    POOL_MAX_SIZE = 4
+    POOL_IDLE_TIMEOUT_S = 300
+    POOL_HEALTH_CHECK_INTERVAL_S = 30
+    POOL_ACQUIRE_TIMEOUT_S = 600
+
+    METADATA_CACHE_FLAG = True
+    METADATA_CACHE_FILE = "metadata_cache.sqlite"
+    METADATA_CACHE_TTL_S = 7 * 24 * 60 * 60
+    WATERMARK_FILE = "watermarks.sqlite"
 
     DATA_FILES_EXTENSION = "csv"
-    DATA_COMPRESS_EXTENSION = "gz"
     IDEMPOTENT_EXPORT = True
 
     IMPORT_BATCH_FILES_FLAG = True
     IMPORT_FILES_BATCH_SIZE = 100
+    IMPORT_BATCH_CONCURRENCY = 1
+    IMPORT_BATCH_TARGET_MB = 0
+    IMPORT_VERIFY_CHUNKS = True
+    IMPORT_MAX_WORKERS = 1
 
     EXPORT_COMPRESSED = True
+    EXPORT_COMPRESSION_CODEC = "gzip"
+    EXPORT_COMPRESSION_LEVEL = 0
+    EXPORT_BLOCK_COMPRESSION = True
+    EXPORT_COMPRESSION_THREADS = 0
+    EXPORT_COMPRESSION_BLOCK_MB = 8
     EXPORT_AS_CHUNKS_FLAG = False
     EXPORT_CHUNK_SIZE_MB = 5000
     EXPORT_WHOLE_TABLE_THRESHOLD_MB = 10000
     EXPORT_TABLE_WITH_WINDOW_THRESHOLD_MB = 20000
     EXPORT_WEEKS_WINDOW = 150
+    EXPORT_MAX_WORKERS = 0
+    EXPORT_ADAPTIVE_CONCURRENCY = True
+    EXPORT_MIN_WORKERS = 2
+    EXPORT_AIMD_WINDOW_S = 30
+    EXPORT_AIMD_DECREASE_FACTOR = 0.75
+    EXPORT_AIMD_LATENCY_FACTOR = 3
+    EXPORT_LARGEST_FIRST = True
+    EXPORT_EXTRACTOR = "vsql"
+    EXPORT_FETCH_BATCH_SIZE = 10000
+    EXPORT_BOUNDARY_STRATEGY = "row_number"
+    EXPORT_DATE_WINDOW_BOUNDARY_STRATEGY = "row_number"
+    EXPORT_HISTOGRAM_GRANULARITY = "hour"
+    EXPORT_TEMP_EXTENSION = "part"
+    EXPORT_SAMPLE_STRATEGY = "top_k"
+    EXPORT_SAMPLE_WINDOW_HOURS = 24
+    EXPORT_SAMPLE_WINDOW_GROWTH = 4
+    EXPORT_SAMPLE_MAX_PROBES = 6
+    EXPORT_SAMPLE_WINDOW_OVERSHOOT = 4
+    EXPORT_THROTTLE_MB_PER_S = 0
+    EXPORT_THROTTLE_MAX_QUERIES = 0
+    EXPORT_THROTTLE_SCHEDULE = []
+    EXPORT_DISK_BUDGET_MB = 0
+    EXPORT_ROLL_FILE_MB = 1024
+
+    PIPELINE_NUM_LOADERS = 2
+    PIPELINE_MAX_IN_FLIGHT_CHUNKS = 8
+    PIPELINE_DIR = "_pipeline"
+
+    MANIFEST_FILE = "_manifest.json"
+
+    BACKFILL_WINDOW_DAYS = 1
+    BACKFILL_DAYS_IN_FLIGHT = 2
+    BACKFILL_STATE_FILE = "_backfill.json"
 
     @staticmethod
     def DATE_COL(table):
@@ -0,0 +1,261 @@
+import collections
+import concurrent.futures
+import json
+import os
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from elysium_migration import Logger
+from elysium_migration.configuration.constants import ConstantCatalog
+from elysium_migration.migration.exporter import Exporter
+from elysium_migration.migration.importer import Importer
+
+
+class Backfill:
+    """
+    Class for migrating a date range one window at a time in a single process. The export of a window overlaps
+    the import of the previous ones, up to a number of windows in flight. The scripts, the configuration,
+    the connection pools, the extractor and the catalog snapshot are shared by every window.
+    Every window is exported to its own directory, which is removed once it is imported. The imported windows
+    are recorded in a state file, so a failed backfill can be resumed.
+
+    Args:
+        export_objects (list[str]): The list of table names to migrate in 'schema.table' format.
+        output_dir (Path): The root directory of the exported windows.
+        script_dir (Path): The directory where the scripts will be during execution.
+        validation_results_dir (Path): The directory of the validation results of the imports.
+        extractor (Extractor): The backend that executes the export queries.
+        codec (Codec): The codec every exported file is compressed with, None to not compress.
+        window_days (int): The amount of days per window.
+        days_in_flight (int): The max amount of windows exported but not yet imported. 1 doesn't overlap anything.
+        validate (bool): Whether to validate every window. The checksum scripts are shared, so windows don't overlap then.
+
+    Attributes:
+        export_objects (list[str]): This is where we store the export_objects.
+        output_dir (Path): This is where we store the output_dir.
+        window_days (int): This is where we store the window_days.
+        days_in_flight (int): This is where we store the days_in_flight.
+        validate (bool): This is where we store the validate flag.
+        state_path (Path): The path of the state file.
+        table_stats (dict[str:TableStats]): The catalog snapshots shared by the exports of every window.
+    """
+
+    logger = None
+
+    @classmethod
+    def get_logger(cls):
+        if cls.logger is None:
+            cls.logger = Logger(log_name=__name__)
+        return cls.logger
+
+    DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    def __init__(
+        self,
+        export_objects,
+        output_dir: Path,
+        script_dir: Path,
+        validation_results_dir: Path,
+        extractor=None,
+        codec=None,
+        window_days=ConstantCatalog.BACKFILL_WINDOW_DAYS,
+        days_in_flight=ConstantCatalog.BACKFILL_DAYS_IN_FLIGHT,
+        validate=False,
+    ):
+        self.export_objects = export_objects
+        self.output_dir = Path(output_dir)
+        self.script_dir = script_dir
+        self.validation_results_dir = validation_results_dir
+        self.extractor = extractor
+        self.codec = codec
+        self.window_days = window_days
+        self.days_in_flight = max(1, days_in_flight)
+        self.validate = validate
+        if validate and self.days_in_flight > 1:
+            Backfill.get_logger().log.warning(
+                "Validation shares the checksum scripts between windows. Windows are migrated one at a time."
+            )
+            self.days_in_flight = 1
+        self.state_path = self.output_dir / ConstantCatalog.BACKFILL_STATE_FILE
+        self.table_stats = {}
+
+    @staticmethod
+    def windows(from_date, to_date, window_days=1):
+        """Splits a date range into windows
+
+        Arguments:
+            from_date (str): The min date, in '%Y-%m-%d %H:%M:%S' format
+            to_date (str): The max date, in '%Y-%m-%d %H:%M:%S' format. It isn't part of the last window.
+            window_days (int): The amount of days per window
+
+        Raises:
+            ValueError: If a date isn't in the format
+        Returns:
+            windows (list[(str, str)]): The from and to date of every window, in order
+        """
+        start = datetime.strptime(from_date, Backfill.DATE_FORMAT)
+        end = datetime.strptime(to_date, Backfill.DATE_FORMAT)
+        step = timedelta(days=window_days)
+        windows = []
+        while start < end:
+            stop = min(start + step, end)
+            windows.append(
+                (start.strftime(Backfill.DATE_FORMAT), stop.strftime(Backfill.DATE_FORMAT))
+            )
+            start = stop
+        return windows
+
+    def run(self, from_date, to_date, resume=False):
+        """Exports and imports every window of the date range. A window is exported while the previous
+            windows are still being imported, up to days_in_flight.
+
+        Arguments:
+            from_date (str): The min date, in '%Y-%m-%d %H:%M:%S' format
+            to_date (str): The max date, in '%Y-%m-%d %H:%M:%S' format
+            resume (bool): Whether to skip the windows that a previous run of the same range imported,
+                and resume the export of the others.
+
+        Raises:
+            Exception: The first error of an export or an import. The windows that are not imported are kept.
+        Returns:
+            None
+        """
+        state = {
+            "from_date": from_date,
+            "to_date": to_date,
+            "window_days": self.window_days,
+            "done": [],
+        }
+        previous = self._load_state()
+        if resume and previous is not None and all(
+            previous[k] == state[k] for k in ("from_date", "to_date", "window_days")
+        ):
+            state = previous
+        self._save_state(state)
+
+        windows = Backfill.windows(from_date, to_date, self.window_days)
+        Backfill.get_logger().log.info(
+            f"Backfilling {len(windows)} windows from {from_date} to {to_date}, {len(state['done'])} already done. Windows in flight: {self.days_in_flight}."
+        )
+
+        in_flight = collections.deque()
+        with concurrent.futures.ThreadPoolExecutor(1) as import_executor:
+            try:
+                for window in windows:
+                    if window[0] in state["done"]:
+                        Backfill.get_logger().log.info(
+                            f"Skipping the window from {window[0]} to {window[1]}, it was imported already."
+                        )
+                        continue
+
+                    while len(in_flight) >= self.days_in_flight:
+                        self._finish(in_flight.popleft(), state)
+
+                    window_dir = self.export_window(window, resume)
+                    in_flight.append(
+                        (window, import_executor.submit(self.import_window, window, window_dir))
+                    )
+
+                while in_flight:
+                    self._finish(in_flight.popleft(), state)
+            finally:
+                # the imports that are still running are waited for and recorded, even after an error
+                for window, fut in in_flight:
+                    if fut.exception() is None:
+                        state["done"].append(window[0])
+                self._save_state(state)
+
+        Backfill.get_logger().log.info(
+            f"Backfill from {from_date} to {to_date} finished."
+        )
+
+    def window_dir(self, window):
+        return self.output_dir / datetime.strptime(
+            window[0], Backfill.DATE_FORMAT
+        ).strftime("%Y%m%d%H%M%S")
+
+    def export_window(self, window, resume=False):
+        """Exports one window to its own directory
+
+        Arguments:
+            window ((str, str)): The from and to date of the window
+            resume (bool): Whether to resume the export of the window in its directory
+
+        Raises:
+            ExportFailedError: If any of the export tasks failed
+        Returns:
+            window_dir (Path): The directory of the window
+        """
+        window_dir = self.window_dir(window)
+        os.makedirs(window_dir, exist_ok=True)
+        before_export = datetime.now()
+        Backfill.get_logger().log.info(
+            f"Exporting the window from {window[0]} to {window[1]} to '{window_dir}'..."
+        )
+
+        exporter = Exporter(
+            export_objects=self.export_objects,
+            output_dir=window_dir,
+            script_dir=self.script_dir,
+            extractor=self.extractor,
+            codec=self.codec,
+            resume=resume,
+            table_stats=self.table_stats,
+        )
+        exporter.export_tables(
+            sample_size=0,
+            validate=self.validate,
+            from_date=window[0],
+            to_date=window[1],
+        )
+
+        Backfill.get_logger().log.info(
+            f"Exported the window from {window[0]} to {window[1]}. Time elapsed: {datetime.now() - before_export}."
+        )
+        return window_dir
+
+    def import_window(self, window, window_dir):
+        """Imports one window and removes its directory
+
+        Arguments:
+            window ((str, str)): The from and to date of the window
+            window_dir (Path): The directory of the window
+
+        Raises:
+            Exception: Any error of the import
+        Returns:
+            None
+        """
+        before_import = datetime.now()
+        importer = Importer(
+            import_objects=self.export_objects,
+            input_dir=window_dir,
+            script_dir=self.script_dir,
+            validation_results_dir=self.validation_results_dir,
+        )
+        importer.import_tables(validate=self.validate)
+        shutil.rmtree(window_dir)
+
+        Backfill.get_logger().log.info(
+            f"Imported the window from {window[0]} to {window[1]}. Time elapsed: {datetime.now() - before_import}."
+        )
+
+    def _finish(self, entry, state):
+        window, fut = entry
+        fut.result()
+        state["done"].append(window[0])
+        self._save_state(state)
+
+    def _load_state(self):
+        if not self.state_path.exists():
+            return None
+        with open(self.state_path, "r") as f:
+            return json.load(f)
+
+    def _save_state(self, state):
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=1)
+        os.replace(tmp_path, self.state_path)
@@ -0,0 +1,242 @@
+import math
+from datetime import datetime
+
+from elysium_migration import Logger
+from elysium_migration.configuration.constants import ConstantCatalog
+from elysium_migration.migration.execute import Execution
+
+
+class BoundaryPlanner:
+    """
+    This class is an interface for the strategies that split a table into chunks on its partitioning column.
+    A strategy only finds the boundary values, the WHERE clauses are built from them here so every strategy
+    gets ranges that don't overlap, aren't empty and cover every row.
+
+    Args:
+        None
+
+    Attributes:
+        None
+    """
+
+    logger = None
+
+    @classmethod
+    def get_logger(cls):
+        if cls.logger is None:
+            cls.logger = Logger(log_name=__name__)
+        return cls.logger
+
+    @staticmethod
+    def from_name(name=ConstantCatalog.EXPORT_BOUNDARY_STRATEGY):
+        """Returns the boundary planner for the given name
+
+        Arguments:
+            name (str): Either 'row_number', 'range', 'percentile' or 'date_histogram'
+
+        Raises:
+            ValueError: If there is no strategy with that name
+        Returns:
+            planner (BoundaryPlanner): The boundary planner
+        """
+        planners = {
+            "row_number": RowNumberPlanner,
+            "range": RangePlanner,
+            "percentile": PercentilePlanner,
+            "date_histogram": DateHistogramPlanner,
+        }
+        if name not in planners:
+            raise ValueError(
+                f"Unknown boundary strategy '{name}'. Valid strategies are: {', '.join(planners)}"
+            )
+        return planners[name]()
+
+    def boundaries(self, table, column, chunk_size, predicate=""):
+        """Returns the values of the column where a new chunk starts, the order doesn't matter"""
+        raise NotImplementedError
+
+    def plan(self, table, column, chunk_size, predicate=""):
+        """Finds the boundaries and returns one WHERE clause per chunk
+
+        Arguments:
+            table (str): The name of the table in 'schema.table' format
+            column (str): The name of the partitioning column
+            chunk_size (int): The amount of rows per chunk
+            predicate (str): The extra predicate of the export, starting with 'AND'
+
+        Raises:
+            None
+        Returns:
+            clauses (list[str]): The WHERE clauses, without the extra predicate
+        """
+        before_plan = datetime.now()
+        clauses = BoundaryPlanner.where_clauses(
+            column,
+            self.boundaries(table, column, int(chunk_size), predicate),
+            character=Execution.vsql_is_character_column(table=table, column=column),
+        )
+        BoundaryPlanner.get_logger().log.debug(
+            f"{type(self).__name__} split {table} on {column} into {len(clauses)} chunks. Time elapsed: {datetime.now() - before_plan}."
+        )
+        return clauses
+
+    @staticmethod
+    def where_clauses(column, boundaries, character=False):
+        """Builds half-open ranges from the boundaries. Duplicated boundaries are dropped, so heavily
+            repeated key values can't make an empty range. The first range also takes the NULLs.
+
+        Arguments:
+            column (str): The name of the partitioning column
+            boundaries (list[str]): The values where a new chunk starts
+            character (bool): If the column holds strings, then the values are compared as quoted strings
+
+        Raises:
+            None
+        Returns:
+            clauses (list[str]): The WHERE clauses
+        """
+        values = []
+        for val in sorted(
+            (BoundaryPlanner.parse_value(b, character) for b in boundaries if b != ""),
+            key=lambda v: (isinstance(v, str), v),
+        ):
+            if not values or val != values[-1]:
+                values.append(val)
+
+        if not values:
+            return ["1 = 1"]
+
+        literals = [BoundaryPlanner.literal(val) for val in values]
+        clauses = [f"({column} < {literals[0]} OR {column} IS NULL)"]
+        clauses.extend(
+            f"{column} >= {lo} AND {column} < {hi}"
+            for lo, hi in zip(literals, literals[1:])
+        )
+        clauses.append(f"{column} >= {literals[-1]}")
+        return clauses
+
+    @staticmethod
+    def parse_value(val, character=False):
+        """Parses a value the way vsql prints it into an int, float or datetime. Anything else is kept as is,
+        and so are the values of a character column, e.g. the leading zeros of '00123'."""
+        if character or not isinstance(val, str):
+            return val
+        for cast in (int, float):
+            try:
+                return cast(val)
+            except ValueError:
+                pass
+        for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+            try:
+                return datetime.strptime(val, fmt)
+            except ValueError:
+                pass
+        return val
+
+    @staticmethod
+    def literal(val):
+        """Returns the SQL literal of a parsed value"""
+        if isinstance(val, (int, float)):
+            return str(val)
+        val = str(val).replace("'", "''")
+        return f"'{val}'"
+
+
+class RowNumberPlanner(BoundaryPlanner):
+    """
+    Takes every chunk_size-th value after numbering all the rows. Chunks are exact, but it sorts the whole filtered table.
+    """
+
+    def boundaries(self, table, column, chunk_size, predicate=""):
+        return Execution.vsql_get_chunk_boundaries(
+            table=table, column=column, chunk_size=chunk_size, predicate=predicate
+        )
+
+
+class RangePlanner(BoundaryPlanner):
+    """
+    Splits the range between the min and max of a numeric or timestamp column evenly. It only needs one
+    aggregate pass, but chunks are only even if the values are spread evenly.
+    """
+
+    def boundaries(self, table, column, chunk_size, predicate=""):
+        min_val, max_val, count = Execution.vsql_get_key_range(
+            table=table, column=column, predicate=predicate
+        )
+        num_chunks = math.ceil(count / chunk_size) if chunk_size else 1
+        if num_chunks <= 1 or min_val == "":
+            return []
+
+        lo = BoundaryPlanner.parse_value(min_val)
+        hi = BoundaryPlanner.parse_value(max_val)
+        if isinstance(lo, str) or isinstance(hi, str):
+            raise ValueError(
+                f"The range boundary strategy needs a numeric or timestamp column. {table}.{column} ranges from '{min_val}' to '{max_val}'."
+            )
+
+        step = (hi - lo) / num_chunks
+        if isinstance(lo, int) and isinstance(hi, int):
+            # rounding up keeps the min out of the boundaries, so the first chunk isn't empty
+            return [lo + math.ceil(step * i) for i in range(1, num_chunks)]
+        return [lo + step * i for i in range(1, num_chunks)]
+
+
+class PercentilePlanner(BoundaryPlanner):
+    """
+    Uses approximate percentiles of a numeric column, so chunks follow the distribution of the values without a sort.
+    """
+
+    def boundaries(self, table, column, chunk_size, predicate=""):
+        _, _, count = Execution.vsql_get_key_range(
+            table=table, column=column, predicate=predicate
+        )
+        num_chunks = math.ceil(count / chunk_size) if chunk_size else 1
+        if num_chunks <= 1:
+            return []
+
+        return Execution.vsql_get_key_percentiles(
+            table=table,
+            column=column,
+            percentiles=[round(i / num_chunks, 6) for i in range(1, num_chunks)],
+            predicate=predicate,
+        )
+
+
+class DateHistogramPlanner(BoundaryPlanner):
+    """
+    Splits the table on its DATE_COL instead of the partitioning column, from one count per truncated date.
+    Consecutive buckets are put together until they hold about chunk_size rows, so every chunk is a date range
+    that Vertica can prune partitions with. A single bucket is never split, so chunks can be bigger than
+    chunk_size when the granularity is coarse. The NO_DATE_TABLES are split by row numbers.
+
+    Args:
+        granularity (str): The unit of DATE_TRUNC, e.g. 'hour' or 'day'.
+    """
+
+    def __init__(self, granularity=ConstantCatalog.EXPORT_HISTOGRAM_GRANULARITY):
+        self.granularity = granularity
+
+    def plan(self, table, column, chunk_size, predicate=""):
+        if table in ConstantCatalog.NO_DATE_TABLES():
+            return RowNumberPlanner().plan(table, column, chunk_size, predicate)
+        return super().plan(
+            table, ConstantCatalog.DATE_COL(table=table), chunk_size, predicate
+        )
+
+    def boundaries(self, table, column, chunk_size, predicate=""):
+        boundaries = []
+        rows = 0
+        for bucket, count in Execution.vsql_get_date_histogram(
+            table=table,
+            column=column,
+            granularity=self.granularity,
+            predicate=predicate,
+        ):
+            # the NULL bucket goes into the first chunk
+            if bucket == "":
+                continue
+            if rows >= chunk_size:
+                boundaries.append(bucket)
+                rows = 0
+            rows += count
+        return boundaries
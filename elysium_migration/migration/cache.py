@@ -0,0 +1,148 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from elysium_migration import Logger
+from elysium_migration.configuration.constants import ConstantCatalog
+
+
+class MetadataCache:
+    """
+    Class for an on-disk SQLite cache of metadata query results, e.g. table sizes, chunk sizes and column lists.
+    These barely change from one day to the next, so consecutive runs don't need to query the catalog again.
+
+    Args:
+        path (Path): The path of the SQLite file. The directory is created if it doesn't exist.
+        ttl_s (int): Entries older than this many seconds are ignored and recomputed.
+
+    Attributes:
+        path (Path): This is where we store the path.
+        ttl_s (int): This is where we store the ttl_s.
+    """
+
+    logger = None
+
+    @classmethod
+    def get_logger(cls):
+        if cls.logger is None:
+            cls.logger = Logger(log_name=__name__)
+        return cls.logger
+
+    def __init__(self, path: Path, ttl_s=ConstantCatalog.METADATA_CACHE_TTL_S):
+        self.path = Path(path)
+        self.ttl_s = ttl_s
+        os.makedirs(self.path.parent, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS metadata (
+                    table_name TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (table_name, kind, params)
+                )
+                """
+            )
+
+    def get(self, table, kind, params=""):
+        """Returns a cached value, or None if it is missing or expired.
+
+        Arguments:
+            table (str): The name of the table in 'schema.table' format.
+            kind (str): The kind of query, e.g. 'table_size_mb'.
+            params (str): Anything else the value depends on, e.g. the platform.
+        Raises:
+            None
+        Returns:
+            value: The cached value, or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM metadata WHERE table_name = ? AND kind = ? AND params = ?",
+                (table, kind, params),
+            ).fetchone()
+
+        if row is None or time.time() - row[1] > self.ttl_s:
+            return None
+        return json.loads(row[0])
+
+    def set(self, table, kind, value, params=""):
+        """Stores a value.
+
+        Arguments:
+            table (str): The name of the table in 'schema.table' format.
+            kind (str): The kind of query, e.g. 'table_size_mb'.
+            value: Any json serializable value.
+            params (str): Anything else the value depends on, e.g. the platform.
+        Raises:
+            None
+        Returns:
+            None
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?)",
+                (table, kind, params, json.dumps(value), time.time()),
+            )
+
+    def get_or_compute(self, table, kind, compute, params=""):
+        """Returns the cached value, or computes and stores it when it is missing or expired.
+            Empty results are returned but not stored, so they are retried on the next run.
+
+        Arguments:
+            table (str): The name of the table in 'schema.table' format.
+            kind (str): The kind of query, e.g. 'table_size_mb'.
+            compute (callable): Returns the value when it isn't cached.
+            params (str): Anything else the value depends on, e.g. the platform.
+        Raises:
+            None
+        Returns:
+            value: The cached or computed value
+        """
+        value = self.get(table, kind, params)
+        if value is not None:
+            MetadataCache.get_logger().log.debug(
+                f"Metadata cache hit for {table} '{kind}': {value}"
+            )
+            return value
+
+        value = compute()
+        if value not in (None, "", []):
+            self.set(table, kind, value, params)
+        return value
+
+    def invalidate(self, table=None, kind=None):
+        """Deletes the cached values of a table and/or kind, or everything when neither is given.
+
+        Arguments:
+            table (str): Optional name of the table in 'schema.table' format.
+            kind (str): Optional kind of query.
+        Raises:
+            None
+        Returns:
+            None
+        """
+        sql, params = "DELETE FROM metadata WHERE 1=1", []
+        if table is not None:
+            sql += " AND table_name = ?"
+            params.append(table)
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+
+        with self._lock, self._conn:
+            deleted = self._conn.execute(sql, params).rowcount
+        MetadataCache.get_logger().log.info(
+            f"Invalidated {deleted} metadata cache entries. Table: {table or 'all'}, Kind: {kind or 'all'}."
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,437 @@
+import collections
+import glob
+import gzip
+import io
+
+from elysium_migration.configuration.constants import ConstantCatalog
+from elysium_migration.migration.integrity import DigestFile
+
+
+class Codec:
+    """
+    Class for a compression codec of the exported files. The same codec is used whether the data is piped through
+    the command line utility or written in process, so the importer finds the files by their extension either way.
+
+    Args:
+        name (str): Either 'gzip', 'zstd' or 'lz4'.
+        level (int): The compression level. 0 means the default level of the codec.
+
+    Attributes:
+        name (str): This is where we store the name.
+        level (int): This is where we store the level.
+        extension (str): The file extension of the codec, without the dot.
+    """
+
+    EXTENSIONS = {"gzip": "gz", "zstd": "zst", "lz4": "lz4"}
+    DEFAULT_LEVELS = {"gzip": 6, "zstd": 3, "lz4": 1}
+
+    def __init__(self, name="gzip", level=0):
+        if name not in Codec.EXTENSIONS:
+            raise ValueError(
+                f"Unknown compression codec '{name}'. Valid codecs are: {', '.join(Codec.EXTENSIONS)}"
+            )
+        self.name = name
+        self.level = level or Codec.DEFAULT_LEVELS[name]
+        self.extension = Codec.EXTENSIONS[name]
+
+    @staticmethod
+    def from_name(
+        name=ConstantCatalog.EXPORT_COMPRESSION_CODEC,
+        level=ConstantCatalog.EXPORT_COMPRESSION_LEVEL,
+    ):
+        """Returns the codec for the given name, or None when the output is not compressed
+
+        Arguments:
+            name (str): Either 'gzip', 'zstd', 'lz4' or 'none'
+            level (int): The compression level. 0 means the default level of the codec
+
+        Raises:
+            ValueError: If there is no codec with that name
+        Returns:
+            codec (Codec): The codec, None for 'none'
+        """
+        if not name or name == "none":
+            return None
+        return Codec(name, level)
+
+    @staticmethod
+    def file_name(id, codec=None):
+        """Returns the name of a data file, with the extension of the codec when compressed
+
+        Arguments:
+            id (int or str): The number of the file
+            codec (Codec): The codec of the file, None if not compressed
+
+        Returns:
+            name (str): The file name, e.g. '0.csv.gz'
+        """
+        name = f"{id}.{ConstantCatalog.DATA_FILES_EXTENSION}"
+        if codec is not None:
+            name = f"{name}.{codec.extension}"
+        return name
+
+    @staticmethod
+    def data_files(directory):
+        """Finds the data files in a directory, compressed with any codec or not at all
+
+        Arguments:
+            directory (Path): The directory of a table
+
+        Returns:
+            files (list[str]): The paths of the data files, sorted
+        """
+        files = glob.glob(f"{directory}/*.{ConstantCatalog.DATA_FILES_EXTENSION}")
+        for extension in Codec.EXTENSIONS.values():
+            files.extend(
+                glob.glob(
+                    f"{directory}/*.{ConstantCatalog.DATA_FILES_EXTENSION}.{extension}"
+                )
+            )
+        return sorted(files)
+
+    def command(self):
+        """Returns the shell command that compresses stdin to stdout
+
+        Arguments:
+            None
+
+        Returns:
+            command (str): The command line
+        """
+        if self.name == "zstd":
+            return f"zstd -q -c -{self.level}"
+        if self.name == "lz4":
+            return f"lz4 -q -c -{self.level}"
+        return f"gzip -c -{self.level}"
+
+    def open(self, path, mode="wt", **kwargs):
+        """Opens a file that is compressed with the codec, like `open`
+
+        Arguments:
+            path (str): The path of the file, or a binary file object to read or write the compressed data through
+            mode (str): The mode, as in `open`
+
+        Raises:
+            ImportError: If the python package of the codec isn't installed (zstandard or lz4)
+        Returns:
+            file: The file object
+        """
+        if self.name == "zstd":
+            import zstandard
+
+            if "r" in mode:
+                # block compressed files are many frames, the reader has to continue across them
+                source = path if hasattr(path, "read") else open(path, "rb")
+                reader = zstandard.ZstdDecompressor().stream_reader(
+                    source, read_across_frames=True, closefd=True
+                )
+                return reader if "b" in mode else io.TextIOWrapper(reader, **kwargs)
+            return zstandard.open(
+                path, mode, cctx=zstandard.ZstdCompressor(level=self.level), **kwargs
+            )
+        if self.name == "lz4":
+            import lz4.frame
+
+            return lz4.frame.open(
+                path, mode, compression_level=self.level, **kwargs
+            )
+        return gzip.open(path, mode, compresslevel=self.level, **kwargs)
+
+    def compress(self, block):
+        """Compresses a block into a complete gzip member, zstd frame or lz4 frame.
+            Concatenated members and frames are a valid file of the codec.
+
+        Arguments:
+            block (bytes): The data
+
+        Raises:
+            ImportError: If the python package of the codec isn't installed (zstandard or lz4)
+        Returns:
+            compressed (bytes): The compressed data
+        """
+        if self.name == "zstd":
+            import zstandard
+
+            return zstandard.ZstdCompressor(level=self.level).compress(block)
+        if self.name == "lz4":
+            import lz4.frame
+
+            return lz4.frame.compress(block, compression_level=self.level)
+        return gzip.compress(block, compresslevel=self.level)
+
+    def __repr__(self):
+        return f"Codec({self.name}, level={self.level})"
+
+
+class BlockCompressor:
+    """
+    Class for writing a stream to a compressed file, compressing blocks of it on a thread pool.
+    zlib, zstd and lz4 release the GIL while compressing, so the blocks are compressed in parallel.
+    The blocks are written in order, as concatenated gzip members or zstd/lz4 frames.
+    The digest of the file is taken while it is written.
+
+    Args:
+        codec (Codec): The codec of the file.
+        output_path (str): The path of the file.
+        executor (Executor): The thread pool that compresses the blocks, it can be shared between files.
+        block_size (int): The amount of bytes per block.
+        max_pending (int): The max amount of blocks compressing at once, writes wait when it's reached.
+
+    Attributes:
+        codec (Codec): This is where we store the codec.
+        output_path (str): This is where we store the output_path.
+        bytes_in (int): The amount of bytes written.
+        bytes_out (int): The amount of compressed bytes in the file.
+        lines (int): The amount of lines written.
+    """
+
+    def __init__(
+        self,
+        codec,
+        output_path,
+        executor,
+        block_size=ConstantCatalog.EXPORT_COMPRESSION_BLOCK_MB * 1024 ** 2,
+        max_pending=4,
+    ):
+        self.codec = codec
+        self.output_path = output_path
+        self.executor = executor
+        self.block_size = block_size
+        self.max_pending = max_pending
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.lines = 0
+        self._buffer = bytearray()
+        self._pending = collections.deque()
+        self._file = DigestFile(open(output_path, "wb"))
+
+    def write(self, data):
+        """Buffers the data and hands every full block to the thread pool
+
+        Arguments:
+            data (bytes): The data
+
+        Raises:
+            Exception: Any error of compressing an earlier block
+        Returns:
+            None
+        """
+        self._buffer += data
+        self.bytes_in += len(data)
+        self.lines += data.count(b"\n")
+        while len(self._buffer) >= self.block_size:
+            block = bytes(self._buffer[: self.block_size])
+            del self._buffer[: self.block_size]
+            self._submit(block)
+
+    def close(self):
+        """Compresses the rest of the buffer and writes every pending block
+
+        Arguments:
+            None
+
+        Raises:
+            Exception: Any error of compressing a block
+        Returns:
+            None
+        """
+        try:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer = bytearray()
+            while self._pending:
+                self._write_next()
+        finally:
+            self._file.close()
+
+    def digest(self):
+        """Returns the size, rows and crc32 of the file, once it is closed"""
+        return self._file.digest(self.lines)
+
+    def _submit(self, block):
+        self._pending.append(self.executor.submit(self.codec.compress, block))
+        while len(self._pending) > self.max_pending:
+            self._write_next()
+
+    def _write_next(self):
+        compressed = self._pending.popleft().result()
+        self._file.write(compressed)
+        self.bytes_out += len(compressed)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+            return
+        for fut in self._pending:
+            fut.cancel()
+        self._pending.clear()
+        self._file.close()
+
+
+class FileWriter:
+    """
+    Class for writing a stream to a file, compressed in the writing thread or not at all.
+    Like the BlockCompressor, it takes the digest of the file while it is written.
+
+    Args:
+        output_path (str): The path of the file.
+        codec (Codec): The codec of the file, None to not compress.
+
+    Attributes:
+        output_path (str): This is where we store the output_path.
+        bytes_in (int): The amount of bytes written.
+        lines (int): The amount of lines written.
+    """
+
+    def __init__(self, output_path, codec=None):
+        self.output_path = output_path
+        self.bytes_in = 0
+        self.lines = 0
+        self._disk = DigestFile(open(output_path, "wb"))
+        self._file = self._disk if codec is None else codec.open(self._disk, "wb")
+
+    def write(self, data):
+        self._file.write(data)
+        self.bytes_in += len(data)
+        self.lines += data.count(b"\n")
+
+    def close(self):
+        # closing the codec writes its trailer, the file under it isn't always closed with it
+        try:
+            self._file.close()
+        finally:
+            if not self._disk.closed:
+                self._disk.close()
+
+    def digest(self):
+        """Returns the size, rows and crc32 of the file, once it is closed"""
+        return self._disk.digest(self.lines)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class RollingWriter:
+    """
+    Class for writing one stream to numbered files of about a target size. The stream is only cut at the end of a
+    line, and the header line of the stream is repeated at the start of every file, so every file can be loaded
+    on its own and ybload can read them concurrently.
+
+    Args:
+        path_of (callable): Returns the path of the file with the given number, starting at 0.
+        roll_bytes (int): The amount of uncompressed bytes after which the next line goes to a new file.
+        codec (Codec): The codec of the files, None to not compress.
+        executor (Executor): The thread pool that compresses blocks, None to compress in the writing thread.
+
+    Attributes:
+        paths (list[str]): The path of every file written, in order.
+        digests (list[ChunkDigest]): The digest of every file closed, in order.
+        bytes_in (int): The amount of bytes of the stream.
+    """
+
+    def __init__(self, path_of, roll_bytes, codec=None, executor=None):
+        self.path_of = path_of
+        self.roll_bytes = roll_bytes
+        self.codec = codec
+        self.executor = executor
+        self.paths = []
+        self.digests = []
+        self.bytes_in = 0
+        self._header = None
+        self._pending = bytearray()
+        self._file = None
+        self._file_bytes = 0
+        self._line_end = True
+
+    def write(self, data):
+        """Writes the data, and rolls over to a new file at the first line end past the target size
+
+        Arguments:
+            data (bytes): The data
+
+        Raises:
+            Exception: Any error of writing a file
+        Returns:
+            None
+        """
+        self.bytes_in += len(data)
+        if self._header is None:
+            self._pending += data
+            end = self._pending.find(b"\n")
+            if end < 0:
+                return
+            self._header = bytes(self._pending[: end + 1])
+            data = bytes(self._pending[end + 1 :])
+            self._pending = bytearray()
+            self._roll()
+
+        while data:
+            if self._file_bytes >= self.roll_bytes and self._line_end:
+                self._roll()
+            room = self.roll_bytes - self._file_bytes
+            if len(data) <= room:
+                self._write(data)
+                return
+            end = data.find(b"\n", max(room - 1, 0))
+            if end < 0:
+                self._write(data)
+                return
+            self._write(data[: end + 1])
+            data = data[end + 1 :]
+
+    def close(self):
+        """Closes the last file. A stream without a header line still gets one empty file.
+
+        Arguments:
+            None
+
+        Raises:
+            Exception: Any error of writing the file
+        Returns:
+            None
+        """
+        if self._header is None:
+            self._header = bytes(self._pending)
+            self._roll()
+        self._close_file()
+
+    def _roll(self):
+        self._close_file()
+        path = self.path_of(len(self.paths))
+        if self.codec is not None and self.executor is not None:
+            self._file = BlockCompressor(self.codec, path, self.executor)
+        else:
+            self._file = FileWriter(path, self.codec)
+        self.paths.append(path)
+        self._file.write(self._header)
+        self._file_bytes = len(self._header)
+        self._line_end = True
+
+    def _write(self, data):
+        self._file.write(data)
+        self._file_bytes += len(data)
+        self._line_end = data.endswith(b"\n")
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self.digests.append(self._file.digest())
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+            return
+        if isinstance(self._file, BlockCompressor):
+            self._file.__exit__(exc_type, exc_value, traceback)
+        else:
+            self._close_file()
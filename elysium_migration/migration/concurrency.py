@@ -0,0 +1,183 @@
+import threading
+import time
+
+from elysium_migration import Logger
+from elysium_migration.configuration.constants import ConstantCatalog
+
+
+class ConcurrencyController:
+    """
+    Class for adapting the amount of export queries in flight during the run, with additive increase and
+    multiplicative decrease (AIMD). It meters the uncompressed bytes the queries read from the source while
+    they stream, and the seconds every query waits for its first byte, which grow when Vertica queues the
+    queries in the resource pool. Every window the throughput is compared with the previous window.
+    The limit goes up by one while the throughput keeps up, and is multiplied down when the throughput drops,
+    the wait for the first byte grows far above the lowest one seen, or an export fails.
+    The throughput of a window with fewer exports in flight than the limit isn't compared, e.g. at the tail of
+    the run, since it dropped for lack of work.
+
+    Args:
+        floor (int): The lowest limit.
+        ceiling (int): The highest limit.
+        initial (int): The limit to start with. 0 means halfway between the floor and the ceiling.
+        window_s (int): The amount of seconds between decisions.
+        decrease_factor (float): The limit is multiplied by this when decreasing.
+        tolerance (float): The fraction the throughput may drop by before the limit is decreased.
+        latency_factor (float): The limit is decreased when the median wait for the first byte of a window
+            is this many times the lowest median seen, and at least a second more.
+        clock (callable): Returns the current time in seconds.
+
+    Attributes:
+        floor (int): This is where we store the floor.
+        ceiling (int): This is where we store the ceiling.
+        limit (int): The current amount of exports that may be in flight.
+        decisions (list[(int, int, str)]): Every change of the limit, as old limit, new limit and reason.
+    """
+
+    logger = None
+
+    @classmethod
+    def get_logger(cls):
+        if cls.logger is None:
+            cls.logger = Logger(log_name=__name__)
+        return cls.logger
+
+    def __init__(
+        self,
+        floor=ConstantCatalog.EXPORT_MIN_WORKERS,
+        ceiling=ConstantCatalog.EXPORT_MAX_WORKERS,
+        initial=0,
+        window_s=ConstantCatalog.EXPORT_AIMD_WINDOW_S,
+        decrease_factor=ConstantCatalog.EXPORT_AIMD_DECREASE_FACTOR,
+        tolerance=0.05,
+        latency_factor=ConstantCatalog.EXPORT_AIMD_LATENCY_FACTOR,
+        clock=time.monotonic,
+    ):
+        self.floor = max(1, min(floor, ceiling))
+        self.ceiling = max(self.floor, ceiling)
+        self.limit = initial or (self.floor + self.ceiling) // 2
+        self.limit = max(self.floor, min(self.limit, self.ceiling))
+        self.window_s = window_s
+        self.decrease_factor = decrease_factor
+        self.tolerance = tolerance
+        self.latency_factor = latency_factor
+        self.clock = clock
+        self.decisions = []
+        self._lock = threading.Lock()
+        self._window_start = clock()
+        self._window_bytes = 0
+        self._window_errors = 0
+        self._window_latencies = []
+        self._last_throughput = None
+        self._base_latency = None
+
+    def add_bytes(self, num_bytes):
+        """Meters bytes read from the source, while the queries stream them"""
+        with self._lock:
+            self._window_bytes += num_bytes
+
+    def add_latency(self, seconds):
+        """Meters the seconds a query waited for its first byte"""
+        with self._lock:
+            self._window_latencies.append(seconds)
+
+    def record(self, num_bytes=0, failed=False, in_flight=None):
+        """Records a finished export and adjusts the limit at the end of each window, or right away on errors.
+
+        Arguments:
+            num_bytes (int): The bytes of the export that weren't metered while it streamed.
+            failed (bool): Whether the export failed.
+            in_flight (int): The amount of exports in flight, None if unknown.
+        Raises:
+            None
+        Returns:
+            limit (int): The limit after the decision.
+        """
+        with self._lock:
+            self._window_bytes += num_bytes
+            if failed:
+                self._window_errors += 1
+            return self._decide(in_flight)
+
+    def tick(self, in_flight=None):
+        """Adjusts the limit when the window is over, also while no export finishes.
+
+        Arguments:
+            in_flight (int): The amount of exports in flight, None if unknown.
+        Raises:
+            None
+        Returns:
+            limit (int): The limit after the decision.
+        """
+        with self._lock:
+            return self._decide(in_flight)
+
+    def _decide(self, in_flight):
+        # called while holding the lock
+        elapsed = self.clock() - self._window_start
+        if not self._window_errors and elapsed < self.window_s:
+            return self.limit
+
+        latency = None
+        if self._window_latencies:
+            latencies = sorted(self._window_latencies)
+            latency = latencies[len(latencies) // 2]
+
+        if self._window_errors:
+            self._set_limit(
+                int(self.limit * self.decrease_factor),
+                f"{self._window_errors} failed exports",
+            )
+            # the throughput of a window with errors isn't a fair baseline
+            self._last_throughput = None
+        elif latency is not None and self._base_latency is not None and latency > max(
+            self._base_latency * self.latency_factor, self._base_latency + 1
+        ):
+            self._set_limit(
+                int(self.limit * self.decrease_factor),
+                f"queries wait {latency:.1f}s for their first byte, the lowest was {self._base_latency:.1f}s",
+            )
+            self._last_throughput = None
+        elif in_flight is not None and in_flight < self.limit:
+            ConcurrencyController.get_logger().log.debug(
+                f"Export concurrency stays at {self.limit}: only {in_flight} exports are left in flight."
+            )
+        else:
+            throughput = self._window_bytes / max(elapsed, 1e-9)
+            mbps = f"{throughput / 1024 ** 2:.1f} MB/s"
+            if self._last_throughput is None:
+                self._set_limit(self.limit + 1, f"throughput {mbps}")
+            elif throughput < self._last_throughput * (1 - self.tolerance):
+                self._set_limit(
+                    int(self.limit * self.decrease_factor),
+                    f"throughput dropped to {mbps} from {self._last_throughput / 1024 ** 2:.1f} MB/s",
+                )
+            else:
+                self._set_limit(
+                    self.limit + 1,
+                    f"throughput {mbps}, was {self._last_throughput / 1024 ** 2:.1f} MB/s",
+                )
+            self._last_throughput = throughput
+
+        if latency is not None:
+            self._base_latency = (
+                latency if self._base_latency is None else min(self._base_latency, latency)
+            )
+        self._window_start = self.clock()
+        self._window_bytes = 0
+        self._window_errors = 0
+        self._window_latencies = []
+        return self.limit
+
+    def _set_limit(self, limit, reason):
+        limit = max(self.floor, min(limit, self.ceiling))
+        if limit == self.limit:
+            ConcurrencyController.get_logger().log.debug(
+                f"Export concurrency stays at {limit} (floor {self.floor}, ceiling {self.ceiling}): {reason}."
+            )
+            return
+        ConcurrencyController.get_logger().log.info(
+            f"Export concurrency {self.limit} -> {limit} (floor {self.floor}, ceiling {self.ceiling}): {reason}."
+        )
+        self.decisions.append((self.limit, limit, reason))
+        self.limit = limit
@@ -83,14 +83,14 @@ class Config:
         # the delimiter || is for the script `getenv.sh` line
         # TODO: change this delimiter to NOT need to be synced with getenv.sh
         for s in output:
-            logger.log.debug("Setting Environment variable: " + s.replace("||", "="))
+            Config.get_logger().log.debug("Setting Environment variable: " + s.replace("||", "="))
             kv = s.split("||")
             os.environ[kv[0]] = kv[1]
 
     @staticmethod
     def parse_envs(script_dir):
 
-        logger.log.debug(f"Executing getenv script in script dir: '{script_dir}'")
+        Config.get_logger().log.debug(f"Executing getenv script in script dir: '{script_dir}'")
         # retrieve the environment variables from .env
         output = (
             subprocess.check_output(
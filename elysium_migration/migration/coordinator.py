@@ -1,12 +1,26 @@
+import os
+import sys
 import tempfile
 from pathlib import Path
 from typing import Optional
 
 from elysium_migration import Logger
+from elysium_migration.configuration.connect.pool import ConnectionPool
+from elysium_migration.configuration.constants import ConstantCatalog
+from elysium_migration.migration.backfill import Backfill
+from elysium_migration.migration.cache import MetadataCache
+from elysium_migration.migration.compression import Codec
 from elysium_migration.migration.config import Config, config
+from elysium_migration.migration.diskbudget import DiskBudget
+from elysium_migration.migration.execute import Execution
 from elysium_migration.migration.exporter import Exporter
+from elysium_migration.migration.extractor import Extractor
 from elysium_migration.migration.importer import Importer
+from elysium_migration.migration.metrics import RunMetrics
+from elysium_migration.migration.pipeline import ChunkLoadPipeline
+from elysium_migration.migration.throttle import Throttle
 from elysium_migration.migration.utility import MigrationUtility
+from elysium_migration.migration.watermark import WatermarkStore
 
 
 class ExportCoordinator:
@@ -32,12 +46,24 @@ class ExportCoordinator:
         script_dir,
         config_file_path: Path,
         output_path: Path,
-        inject_envs = False,
+        inject_envs,
         sample_size,
         validate,
         from_date,
         to_date,
         env_dir,
+        pipeline=False,
+        stream=False,
+        val_dir: Optional[Path] = None,
+        extractor=ConstantCatalog.EXPORT_EXTRACTOR,
+        compression=ConstantCatalog.EXPORT_COMPRESSION_CODEC,
+        compression_level=ConstantCatalog.EXPORT_COMPRESSION_LEVEL,
+        resume=False,
+        metadata_cache=ConstantCatalog.METADATA_CACHE_FLAG,
+        cache_dir: Optional[Path] = None,
+        invalidate_cache=False,
+        incremental=False,
+        disk_budget_mb=ConstantCatalog.EXPORT_DISK_BUDGET_MB,
     ):
         """This function does all the logic for exporting data 
         
@@ -51,6 +77,19 @@ class ExportCoordinator:
                 from_date (str): The min date of the migration which is configured by the user 
                 to_date (str): The max date of the migration which is configured by the user 
                 env_dir (Path): Path of the .env file that the user can control 
+                pipeline (bool): When set, every exported file is loaded into the target while the export is still running
+                stream (bool): When set, every chunk is loaded through a named pipe without staging a file. Implies pipeline
+                val_dir (Path): The directory of the ybload logs and validation results of the pipeline. The default is the
+                    PIPELINE_DIR in the parent of the output path, which isn't cleared with the data
+                extractor (str): The backend that executes the export queries, either 'vsql' or 'odbc'
+                compression (str): The codec of the exported files, either 'gzip', 'zstd', 'lz4' or 'none'
+                compression_level (int): The compression level. 0 means the default level of the codec
+                resume (bool): When set, only the missing or failed chunks of the run in the output path are exported
+                metadata_cache (bool): When set, table sizes, chunk sizes and column lists are read from the on-disk cache
+                cache_dir (Path): The directory of the metadata cache. The default is the parent of the output path
+                invalidate_cache (bool): When set, the metadata cache is cleared before the export
+                incremental (bool): When set, only the rows above the watermark of every table are exported
+                disk_budget_mb (int): The max MB of exported files staged in the output path. 0 means no budget
                 
             Returns:
                 None
@@ -80,17 +119,94 @@ class ExportCoordinator:
             sys.exit(1)
             
         try:
-            exporter = Exporter(
-                export_objects=export_objects,
-                output_dir=output_path,
-                script_dir=script_dir
-            )
-            exporter.export_tables(
-                sample_size=sample_size,
-                validate=validate,
-                from_date=from_date,
-                to_date=to_date
+            if metadata_cache:
+                cache = MetadataCache(
+                    (cache_dir or output_path.resolve().parent)
+                    / ConstantCatalog.METADATA_CACHE_FILE
+                )
+                if invalidate_cache:
+                    cache.invalidate()
+                Execution.set_metadata_cache(cache)
+
+            metrics = RunMetrics()
+            throttle = Throttle.from_config(
+                os.environ.get(ConstantCatalog.VSQL_HOST, ""), export_objects, metrics
             )
+            Execution.set_throttle(throttle if throttle.limited() else None)
+
+            disk_budget = None
+            if disk_budget_mb:
+                disk_budget = DiskBudget(output_path, disk_budget_mb, metrics)
+
+            watermarks = None
+            if incremental:
+                watermarks = WatermarkStore(
+                    (cache_dir or output_path.resolve().parent)
+                    / ConstantCatalog.WATERMARK_FILE
+                )
+
+            extractor = Extractor.from_name(extractor)
+            codec = Codec.from_name(compression, compression_level)
+            if pipeline or stream:
+                importer = Importer(
+                    import_objects=export_objects,
+                    input_dir=output_path,
+                    script_dir=script_dir,
+                    validation_results_dir=val_dir
+                    or output_path.resolve().parent / ConstantCatalog.PIPELINE_DIR,
+                    # the chunks are loaded right after they are written, a resume verifies them before they are queued
+                    verify_chunks=False,
+                )
+                with ChunkLoadPipeline(importer=importer) as chunk_pipeline:
+                    exporter = Exporter(
+                        export_objects=export_objects,
+                        output_dir=output_path,
+                        script_dir=script_dir,
+                        pipeline=chunk_pipeline,
+                        extractor=extractor,
+                        codec=codec,
+                        resume=resume,
+                        watermarks=watermarks,
+                        disk_budget=disk_budget,
+                        stream=stream,
+                    )
+                    exporter.export_tables(
+                        sample_size=sample_size,
+                        validate=validate,
+                        from_date=from_date,
+                        to_date=to_date
+                    )
+                # every chunk is loaded once the pipeline closed without errors
+                if incremental:
+                    importer.commit_watermarks(watermarks)
+                if validate:
+                    importer._create_validation_results()
+            else:
+                exporter = Exporter(
+                    export_objects=export_objects,
+                    output_dir=output_path,
+                    script_dir=script_dir,
+                    extractor=extractor,
+                    codec=codec,
+                    resume=resume,
+                    watermarks=watermarks,
+                    disk_budget=disk_budget,
+                )
+                exporter.export_tables(
+                    sample_size=sample_size,
+                    validate=validate,
+                    from_date=from_date,
+                    to_date=to_date
+                )
+            extractor.close()
+            ConnectionPool.close_all()
+            if metadata_cache:
+                Execution.set_metadata_cache(None)
+                cache.close()
+            if incremental:
+                watermarks.close()
+            Execution.set_throttle(None)
+            metrics.log_summary()
         except Exception as e:
             ExportCoordinator.get_logger().log.fatal(
                 f"Exception when exporting data: {e}"
@@ -121,10 +237,12 @@ class ImportCoordinator:
         script_dir,
         config_file_path: Path,
         output_path: Path,
-        inject_envs = False,
+        inject_envs,
         validate,
         val_dir,
         env_dir,
+        cache_dir: Optional[Path] = None,
+        import_workers=ConstantCatalog.IMPORT_MAX_WORKERS,
     ):
         """This function does all the logic for importing data 
         
@@ -136,6 +254,8 @@ class ImportCoordinator:
                 validate (bool): The boolean which flags if there will be validation or not
                 val_dir (Path): Path where the validation results will be
                 env_dir (Path): Path of the .env file that the user can control 
+                cache_dir (Path): The directory of the watermarks of an incremental export. The default is the parent of the output path
+                import_workers (int): The max amount of tables loaded at once
 
             Returns:
                 None
@@ -170,8 +290,17 @@ class ImportCoordinator:
                 input_dir=output_path,
                 script_dir=script_dir,
                 validation_results_dir=val_dir,
+                max_workers=import_workers,
             )
             importer.import_tables(validate=validate)
+            if importer.is_incremental():
+                watermarks = WatermarkStore(
+                    (cache_dir or output_path.resolve().parent)
+                    / ConstantCatalog.WATERMARK_FILE
+                )
+                importer.commit_watermarks(watermarks)
+                watermarks.close()
+            ConnectionPool.close_all()
             
         except Exception as e:
             ExportCoordinator.get_logger().log.fatal(
@@ -179,4 +308,130 @@ class ImportCoordinator:
             )            
             sys.exit(1)
 
+
+class BackfillCoordinator:
+    """Class for coordinating a backfill of a date range in a single process
+    
+        Args:
+            None 
+
+        Attributes:
+            None
+    """
+
+    logger = None
+
+    @classmethod
+    def get_logger(cls):
+        if cls.logger is None:
+            cls.logger = Logger(log_name=__name__)
+        return cls.logger
+
+    @staticmethod
+    def backfill(
+        script_dir,
+        config_file_path: Path,
+        output_path: Path,
+        inject_envs,
+        validate,
+        val_dir,
+        from_date,
+        to_date,
+        env_dir,
+        window_days=ConstantCatalog.BACKFILL_WINDOW_DAYS,
+        days_in_flight=ConstantCatalog.BACKFILL_DAYS_IN_FLIGHT,
+        extractor=ConstantCatalog.EXPORT_EXTRACTOR,
+        compression=ConstantCatalog.EXPORT_COMPRESSION_CODEC,
+        compression_level=ConstantCatalog.EXPORT_COMPRESSION_LEVEL,
+        resume=False,
+        metadata_cache=ConstantCatalog.METADATA_CACHE_FLAG,
+        cache_dir: Optional[Path] = None,
+    ):
+        """This function does all the logic for exporting and importing a date range, window by window.
+            The scripts, configuration, caches and connections are set up once for every window.
         
+            Args:
+                script_dir (Path) : The directory where the scripts will be written to, or can be overriden if the user supplies it 
+                config_file_path (Path) : The full path of the config file 
+                output_path (Path): The path of the root directory of the exported windows
+                inject_envs (bool): The flag that can be driven by the user to inject from the 
+                validate (bool): The boolean which flags if there will be validation or not
+                val_dir (Path): Path where the validation results will be
+                from_date (str): The min date of the migration which is configured by the user 
+                to_date (str): The max date of the migration which is configured by the user 
+                env_dir (Path): Path of the .env file that the user can control 
+                window_days (int): The amount of days per window
+                days_in_flight (int): The max amount of windows exported but not yet imported
+                extractor (str): The backend that executes the export queries, either 'vsql' or 'odbc'
+                compression (str): The codec of the exported files, either 'gzip', 'zstd', 'lz4' or 'none'
+                compression_level (int): The compression level. 0 means the default level of the codec
+                resume (bool): When set, the windows a previous backfill of the same range imported are skipped
+                metadata_cache (bool): When set, table sizes, chunk sizes and column lists are read from the on-disk cache
+                cache_dir (Path): The directory of the metadata cache. The default is the parent of the output path
+                
+            Returns:
+                None
+        """
+        try:
+            current_path = Path(__file__).parent.resolve()
+            BackfillCoordinator.get_logger().log.info(
+                f"Executing `elysium-migrate-cli backfill` from '{current_path}'..."
+            )
+
+            MigrationUtility.write_scripts(env_dir)
+        except Exception as e:
+            BackfillCoordinator.get_logger().log.fatal(
+                f"Exception when writing scripts: {e}"
+            )
+            sys.exit(1)
+
+        try:
+            if inject_envs:
+                Config.set_initial_envs(script_dir)
+            config.set_from_yaml(config_file_path)
+            export_objects = config.objects
+        except Exception as e:
+            BackfillCoordinator.get_logger().log.fatal(
+                f"Exception when loading configs: {e}"
+            )
+            sys.exit(1)
+
+        try:
+            if metadata_cache:
+                cache = MetadataCache(
+                    (cache_dir or output_path.resolve().parent)
+                    / ConstantCatalog.METADATA_CACHE_FILE
+                )
+                Execution.set_metadata_cache(cache)
+
+            metrics = RunMetrics()
+            throttle = Throttle.from_config(
+                os.environ.get(ConstantCatalog.VSQL_HOST, ""), export_objects, metrics
+            )
+            Execution.set_throttle(throttle if throttle.limited() else None)
+
+            extractor = Extractor.from_name(extractor)
+            backfill = Backfill(
+                export_objects=export_objects,
+                output_dir=output_path,
+                script_dir=script_dir,
+                validation_results_dir=val_dir,
+                extractor=extractor,
+                codec=Codec.from_name(compression, compression_level),
+                window_days=window_days,
+                days_in_flight=days_in_flight,
+                validate=validate,
+            )
+            backfill.run(from_date=from_date, to_date=to_date, resume=resume)
+            extractor.close()
+            ConnectionPool.close_all()
+            if metadata_cache:
+                Execution.set_metadata_cache(None)
+                cache.close()
+            Execution.set_throttle(None)
+            metrics.log_summary()
+        except Exception as e:
+            BackfillCoordinator.get_logger().log.fatal(
+                f"Exception when backfilling data: {e}"
+            )
+            sys.exit(1)
@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+
+from elysium_migration import Logger
+from elysium_migration.configuration.constants import ConstantCatalog
+
+
+class InsufficientDiskSpaceError(Exception):
+    pass
+
+
+class DiskBudget:
+    """
+    Class for bounding the bytes of the exported files that are staged on disk and not loaded yet.
+    Every chunk reserves its estimated bytes before it is exported and waits while they don't fit in the budget,
+    until loaded files are deleted. Only a pipelined export deletes loaded files, so only a pipelined export waits on the budget.
+
+    Args:
+        path (Path): A path on the staging volume, e.g. the output directory.
+        budget_mb (int): The max amount of staged MB before new chunks wait.
+        metrics (RunMetrics): The run metrics the waits are added to.
+
+    Attributes:
+        path (Path): This is where we store the path.
+        budget_bytes (int): The budget in bytes.
+        staged_bytes (int): The bytes of the exported files that are not deleted yet.
+    """
+
+    logger = None
+
+    @classmethod
+    def get_logger(cls):
+        if cls.logger is None:
+            cls.logger = Logger(log_name=__name__)
+        return cls.logger
+
+    def __init__(self, path, budget_mb=ConstantCatalog.EXPORT_DISK_BUDGET_MB, metrics=None):
+        self.path = path
+        self.budget_bytes = budget_mb * 1024 ** 2
+        self.metrics = metrics
+        self.staged_bytes = 0
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def free_bytes(path):
+        """Returns the bytes available to unprivileged users on the volume of a path"""
+        stat = os.statvfs(path)
+        return stat.f_bavail * stat.f_frsize
+
+    def check_free_space(self):
+        """Checks that the volume has room for the budget, before the export is planned
+
+        Arguments:
+            None
+        Raises:
+            InsufficientDiskSpaceError: If the free space of the volume is below the budget
+        Returns:
+            free (int): The free bytes of the volume
+        """
+        free = DiskBudget.free_bytes(self.path)
+        DiskBudget.get_logger().log.info(
+            f"Staging volume of '{self.path}' has {free // 1024 ** 2} MB free. Disk budget: {self.budget_bytes // 1024 ** 2} MB."
+        )
+        if free < self.budget_bytes:
+            raise InsufficientDiskSpaceError(
+                f"'{self.path}' has {free // 1024 ** 2} MB free, below the disk budget of {self.budget_bytes // 1024 ** 2} MB."
+            )
+        return free
+
+    def wait_for_room(self):
+        """Waits while the staged bytes are at or above the budget
+
+        Arguments:
+            None
+        Raises:
+            None
+        Returns:
+            waited (float): The amount of seconds waited
+        """
+        return self.reserve(0)
+
+    def reserve(self, num_bytes):
+        """Waits until the bytes of a chunk fit in the budget and counts them as staged before it is exported,
+            so the chunks exported at once can't overrun the budget together. A chunk bigger than the budget
+            waits until nothing is staged. The reservation is corrected with `settle` once the file is written.
+
+        Arguments:
+            num_bytes (int): The expected bytes of the chunk
+        Raises:
+            None
+        Returns:
+            waited (float): The amount of seconds waited
+        """
+        before_wait = time.monotonic()
+        with self._cond:
+            if not self._has_room(num_bytes):
+                DiskBudget.get_logger().log.debug(
+                    f"{self.staged_bytes // 1024 ** 2} MB staged, no room for {num_bytes // 1024 ** 2} MB in the disk budget. Waiting for loads..."
+                )
+            while not self._has_room(num_bytes):
+                self._cond.wait()
+            self.staged_bytes += num_bytes
+        waited = time.monotonic() - before_wait
+        if self.metrics is not None:
+            self.metrics.add("disk_budget_wait_s", waited)
+        return waited
+
+    def settle(self, reserved, num_bytes):
+        """Replaces the reservation of a chunk with the bytes of the file it wrote, 0 when it failed"""
+        with self._cond:
+            self.staged_bytes = max(self.staged_bytes - reserved + num_bytes, 0)
+            self._cond.notify_all()
+
+    def staged(self, num_bytes):
+        """Adds the bytes of an exported file"""
+        with self._cond:
+            self.staged_bytes += num_bytes
+
+    def release(self, num_bytes):
+        """Removes the bytes of a deleted file, and wakes the exports that wait"""
+        with self._cond:
+            self.staged_bytes = max(self.staged_bytes - num_bytes, 0)
+            self._cond.notify_all()
+
+    def _has_room(self, num_bytes):
+        return self.staged_bytes == 0 or self.staged_bytes + max(num_bytes, 1) <= self.budget_bytes
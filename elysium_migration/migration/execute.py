@@ -1,8 +1,13 @@
+import contextlib
 import os
 import subprocess
+import tempfile
+import time
+from decimal import Decimal
 
 from elysium_migration import Logger
 from elysium_migration.configuration import Platform
+from elysium_migration.configuration.connect.pool import ConnectionPool
 from elysium_migration.configuration.constants import ConstantCatalog
 
 
@@ -132,6 +137,54 @@ class StatementCatalog:
         
         """
 
+    @staticmethod
+    def get_catalog_snapshot(tables):
+        """For vertica only - gets the rows, bytes and average row width of many tables in a single
+            pass over the storage containers, instead of one scan per table and query kind
+
+        Arguments:
+            tables (list[str]): The tables in 'schema.table' format
+
+        Raises:
+            None
+        Returns:
+            query (str): A query with one row per table that has storage:
+                schema, table, rows, used bytes and average bytes per row
+        """
+        table_filter = "\n               OR ".join(
+            "(sc.schema_name = '{schema}' AND p.anchor_table_name = '{table}')".format(
+                schema=tbl.split(".")[0], table=tbl.split(".")[1]
+            )
+            for tbl in tables
+        )
+
+        return f"""
+        WITH projection_sizes AS (
+            SELECT sc.schema_name,
+                p.anchor_table_name AS table_name,
+                p.is_super_projection,
+                SUM(sc.total_row_count) AS rows,
+                SUM(sc.used_bytes) AS used_bytes
+            FROM v_monitor.storage_containers sc
+            JOIN v_catalog.projections p
+                ON sc.projection_id = p.projection_id
+            WHERE {table_filter}
+            GROUP BY sc.schema_name,
+                    p.anchor_table_name,
+                    sc.projection_id,
+                    p.is_super_projection
+        )
+
+        SELECT schema_name,
+            table_name,
+            MAX(CASE WHEN is_super_projection THEN rows END) AS rows,
+            SUM(used_bytes) AS used_bytes,
+            SUM(used_bytes) / NULLIF(MAX(CASE WHEN is_super_projection THEN rows END), 0) AS avg_row_bytes
+        FROM projection_sizes
+        GROUP BY schema_name,
+                table_name
+        """
+
     @staticmethod
     def truncate_tables():
         """Truncates the tables - uses a hard coded from ConstantCatalog
@@ -148,22 +201,22 @@ class StatementCatalog:
 
     @staticmethod
     def delete_date_range(table, predicate):
-	"""Creates a delete statement that will delete the records from the target before loading
-	
-	Arguments:
-	    table (str): The table name from which to delete
-	    predicate (str): The where clause of the delete statement
-	    
-	Returns:
-	    None
-	"""
-	return f"""
-	    DELETE 
-	    FROM {table}
-	    WHERE 1=1
-	        {predicate}
-	"""
-	    
+        """Creates a delete statement that will delete the records from the target before loading
+        
+        Arguments:
+            table (str): The table name from which to delete
+            predicate (str): The where clause of the delete statement
+            
+        Returns:
+            None
+        """
+        return f"""
+            DELETE 
+            FROM {table}
+            WHERE 1=1
+                {predicate}
+        """
+            
 
     @staticmethod
     def get_sample_date_filter(schema_and_table, part_col, date_col, sample_size):
@@ -251,20 +304,19 @@ class StatementCatalog:
         """
 
     @staticmethod
-    def get_chunk_where_clauses(schema_and_table, column, chunk_size, predicate=""):
-        """Returns the query to get all the where clauses as predicates for the queries after getting chunk size
+    def get_chunk_boundaries(schema_and_table, column, chunk_size, predicate=""):
+        """Returns the query to get every chunk_size-th value of the partitioning column.
+           This numbers every row, so it sorts the whole filtered table
 
         Arguments:
             schema_and_table (str): The name of the table
             column (str): The name of the partitioning column
-            chunk_size_mb (str): The size in mb of desired output file 
+            chunk_size (str): The amount of rows per chunk
             predicate (str):   The extra predicate to add the the output query
             
         Returns:
             query (str):  The query itself 
         """
-
-        coalesce_val = ConstantCatalog.COALESCE_MIN_VAL(column)
         return f"""
         with row_nums AS (
                 SELECT {column}
@@ -273,29 +325,102 @@ class StatementCatalog:
                 WHERE 1 = 1
                   {predicate}
             )
-            ,
-            chunks AS (
-                SELECT row_num
-                    , {column}
-                FROM row_nums
-                WHERE row_num % {chunk_size} = 0 
-            )
-            ,
-            predicates AS (
-                SELECT row_num as row_num
-                    , LAG({column}, 1) OVER (ORDER BY row_num) AS FROM_{column} 
-                    , LEAD({column}, 1) OVER (ORDER BY row_num) AS DUMMY_{column}  
-                    , {column} AS TO_{column} 
-                FROM chunks
-            )
 
-            SELECT '{column} >= ' || COALESCE(FROM_{column}, {coalesce_val}) || 
-                            CASE 
-                                WHEN DUMMY_{column} IS NULL 
-                                    THEN '' 
-                                ELSE  ' AND {column} < ' || TO_{column} 
-                            END
-            FROM predicates
+            SELECT DISTINCT {column}
+            FROM row_nums
+            WHERE row_num % {chunk_size} = 0 
+            ORDER BY 1
+        """
+
+    @staticmethod
+    def get_key_range(schema_and_table, column, predicate=""):
+        """Returns the query to get the min, max and count of the partitioning column in one pass, without sorting
+
+        Arguments:
+            schema_and_table (str): The name of the table
+            column (str): The name of the partitioning column
+            predicate (str):   The extra predicate to add the the output query
+            
+        Returns:
+            query (str):  The query itself 
+        """
+        return f"""
+            SELECT MIN({column}), MAX({column}), COUNT(*)
+            FROM {schema_and_table}
+            WHERE 1 = 1
+              {predicate}
+        """
+
+    @staticmethod
+    def get_date_histogram(schema_and_table, column, granularity="hour", predicate=""):
+        """Returns the query to count the rows per truncated date of a date column, in one grouped pass
+
+        Arguments:
+            schema_and_table (str): The name of the table
+            column (str): The name of the date column
+            granularity (str): The unit of DATE_TRUNC, e.g. 'hour' or 'day'
+            predicate (str):   The extra predicate to add the the output query
+            
+        Returns:
+            query (str):  The query itself, with the bucket and the count of every bucket in order
+        """
+        return f"""
+            SELECT DATE_TRUNC('{granularity}', {column}) AS bucket, COUNT(*)
+            FROM {schema_and_table}
+            WHERE 1 = 1
+              {predicate}
+            GROUP BY 1
+            ORDER BY 1
+        """
+
+    @staticmethod
+    def get_top_k_range(schema_and_table, column, k):
+        """Returns the query to get the min and max of the k highest values of the partitioning column.
+            The ORDER BY with a LIMIT runs as a bounded top-k, it doesn't rank the whole table, and only reads
+            the end of the column when the projection is sorted on it.
+
+        Arguments:
+            schema_and_table (str): The name of the table
+            column (str): The name of the partitioning column
+            k (int): The amount of values
+
+        Returns:
+            query (str):  The query itself
+        """
+        return f"""
+            SELECT MIN({column}), MAX({column})
+            FROM
+                (
+                    SELECT {column}
+                    FROM {schema_and_table}
+                    WHERE {column} IS NOT NULL
+                    ORDER BY {column} DESC
+                    LIMIT {k}
+                ) a
+        """
+
+    @staticmethod
+    def get_key_percentiles(schema_and_table, column, percentiles, predicate=""):
+        """Returns the query to get approximate percentiles of a numeric partitioning column, without sorting
+
+        Arguments:
+            schema_and_table (str): The name of the table
+            column (str): The name of the partitioning column
+            percentiles (list[float]): The percentiles between 0 and 1
+            predicate (str):   The extra predicate to add the the output query
+            
+        Returns:
+            query (str):  The query itself, with one column per percentile
+        """
+        cols = "\n                , ".join(
+            f"APPROXIMATE_PERCENTILE({column} USING PARAMETERS percentile={p})"
+            for p in percentiles
+        )
+        return f"""
+            SELECT {cols}
+            FROM {schema_and_table}
+            WHERE 1 = 1
+              {predicate}
         """
 
     @staticmethod
@@ -409,30 +534,31 @@ class StatementCatalog:
 
     # TODO: possibly simplify things by making StatementCatalog not accessible at all from outside of this file
     @staticmethod
-    def vsql(query="", output_path="", field_delimiter=",", extra_output_args="", compressed=False,):
+    def vsql(query="", output_path="", field_delimiter=",", extra_output_args="", codec=None,):
         """Builds the statement to run for vsql to execute
         
         Arguments:
             query (str): The query for vertica
             output_path (str): The path of the file where the data will go. If no path, then returned to user. 
-	    field_delimiter (str): The delimiter used to seperated fields
+            field_delimiter (str): The delimiter used to seperated fields
             extra_output_args (str): Optional extra arguments
-            compressed (str): Whether to pipe the data to a compression utility (gzip) 
+            codec (Codec): The codec to pipe the data through when compressing, None to not compress
         
         Returns: 
             query (str): The statment to send for vsql execution
         """
         output_args = extra_output_args
-        if output_path and not compressed:
+        if output_path and codec is None:
             output_args = (
                  f"{extra_output_args} -o {output_path} -F $'{field_delimiter}' "
             )
 
-	if output_path and compressed:
-	    output_args = (
-		f"{extra_output_args} -F $'{field_delimiter}' | gzip -c > {output_path}"
-	    )
-	
+        if output_path and codec is not None:
+            output_args = (
+                f"{extra_output_args} -F $'{field_delimiter}' | {codec.command()} > {output_path}"
+            )
+
+
         if query:
             query = f"""-c "{query}" """
 
@@ -455,14 +581,17 @@ class StatementCatalog:
         extras,
         field_delimiter=",",
         null_marker="",
-        num_cores=os.cpu_count(),
+        num_cores=None,
+        num_readers=None,
     ):
-	if ConstantCatalog.YB_NUM_CORES == 0:
-		num_cores = os.cpu_count()
-		
+        if num_cores is None:
+            num_cores = ConstantCatalog.YB_NUM_CORES or os.cpu_count()
+        if num_readers is None:
+            num_readers = ConstantCatalog.YB_NUM_READERS
+
         return (
             f"""ybload -t {table} {input_path} --parse-header-line --nullmarker "{null_marker}" --max-bad-rows 1000 """
-            + f"--num-cores {num_cores} --read-sources-concurrently ALLOW --num-readers {ConstantCatalog.YB_NUM_READERS} "
+            + f"--num-cores {num_cores} --read-sources-concurrently ALLOW --num-readers {num_readers} "
             + f"""--on-zero-char REMOVE --num-header-lines 1 --delimiter "{field_delimiter}" {extras} """
         )
 
@@ -471,17 +600,61 @@ class StatementCatalog:
         return f". {root_project_dir}/scripts/getenv.sh"
 
 
+class TableStats:
+    """Class for the planning data of a table from the catalog snapshot
+
+    Args:
+        rows (int): The amount of rows in the table.
+        used_bytes (int): The storage used by all the projections of the table.
+
+    Attributes:
+        rows (int): This is where we store the rows.
+        used_bytes (int): This is where we store the used_bytes.
+    """
+
+    def __init__(self, rows=0, used_bytes=0):
+        self.rows = rows
+        self.used_bytes = used_bytes
+
+    @property
+    def size_mb(self):
+        return self.used_bytes / 1024 ** 2
+
+    @property
+    def avg_row_bytes(self):
+        return self.used_bytes / self.rows if self.rows else 0
+
+    def chunk_size(self, chunk_size_mb=ConstantCatalog.EXPORT_CHUNK_SIZE_MB):
+        """The amount of rows that makes a file of about chunk_size_mb, same as StatementCatalog.get_chunk_size
+
+        Arguments:
+            chunk_size_mb (int): The size in mb of desired output file
+
+        Returns:
+            chunk_size (int): The amount of rows, rounded to thousands. 0 if the table has no rows
+        """
+        if not self.rows or not self.used_bytes:
+            return 0
+        return int(round(chunk_size_mb / (self.size_mb / self.rows), -3))
+
+    def __repr__(self):
+        return f"TableStats(rows={self.rows}, used_bytes={self.used_bytes})"
+
+
 class Execution:
     """Class for holding static methods to execute and return results
     
     Args:
-    	None
-	
+        None
+        
     Attributes:
         None
     """
     
     logger = None
+    metadata_cache = None
+    throttles = {}
+    meter = None
     
     @classmethod
     def get_logger(cls):
@@ -490,78 +663,497 @@ class Execution:
         return cls.logger
 
     @classmethod
-    def vsql(cls, query="", output_path="", field_delimiter=",", extra_output_args=""):
-        """Executes a vsql query
+    def set_metadata_cache(cls, cache):
+        """Sets the cache that table sizes, chunk sizes and column lists are read from before they are queried
+
+        Arguments:
+            cache (MetadataCache): The cache, or None to always query
+            
+        Returns:
+            None
+        """
+        Execution.metadata_cache = cache
+
+    @classmethod
+    def _cached(cls, table, kind, compute, params=""):
+        if Execution.metadata_cache is None:
+            return compute()
+        return Execution.metadata_cache.get_or_compute(table, kind, compute, params)
+
+    @classmethod
+    def set_throttle(cls, throttle):
+        """Sets the throttle of a source host, that the export queries against it and the bytes they read go through
+
+        Arguments:
+            throttle (Throttle): The throttle of its host, or None to not throttle any host
+            
+        Returns:
+            None
+        """
+        if throttle is None:
+            Execution.throttles = {}
+        else:
+            Execution.throttles = {**Execution.throttles, throttle.host: throttle}
+
+    @classmethod
+    def throttle_of(cls, host=None):
+        """Returns the throttle of a source host, the default is the VSQL_HOST of the queries. None when it has none."""
+        if host is None:
+            host = os.environ.get(ConstantCatalog.VSQL_HOST, "")
+        return Execution.throttles.get(host)
+
+    @classmethod
+    @contextlib.contextmanager
+    def throttled(cls, table=None, host=None):
+        """Holds a query slot of the throttle of the host for the duration of the with block
+
+        Arguments:
+            table (str): The table of the query
+            host (str): The source host, the default is VSQL_HOST
+            
+        Returns:
+            None
+        """
+        throttle = Execution.throttle_of(host)
+        if throttle is None:
+            yield
+            return
+        with throttle.query(table):
+            yield
+
+    @classmethod
+    def throttle_bytes(cls, num_bytes, table=None, host=None):
+        throttle = Execution.throttle_of(host)
+        if throttle is not None:
+            throttle.consume(num_bytes, table)
+
+    @classmethod
+    def set_meter(cls, meter):
+        """Sets the meter of the exports, that the bytes they read from the source and the seconds every query
+           waits for its first byte go to, e.g. the ConcurrencyController
+
+        Arguments:
+            meter (ConcurrencyController): The meter, with `add_bytes` and `add_latency`, or None to not meter
+
+        Returns:
+            None
+        """
+        Execution.meter = meter
+
+    @classmethod
+    def read_bytes(cls, num_bytes, table=None, host=None):
+        """Accounts for bytes an export read from the source host, they go through its throttle and to the meter"""
+        Execution.throttle_bytes(num_bytes, table, host)
+        meter = Execution.meter
+        if meter is not None:
+            meter.add_bytes(num_bytes)
+
+    @classmethod
+    def first_byte(cls, seconds):
+        """Accounts for the seconds an export query waited for its first byte"""
+        meter = Execution.meter
+        if meter is not None:
+            meter.add_latency(seconds)
+
+    @classmethod
+    def vsql(
+        cls,
+        query="",
+        output_path="",
+        field_delimiter=",",
+        extra_output_args="",
+        codec=None,
+        table=None,
+    ):
+        """Executes a vsql query. Queries with an output path hold a query slot of the throttle. Their bytes
+           go straight to the file and can't be throttled, the extractors stream the exports with a bytes limit instead.
         
         Arguments:
             query (str): The query for vertica
             output_path (str): The path of the file where the data will go. If no path, then returned to user. 
-	    field_delimiter (str): The delimiter used to seperated fields
+            field_delimiter (str): The delimiter used to seperated fields
             extra_output_args (str): Optional extra arguments
-            compressed (str): Whether to pipe the data to a compression utility (gzip) 
+            codec (Codec): The codec to pipe the data through when compressing, None to not compress
+            table (str): The table of the query, for the throttle
         
         Returns: 
             results (bytes): Either returns the results if no output_path is given or it returns nothing
         """
         vsql = StatementCatalog.vsql(
-            query, output_path, field_delimiter, extra_output_args
+            query, output_path, field_delimiter, extra_output_args, codec
         )
 
         Execution.get_logger().log.debug(f"Execute VSQL: {vsql}")
-        return Execution._execute(vsql)
+        if not output_path:
+            return Execution._execute(vsql)
+
+        with Execution.throttled(table):
+            return Execution._execute(vsql)
 
     @classmethod
-    def vsql_get_chunk_size(cls, table):
-	"""Executes the query to tget the chunk size that will be used in a later query
-	   The chunk size is used to break up the data into smaller chunks. The chunk
-	   size is basically a predetermined amount of space ( set by a config right now )
-	   and that chunk size in mb is translated to a chunk size amount of rows here
-	   
-	Arguments:
-	    table(str): The table to get the row chunk size about 
-	    
-	Returns:
-	    reults (str): This shoudl be an integer ALWAYS but it is a string datatype because
-	       it will make predicate building easier with strign concatenation
-	"""
-	
-        cli_result = Execution.vsql(
-            StatementCatalog.get_chunk_size(schema_and_table=table),
-            extra_output_args=" -t ",
+    def vsql_stream(
+        cls, query, write, field_delimiter=",", read_size=1024 ** 2, table=None
+    ):
+        """Executes a vsql query and hands its output to `write` while it is still running,
+           instead of piping it to a file or a compression utility. The query and every chunk go through the throttle,
+           and the chunks and the wait for the first one to the meter.
+        
+        Arguments:
+            query (str): The query for vertica
+            write (callable): Called with every chunk of bytes of the output
+            field_delimiter (str): The delimiter used to seperated fields
+            read_size (int): The max amount of bytes per chunk
+            table (str): The table of the query, for the throttle
+        
+        Raises:
+            CalledProcessError: If vsql exits with a non zero status
+        Returns: 
+            None
+        """
+        vsql = StatementCatalog.vsql(
+            query, extra_output_args=f" -F $'{field_delimiter}' "
         )
 
-        return cli_result.decode().strip("\n\t ")
+        Execution.get_logger().log.debug(f"Execute streaming VSQL: {vsql}")
+        with tempfile.TemporaryFile() as stderr, Execution.throttled(table):
+            before_query = time.monotonic()
+            process = subprocess.Popen(
+                ["bash", "-c", vsql], stdout=subprocess.PIPE, stderr=stderr
+            )
+            try:
+                # the first read returns as soon as vsql prints anything, so it times the wait for the first byte
+                chunk = process.stdout.read1(read_size)
+                Execution.first_byte(time.monotonic() - before_query)
+                while chunk:
+                    Execution.read_bytes(len(chunk), table)
+                    write(chunk)
+                    chunk = process.stdout.read(read_size)
+            finally:
+                process.stdout.close()
+                returncode = process.wait()
+
+            if returncode != 0:
+                stderr.seek(0)
+                raise subprocess.CalledProcessError(
+                    returncode, vsql, stderr=stderr.read()
+                )
+
+    @classmethod
+    def query_column(cls, query, platform=Platform.VERTICA):
+        """Executes a metadata query and returns the first column of every row.
+           With METADATA_USE_POOL the query runs on a pooled connection, otherwise
+           a new vsql or ybsql session is started for it.
+
+        Arguments:
+            query (str): The metadata query
+            platform (Enum.Platform): The database system of the query (optional - default is VERTICA)
+
+        Returns:
+            results (list[str]): The values of the first column, formatted the way vsql prints them
+        """
+        if ConstantCatalog.METADATA_USE_POOL:
+            Execution.get_logger().log.debug(f"Execute pooled {platform.name} query: {query}")
+            rows = ConnectionPool.for_platform(platform).query(query)
+            return [Execution._format_value(row[0]) for row in rows]
+
+        if platform == Platform.YELLOWBRICK:
+            cli_result = Execution.ybsql(query)
+        else:
+            cli_result = Execution.vsql(query, extra_output_args=" -t ")
+
+        return list(
+            filter(lambda s: len(s) > 0, cli_result.decode().strip("\n\t ").split("\n"))
+        )
+
+    @classmethod
+    def query_rows(cls, query, platform=Platform.VERTICA):
+        """Executes a metadata query and returns every row.
+
+        Arguments:
+            query (str): The metadata query
+            platform (Enum.Platform): The database system of the query (optional - default is VERTICA)
+
+        Returns:
+            results (list[list[str]]): The rows, with the values formatted the way vsql prints them
+        """
+        if ConstantCatalog.METADATA_USE_POOL:
+            Execution.get_logger().log.debug(f"Execute pooled {platform.name} query: {query}")
+            rows = ConnectionPool.for_platform(platform).query(query)
+            return [[Execution._format_value(val) for val in row] for row in rows]
+
+        if platform == Platform.YELLOWBRICK:
+            cli_result = Execution.ybsql(query, extra_output_args=" -F '|' ")
+        else:
+            cli_result = Execution.vsql(query, extra_output_args=" -t -F '|' ")
+
+        return [
+            line.split("|")
+            for line in cli_result.decode().strip("\n\t ").split("\n")
+            if len(line) > 0
+        ]
+
+    @classmethod
+    def query_value(cls, query, platform=Platform.VERTICA):
+        """Executes a metadata query and returns the first value of the first row.
+
+        Arguments:
+            query (str): The metadata query
+            platform (Enum.Platform): The database system of the query (optional - default is VERTICA)
+
+        Returns:
+            result (str): The value, or an empty string if there are no rows
+        """
+        values = Execution.query_column(query, platform)
+        return values[0].strip("\n\t ") if values else ""
+
+    @classmethod
+    def execute_statement(cls, statement, platform=Platform.YELLOWBRICK):
+        """Executes a statement that returns nothing, e.g. a delete.
+
+        Arguments:
+            statement (str): The statement
+            platform (Enum.Platform): The database system of the statement (optional - default is YELLOWBRICK)
+
+        Returns:
+            None
+        """
+        if ConstantCatalog.METADATA_USE_POOL:
+            Execution.get_logger().log.debug(
+                f"Execute pooled {platform.name} statement: {statement}"
+            )
+            ConnectionPool.for_platform(platform).execute(statement)
+        elif platform == Platform.YELLOWBRICK:
+            Execution.ybsql(statement)
+        else:
+            Execution.vsql(statement)
+
+    @staticmethod
+    def _format_value(val):
+        if val is None:
+            return ""
+        if isinstance(val, bool):
+            return "t" if val else "f"
+        if isinstance(val, float) and val.is_integer():
+            return str(int(val))
+        if isinstance(val, Decimal):
+            return format(val.normalize(), "f")
+        return str(val)
+
+    @classmethod
+    def vsql_get_chunk_size(cls, table):
+        """Executes the query to tget the chunk size that will be used in a later query
+           The chunk size is used to break up the data into smaller chunks. The chunk
+           size is basically a predetermined amount of space ( set by a config right now )
+           and that chunk size in mb is translated to a chunk size amount of rows here
+           
+        Arguments:
+            table(str): The table to get the row chunk size about 
+            
+        Returns:
+            reults (str): This shoudl be an integer ALWAYS but it is a string datatype because
+               it will make predicate building easier with strign concatenation
+        """
+        return Execution._cached(
+            table,
+            "chunk_size",
+            lambda: Execution.query_value(
+                StatementCatalog.get_chunk_size(schema_and_table=table)
+            ),
+            params=str(ConstantCatalog.EXPORT_CHUNK_SIZE_MB),
+        )
 
     @classmethod
     def vsql_get_table_size_mb(cls, table):
-        cli_result = Execution.vsql(
-            StatementCatalog.get_table_size_mb(table=table), extra_output_args=" -t ",
+        return Execution._cached(
+            table,
+            "table_size_mb",
+            lambda: Execution.query_value(StatementCatalog.get_table_size_mb(table=table)),
         )
 
-        return cli_result.decode().strip("\n\t ")
+    @classmethod
+    def vsql_get_catalog_snapshot(cls, tables):
+        """Gets the planning data of all the tables with one catalog query. Tables that are
+           already in the metadata cache are not queried again
+
+        Arguments:
+            tables (list[str]): The tables in 'schema.table' format
+
+        Returns:
+            snapshot (dict[str:TableStats]): The stats of each table. Tables without storage have 0 rows and bytes
+        """
+        snapshot = {}
+        missing = []
+        for tbl in tables:
+            cached = None
+            if Execution.metadata_cache is not None:
+                cached = Execution.metadata_cache.get(tbl, "catalog_snapshot")
+            if cached is None:
+                missing.append(tbl)
+            else:
+                snapshot[tbl] = TableStats(*cached)
+
+        if missing:
+            results = Execution.query_rows(StatementCatalog.get_catalog_snapshot(missing))
+            found = {
+                f"{schema}.{table}": TableStats(int(rows or 0), int(used_bytes or 0))
+                for schema, table, rows, used_bytes, _ in results
+            }
+            for tbl in missing:
+                snapshot[tbl] = found.get(tbl, TableStats())
+                if Execution.metadata_cache is not None and tbl in found:
+                    Execution.metadata_cache.set(
+                        tbl,
+                        "catalog_snapshot",
+                        [snapshot[tbl].rows, snapshot[tbl].used_bytes],
+                    )
+
+        return snapshot
 
     @classmethod
-    def vsql_get_chunk_where_clauses(cls, table, column, chunk_size, predicate=""):
-        cli_result = Execution.vsql(
-            StatementCatalog.get_chunk_where_clauses(
+    def vsql_get_chunk_boundaries(cls, table, column, chunk_size, predicate=""):
+        """Executes the query to get every chunk_size-th value of the partitioning column
+
+        Arguments:
+            table (str): The name of the table
+            column (str): The name of the partitioning column
+            chunk_size (int): The amount of rows per chunk
+            predicate (str): The extra predicate to add the the query
+
+        Returns:
+            boundaries (list[str]): The boundaries in ascending order, formatted the way vsql prints them
+        """
+        return Execution.query_column(
+            StatementCatalog.get_chunk_boundaries(
                 schema_and_table=table,
                 column=column,
                 chunk_size=chunk_size,
                 predicate=predicate,
-            ),
-            extra_output_args=" -t ",
+            )
+        )
+
+    @classmethod
+    def vsql_get_key_range(cls, table, column, predicate=""):
+        """Executes the query to get the min, max and count of the partitioning column
+
+        Arguments:
+            table (str): The name of the table
+            column (str): The name of the partitioning column
+            predicate (str): The extra predicate to add the the query
+
+        Returns:
+            results ((str, str, int)): The min and max formatted the way vsql prints them, and the count
+        """
+        min_val, max_val, count = Execution.query_rows(
+            StatementCatalog.get_key_range(
+                schema_and_table=table, column=column, predicate=predicate
+            )
+        )[0]
+        return min_val, max_val, int(count or 0)
+
+    @classmethod
+    def vsql_get_date_histogram(cls, table, column, granularity="hour", predicate=""):
+        """Executes the query to count the rows per truncated date of a date column
+
+        Arguments:
+            table (str): The name of the table
+            column (str): The name of the date column
+            granularity (str): The unit of DATE_TRUNC, e.g. 'hour' or 'day'
+            predicate (str): The extra predicate to add the the query
+
+        Returns:
+            results (list[(str, int)]): The bucket formatted the way vsql prints it and its count, in order
+        """
+        return [
+            (bucket, int(count or 0))
+            for bucket, count in Execution.query_rows(
+                StatementCatalog.get_date_histogram(
+                    schema_and_table=table,
+                    column=column,
+                    granularity=granularity,
+                    predicate=predicate,
+                )
+            )
+        ]
+
+    @classmethod
+    def vsql_get_top_k_range(cls, table, column, k):
+        """Executes the query to get the min and max of the k highest values of the partitioning column
+
+        Arguments:
+            table (str): The name of the table
+            column (str): The name of the partitioning column
+            k (int): The amount of values
+
+        Returns:
+            results ((str, str)): The min and max formatted the way vsql prints them
+        """
+        min_val, max_val = Execution.query_rows(
+            StatementCatalog.get_top_k_range(schema_and_table=table, column=column, k=k)
+        )[0]
+        return min_val, max_val
+
+    @classmethod
+    def vsql_get_key_percentiles(cls, table, column, percentiles, predicate=""):
+        """Executes the query to get approximate percentiles of a numeric partitioning column
+
+        Arguments:
+            table (str): The name of the table
+            column (str): The name of the partitioning column
+            percentiles (list[float]): The percentiles between 0 and 1
+            predicate (str): The extra predicate to add the the query
+
+        Returns:
+            values (list[str]): One value per percentile formatted the way vsql prints them, empty if there are no rows
+        """
+        rows = Execution.query_rows(
+            StatementCatalog.get_key_percentiles(
+                schema_and_table=table,
+                column=column,
+                percentiles=percentiles,
+                predicate=predicate,
+            )
         )
+        return rows[0] if rows else []
 
-        return cli_result.decode().strip("\n\t ").split("\n")
+    @classmethod
+    def vsql_is_character_column(cls, table, column):
+        """Executes the query to check if a column of a table holds strings, e.g. a CHAR or VARCHAR
+
+        Arguments:
+            table (str): The name of the table in 'schema.table' format
+            column (str): The name of the column
+
+        Returns:
+            is_character (bool): If the column holds strings
+        """
+        return bool(
+            Execution.get_table_column_names(
+                schema_and_table=table,
+                extra_predicate=f"AND COLUMN_NAME ILIKE '{column}' AND DATA_TYPE ILIKE '%char%'",
+            )
+        )
 
     @classmethod
     def vsql_get_max_col_val(cls, table, column):
-        cli_result = Execution.vsql(
-            StatementCatalog.get_max_col_val(schema_and_table=table, column=column),
-            extra_output_args=" -t ",
+        return Execution.query_value(
+            StatementCatalog.get_max_col_val(schema_and_table=table, column=column)
         )
 
-        return cli_result.decode().strip("\n\t ")
+    @classmethod
+    def ybsql_get_max_col_val(cls, table, column):
+        """Returns the max of a column of a table in the target.
+
+        Arguments:
+            table (str): The name of the table in 'schema.table' format
+            column (str): The name of the column
+
+        Returns:
+            max_val (str): The max, or an empty string if the table has no rows with the column
+        """
+        return Execution.query_value(
+            StatementCatalog.get_max_col_val(schema_and_table=table, column=column),
+            Platform.YELLOWBRICK,
+        )
 
     @classmethod
     def vsql_get_sample_date_filter(
@@ -579,40 +1171,35 @@ class Execution:
 
         sample_size = sample_size + 1
 
-        cli_result = Execution.vsql(
+        min_val = Execution.query_value(
             StatementCatalog.get_test_where_clause(
                 schema_and_table=table,
                 column=part_col,
                 sample_size=sample_size,
                 date_filter=ConstantCatalog.DATE_FILTER(table),
                 date_col=ConstantCatalog.DATE_COL(table),
-            ),
-            extra_output_args=" -t ",
+            )
         )
 
-        min_val = cli_result.decode().strip("\n\t ")
-
         return min_val
 
     @classmethod
     def ybsql_truncate_tables(cls,):
-        cli_result = Execution.ybsql(StatementCatalog.truncate_tables(),)
-
-        return cli_result.decode().strip("\n\t ")
+        Execution.execute_statement(StatementCatalog.truncate_tables())
 
     @classmethod
     def ybsql_delete_date_range(cls, table, predicate):
-	"""Executes a delete query that will delete the records from the target before it is loaded
-	
-	Arguments:
-	    table (str): The name to delete from
-	    predicate (str): The where clause of the delete statement 
-	
-	Returns:
-	    None
-	"""
-	Execution.ybsql(StatementCatalog.delete_date_range(table, predicate),)
-	
+        """Executes a delete query that will delete the records from the target before it is loaded
+        
+        Arguments:
+            table (str): The name to delete from
+            predicate (str): The where clause of the delete statement 
+        
+        Returns:
+            None
+        """
+        Execution.execute_statement(StatementCatalog.delete_date_range(table, predicate))
+
     @classmethod
     def ybsql(cls, query, output_path="", field_delimiter=",", extra_output_args=""):
         ybsql = StatementCatalog.ybsql(
@@ -642,9 +1229,6 @@ class Execution:
             query (list[str]):  A list of column names 
         """
 
-        sql = ""
-        query_out = b""
-
         sql = StatementCatalog.select_columns_from_table(
             schema_and_table=schema_and_table,
             platform=platform,
@@ -652,26 +1236,33 @@ class Execution:
             data_type=data_type,
         )
 
-        if platform == Platform.VERTICA:
-            query_out = Execution.vsql(
-                query=sql, field_delimiter=",", extra_output_args=" -t "
-            )
-
-        elif platform == Platform.YELLOWBRICK:
-
-            query_out = Execution.ybsql(
-                query=sql, field_delimiter=",", extra_output_args=" -t "
-            )
-
-        return list(filter(lambda s: len(s) > 0, query_out.decode().split("\n"),))
+        return Execution._cached(
+            schema_and_table,
+            "column_names",
+            lambda: Execution.query_column(sql, platform),
+            params=f"{platform.name}{extra_predicate}",
+        )
 
     @classmethod
     def _execute(cls, cmd):
-        output = subprocess.check_output(cmd, shell=True, stderr=subprocess.STDOUT)
+        # bash for the $'' quoting, and pipefail so a failed vsql piped into a compression utility
+        # fails the command instead of leaving a truncated file
+        output = subprocess.check_output(
+            ["bash", "-o", "pipefail", "-c", cmd], stderr=subprocess.STDOUT
+        )
         return output
 
     @classmethod
-    def ybload(cls, table, input_path, extras="", field_delimiter=",", null_marker=""):
+    def ybload(
+        cls,
+        table,
+        input_path,
+        extras="",
+        field_delimiter=",",
+        null_marker="",
+        num_readers=None,
+        num_cores=None,
+    ):
         """Executes ybload with the supplied parameters
 
         Arguments:
@@ -680,6 +1271,8 @@ class Execution:
             extras (str): Any extra commanld line arguments to add to the defaults 
             fiel_delimiter (str): An optional field_delimiter argument 
             null_marker (str): An optional null_marker argument
+            num_readers (int): The readers of the load, None for YB_NUM_READERS
+            num_cores (int): The cores of the load, None for YB_NUM_CORES
             
         Returns:
             The bytes encoded object returned from the cli 
@@ -690,11 +1283,59 @@ class Execution:
             extras=extras,
             field_delimiter=field_delimiter,
             null_marker=null_marker,
+            num_cores=num_cores,
+            num_readers=num_readers,
         )
 
-        logger.log.debug(f"Execute YBLOAD: {ybload}")
+        Execution.get_logger().log.debug(f"Execute YBLOAD: {ybload}")
         return Execution._execute(ybload)
 
+    @classmethod
+    def ybload_process(
+        cls,
+        table,
+        input_path,
+        extras="",
+        field_delimiter=",",
+        null_marker="",
+        num_readers=None,
+        num_cores=None,
+        output=None,
+    ):
+        """Starts ybload with the supplied parameters without waiting for it, e.g. to read a named pipe
+            while it is being written
+
+        Arguments:
+            table (str): The name of the table to load (required)
+            input_path (str): The input path to load from (required)
+            extras (str): Any extra commanld line arguments to add to the defaults 
+            fiel_delimiter (str): An optional field_delimiter argument 
+            null_marker (str): An optional null_marker argument
+            num_readers (int): The readers of the load, None for YB_NUM_READERS
+            num_cores (int): The cores of the load, None for YB_NUM_CORES
+            output (file): The file the output of ybload goes to, None to discard it
+            
+        Returns:
+            process (Popen): The running ybload process
+        """
+        ybload = StatementCatalog.ybload(
+            table=table,
+            input_path=input_path,
+            extras=extras,
+            field_delimiter=field_delimiter,
+            null_marker=null_marker,
+            num_cores=num_cores,
+            num_readers=num_readers,
+        )
+
+        Execution.get_logger().log.debug(f"Start YBLOAD: {ybload}")
+        return subprocess.Popen(
+            ybload,
+            shell=True,
+            stdout=output or subprocess.DEVNULL,
+            stderr=subprocess.STDOUT,
+        )
+
 
 class ScriptCatalog:
     """Class for holding static methods that return bash scripts that this migration application will utilize
@@ -1,15 +1,24 @@
-import concurrent.futures
-import itertools
 import os
 from datetime import datetime
 from pathlib import Path
 
 from elysium_migration import Logger
 from elysium_migration.configuration.constants import ConstantCatalog
+from elysium_migration.migration.boundaries import BoundaryPlanner
+from elysium_migration.migration.compression import Codec
 from elysium_migration.migration.execute import Execution, StatementCatalog
+from elysium_migration.migration.extractor import Extractor
+from elysium_migration.migration.manifest import ExportManifest
+from elysium_migration.migration.sampling import Sampler
+from elysium_migration.migration.scheduler import ExportScheduler, ExportTask
+from elysium_migration.migration.streaming import StreamLoadTask
 from elysium_migration.migration.utility import MigrationUtility
 
 
+class ExportFailedError(Exception):
+    pass
+
+
 class Exporter:
     """
     Class for exporting database objects 
@@ -19,6 +28,18 @@ class Exporter:
         output_dir (Path): The parent directory to export the data to.
         script_dir (Path): The directory where the scripts will be during execution. 
         validation_results_dir (Path): After the process completes, the validtion results will be in this directory. 
+        pipeline (ChunkLoadPipeline): An optional pipeline that loads every exported file while the export is still running.
+        extractor (Extractor): The backend that executes the export queries. The default is set by EXPORT_EXTRACTOR.
+        codec (Codec): The codec every exported file is compressed with, None to not compress.
+        resume (bool): Whether to resume the run recorded in the manifest of the output directory.
+        sampler (Sampler): The strategy that finds the latest rows for a sample export. The default is set by EXPORT_SAMPLE_STRATEGY.
+        watermarks (WatermarkStore): The high-water marks of the tables when exporting incrementally, None otherwise.
+        table_stats (dict[str:TableStats]): Catalog snapshots that were already fetched, e.g. by the export of a previous day.
+            Tables that are missing from it are fetched and added to it.
+        disk_budget (DiskBudget): The budget of the exported files staged on disk, None to not bound them.
+            When pipelining, every loaded file is deleted and new chunks wait while the budget is used up.
+        stream (bool): Whether to stream every table into the target through named pipes, instead of the tables
+            in 'streamed_tables' of the config file. Only a pipelined export streams.
 
     Attributes:
         export_objects (list[str]): This is where we store the export_objects.
@@ -27,6 +48,17 @@ class Exporter:
         checksum_file_path (Path): The file path of the file with the yb_checksum commands.  
         val_sql_path (Path): This is the path of the directory where validation sql files will be stored.
         table_partition_col_map (dict[str:str]): This stores each table and its respective partitioning column.
+        pipeline (ChunkLoadPipeline): This is where the pipeline is stored, None when not pipelining.
+        extractor (Extractor): This is where the extractor is stored.
+        codec (Codec): This is where the codec is stored.
+        resume (bool): This is where the resume flag is stored.
+        manifest (ExportManifest): The manifest of the run, set when exporting.
+        sampler (Sampler): This is where the sampler is stored.
+        watermarks (WatermarkStore): This is where the watermarks are stored, None when not incremental.
+        table_stats (dict[str:TableStats]): This is where the catalog snapshots are stored.
+        disk_budget (DiskBudget): This is where the disk budget is stored, None when there is none.
+        stream (bool): This is where the stream flag is stored.
+        streamed_tables (set[str]): The tables from the config file whose chunks are streamed into the target.
 
 
     TODO: Abstract an interface per output system instead of just yellowbrick 
@@ -40,12 +72,56 @@ class Exporter:
             cls.logger = Logger(log_name=__name__)
         return cls.logger
     
-    def __init__(self, export_objects, output_dir: Path, script_dir):
+    def __init__(
+        self,
+        export_objects,
+        output_dir: Path,
+        script_dir,
+        pipeline=None,
+        extractor=None,
+        codec=None,
+        resume=False,
+        sampler=None,
+        watermarks=None,
+        table_stats=None,
+        disk_budget=None,
+        stream=False,
+    ):
         self.export_objects = export_objects
         self.output_dir = output_dir
         self.script_dir = script_dir
-        self.checksum_file_path = self._clear_checksum_file()
-        self.val_sql_path = self._clear_sql_val_path()
+        self.pipeline = pipeline
+        self.extractor = extractor or Extractor.from_name()
+        self.codec = codec
+        self.resume = resume
+        self.sampler = sampler or Sampler.from_name()
+        self.watermarks = watermarks
+        self.table_stats = {} if table_stats is None else table_stats
+        self.disk_budget = disk_budget
+        self.stream = stream
+        self.streamed_tables = set(self.export_objects.get("streamed_tables") or [])
+        self.manifest = None
+        if self.pipeline is not None:
+            self.pipeline.on_loaded = self._chunk_loaded
+            self.pipeline.on_failed = self._chunk_load_failed
+        elif self.disk_budget is not None:
+            Exporter.get_logger().log.warning(
+                "Only a pipelined export deletes loaded files. The disk budget only checks the free space."
+            )
+        if self.pipeline is None and (self.stream or self.streamed_tables):
+            Exporter.get_logger().log.warning(
+                "Only a pipelined export streams into the target. The streamed tables are exported to files."
+            )
+            self.stream = False
+            self.streamed_tables = set()
+
+        # a resumed run keeps the validation of the run it resumes
+        validation_dir = MigrationUtility.get_root_dir() / "migration" / "validation"
+        self.checksum_file_path = validation_dir / "scripts" / "yb_exec_checksum.sh"
+        self.val_sql_path = validation_dir / "queries"
+        if not resume:
+            self.checksum_file_path = self._clear_checksum_file()
+            self.val_sql_path = self._clear_sql_val_path()
 
     @property
     def table_partition_col_map(self):
@@ -60,7 +136,7 @@ class Exporter:
         }
         d.update({tbl: None for tbl in tbls if tbl not in d.keys()})
 
-        logger.log.debug(
+        Exporter.get_logger().log.debug(
             """Loaded the "Table"->"Partition Column" map from the configuration file:\n\t{vals}""".format(
                 vals="\n\t".join([k + ":" + str(v) for k, v in d.items()])
             )
@@ -68,11 +144,120 @@ class Exporter:
 
         return d
 
+    def boundary_planner(self, tbl, windowed=False):
+        """Returns the boundary planner of a table. The strategy can be set per table with
+            'boundary_strategies' in the config file, in form <schema>.<table>.<strategy>.
+            Every other table uses EXPORT_BOUNDARY_STRATEGY, or EXPORT_DATE_WINDOW_BOUNDARY_STRATEGY
+            when the export has a date window.
+
+        Arguments:
+            tbl (str): The name of the table in shcema.table format.
+            windowed (bool): Whether the export of the table has a date window.
+
+        Raises:
+            ValueError: If the strategy doesn't exist
+        Returns:
+            planner (BoundaryPlanner): The boundary planner of the table.
+        """
+        strategies = {
+            ".".join(s.split(".")[:2]): s.split(".")[2]
+            for s in self.export_objects.get("boundary_strategies") or []
+        }
+        default = (
+            ConstantCatalog.EXPORT_DATE_WINDOW_BOUNDARY_STRATEGY
+            if windowed
+            else ConstantCatalog.EXPORT_BOUNDARY_STRATEGY
+        )
+        return BoundaryPlanner.from_name(strategies.get(tbl, default))
+
+    def watermark_column(self, tbl, part_col):
+        """Returns the column of the high-water mark of a table. It can be set per table with
+            'watermark_columns' in the config file, in form <schema>.<table>.<column>.
+            Otherwise it is the DATE_COL of the table, or the partitioning column of the NO_DATE_TABLES.
+
+        Arguments:
+            tbl (str): The name of the table in shcema.table format.
+            part_col (str): The partition column, None if the table has none.
+
+        Raises:
+            None
+        Returns:
+            column (str): The watermark column, None if the table has none.
+        """
+        columns = {
+            ".".join(s.split(".")[:2]): s.split(".")[2]
+            for s in self.export_objects.get("watermark_columns") or []
+        }
+        if tbl in columns:
+            return columns[tbl]
+        if tbl in ConstantCatalog.NO_DATE_TABLES():
+            return part_col
+        return ConstantCatalog.DATE_COL(table=tbl)
+
+    def incremental_window(self, tbl, part_col, mark):
+        """Returns the predicate of the rows from the committed mark of a table, up to the current max of the
+            watermark column. The max is the mark the import commits, rows that come in during the export
+            are left for the next run. The rows at the mark are exported again, since rows with the same value
+            can commit after the mark was taken. They replace the rows at the mark in the target, through the
+            idempotent delete of the window or, without IDEMPOTENT_EXPORT, a delete of the rows at the mark.
+            A table without a committed mark gets the max of the column in the target as its first mark, so a
+            table that was already loaded isn't deleted and loaded again. Only an empty target is loaded whole.
+
+        Arguments:
+            tbl (str): The name of the table in shcema.table format.
+            part_col (str): The partition column, None if the table has none.
+            mark (str): The committed mark, None if nothing was loaded incrementally yet.
+
+        Raises:
+            ValueError: If the table has no watermark column
+        Returns:
+            results ((str, dict)): The predicate, and the column and value of the mark to commit after the import.
+                The value is None when there is nothing to commit.
+        """
+        column = self.watermark_column(tbl, part_col)
+        if not column:
+            raise ValueError(
+                f"{tbl} has no watermark column to export incrementally. Add it to 'watermark_columns' "
+                "of the config file, or export the table without --incremental."
+            )
+
+        target = Execution.vsql_get_max_col_val(table=tbl, column=column)
+        if target == "":
+            Exporter.get_logger().log.info(f"{tbl} has no rows with a {column}.")
+            return "1 = 0", {"column": column, "value": None}
+
+        if mark is None:
+            mark = Execution.ybsql_get_max_col_val(table=tbl, column=column) or None
+            if mark is not None:
+                Exporter.get_logger().log.warning(
+                    f"{tbl} has no committed watermark, seeding it with the max {column} = '{mark}' of the target. "
+                    f"Rows below it that are missing in the target are not exported, truncate the target table "
+                    f"before the first incremental export to load it whole."
+                )
+
+        predicate = f"{column} <= '{target}'"
+        if mark is not None:
+            predicate = f"{column} >= '{mark}' AND {predicate}"
+            if not ConstantCatalog.IDEMPOTENT_EXPORT:
+                Execution.ybsql_delete_date_range(
+                    table=tbl, predicate=f" AND {column} = '{mark}'"
+                )
+        Exporter.get_logger().log.info(
+            f"Exporting {tbl} incrementally from watermark {column} = '{mark}' to '{target}'."
+        )
+        return predicate, {"column": column, "value": target}
+
     def export_tables(
         self, sample_size=5000, validate=False, from_date=None, to_date=None
     ):
         """Export to the output directory, given the export type will determine the output dir structure
             Each subdirectory in the output directory will have th
+            Every table is planned into export tasks first, then all the tasks of all the tables
+            are run by one scheduler with a single worker budget, largest tasks first.
+            The planned tasks are recorded in the manifest of the run. When resuming a run with the same
+            parameters, nothing is planned or cleared and only the missing or failed chunks are exported.
+            When exporting incrementally, only the rows above the committed watermark of every table are exported,
+            and the marks to commit after the import are recorded in the manifest.
 
         Arguments:
             sample_size (int): This is the size of the sample if we just want to sample the latest date. 
@@ -82,7 +267,8 @@ class Exporter:
             to_date (str): A date string in ISO 8601 format that determins the maximum date.
 
         Raises:
-            None
+            ExportFailedError: If any of the export tasks failed
+            ValueError: If exporting incrementally with dates, or a table without a watermark column
         Returns:
             None
 
@@ -93,203 +279,370 @@ class Exporter:
         TODO: A more graceful class for predicate building other than string concatenation
         """
 
-        # The behavior will be a little different if there is no 'part_col' defined.
-        # There won't be a predicate at all, so there will be no 'min_val' either.
+        tbls_cols = self.table_partition_col_map
+        run = {
+            "from_date": from_date,
+            "to_date": to_date,
+            "sample_size": sample_size,
+            "tables": list(tbls_cols.keys()),
+        }
+        if self.watermarks is not None:
+            if from_date or to_date:
+                raise ValueError(
+                    "An incremental export takes the rows above the watermarks, it can't have dates."
+                )
+            missing = [
+                tbl
+                for tbl, part_col in tbls_cols.items()
+                if not self.watermark_column(tbl, part_col)
+            ]
+            if missing:
+                raise ValueError(
+                    f"{', '.join(missing)} have no watermark column to export incrementally. Add them to "
+                    "'watermark_columns' of the config file, or export them without --incremental."
+                )
+            run["watermarks"] = {
+                tbl: self.watermarks.get(tbl, self.watermark_column(tbl, part_col))
+                for tbl, part_col in tbls_cols.items()
+            }
+
+        if self.resume:
+            manifest = ExportManifest.load(self.output_dir)
+            if manifest is not None and manifest.matches(run):
+                self._resume(manifest)
+                return
+            Exporter.get_logger().log.warning(
+                f"There is no manifest of the same run in '{self.output_dir}' to resume. Exporting everything."
+            )
+            self.checksum_file_path = self._clear_checksum_file()
+            self.val_sql_path = self._clear_sql_val_path()
+
         MigrationUtility.clear_dir(self.output_dir)
-        tbls_cols = self.table_partition_col_map.items()
-        for tbl, part_col in tbls_cols:
-            before_export_table = datetime.now()
-            table_output_path = self.output_dir / tbl
-            MigrationUtility.clear_dir(table_output_path)
-
-            Exporter.get_logger().log.info(
-                f"Export beginning for {tbl} @ {before_export_table}."
+        if self.disk_budget is not None:
+            self.disk_budget.check_free_space()
+
+        # Sampling only moves a few thousand rows per table so the sizes don't matter there
+        table_stats = {}
+        if sample_size == 0:
+            table_stats = self.get_table_stats(list(tbls_cols.keys()))
+
+        tasks = []
+        for tbl, part_col in tbls_cols.items():
+            window_predicate = None
+            if self.watermarks is not None:
+                window_predicate, target = self.incremental_window(
+                    tbl, part_col, run["watermarks"][tbl]
+                )
+                run.setdefault("watermark_targets", {})[tbl] = target
+            tasks.extend(
+                self.plan_table(
+                    tbl=tbl,
+                    part_col=part_col,
+                    sample_size=sample_size,
+                    validate=validate,
+                    from_date=from_date,
+                    to_date=to_date,
+                    table_stats=table_stats.get(tbl),
+                    window_predicate=window_predicate,
+                )
             )
-            # if sample_size is > 0, then these values will stay blank for remainder
-            # of this function. sample_size of zero implies the whole table will be moved
-            min_val = predicate = order_by_col = ""
-            if sample_size > 0:
-                if part_col:
-                    min_val = Execution.vsql_get_sample_filter_val(
-                        table=tbl, part_col=part_col, sample_size=sample_size
-                    )
 
-                    max_val = Execution.vsql_get_max_col_val(table=tbl, column=part_col)
+        if ConstantCatalog.EXPORT_LARGEST_FIRST:
+            tasks = ExportScheduler.order_tasks(
+                tasks, pinned_tables=self.export_objects.get("pinned_tables")
+            )
 
-                    predicate = ConstantCatalog.YB_CHECK_SUM_PREDICATE(
-                        table=tbl, part_col=part_col, min_val=min_val, max_val=max_val
+        self.manifest = ExportManifest(self.output_dir, run)
+        self.manifest.add_tasks(tasks)
+        self._run_tasks(tasks)
+
+    def _resume(self, manifest):
+        """Exports the chunks of the manifest that are missing or failed. When pipelining, the chunks that
+            were exported but not loaded yet are verified and loaded first.
+
+        Arguments:
+            manifest (ExportManifest): The manifest of the run to resume.
+
+        Raises:
+            ExportFailedError: If any of the export tasks failed
+        Returns:
+            None
+        """
+        self.manifest = manifest
+        Exporter.get_logger().log.info(
+            f"Resuming the export in '{self.output_dir}'. Chunks per status: {manifest.summary()}."
+        )
+        if self.disk_budget is not None:
+            self.disk_budget.check_free_space()
+
+        if self.pipeline is not None:
+            verified = []
+            for task in manifest.unloaded_tasks():
+                problem = manifest.verify(task.output_path)
+                if problem is None:
+                    verified.append(task)
+                else:
+                    Exporter.get_logger().log.warning(
+                        f"Exporting '{task.output_path}' again, the file {problem}."
                     )
+                    manifest.mark_failed(task, problem)
+            # the files are on disk already, they are counted before any of them is loaded and released
+            if self.disk_budget is not None:
+                self.disk_budget.staged(sum(task.output_bytes() for task in verified))
+            for task in verified:
+                self.pipeline.submit(task.table, task.output_path)
 
-                    order_by_col = part_col
+        self._run_tasks(manifest.pending_tasks())
 
-                    if validate:
-                        self._write_checksum_command(
-                            tbl=tbl,
-                            part_col=part_col,
-                            sample_max_val=max_val,
-                            sample_min_val=min_val,
-                        )
+    def get_table_stats(self, tables):
+        """Fetches the rows and size of every table up front, with a single catalog snapshot query.
+            Only the tables that aren't in the snapshots of this exporter yet are queried.
 
-                Execution.vsql(
-                    StatementCatalog.select_from_table(
-                        schema_and_table=tbl,
-                        predicate=predicate,
-                        col_order_by_desc=order_by_col,
-                    ),
-                    output_path=f"{str(table_output_path)}/0.{ConstantCatalog.DATA_FILES_EXTENSION}",
-                    field_delimiter=r"\t",
-                )
+        Arguments:
+            tables (list[str]): The names of the tables in shcema.table format.
 
-            elif to_date or from_date:
-                table_size_mb = Execution.vsql_get_table_size_mb(table=tbl)
-                date_col = ConstantCatalog.DATE_COL(table=tbl)
-                no_date_tables = ConstantCatalog.NO_DATE_TABLES()
-
-                weeks_in_window = -1
-                if tbl in no_date_tables:
-                    predicate = ""
-                elif all([to_date, from_date]):
-                    predicate = (
-                        f"{date_col} >= '{from_date}' AND {date_col} < '{to_date}'"
-                    )
-                    fmt_str = "%Y-%m-%d %H:%M:%S"
-                    window = datetime.strptime(to_date, fmt_str) - datetime.strptime(
-                        from_date, fmt_str
-                    )
-                    weeks_in_window = window.total_seconds() / 60 / 60 / 24 / 7
-                elif not to_date:
-                    predicate = f"{date_col} >= '{from_date}'"
-                else:
-                    predicate = f"{date_col} < '{to_date}'"
+        Raises:
+            None
+        Returns:
+            table_stats (dict[str:TableStats]): The planning data of each table.
+        """
+        missing = [tbl for tbl in tables if tbl not in self.table_stats]
+        if not missing:
+            return {tbl: self.table_stats[tbl] for tbl in tables}
 
-                Exporter.get_logger().log.debug(
-                    f"{tbl} predicate based on user provided input dates: '{predicate}'."
+        before_snapshot = datetime.now()
+        table_stats = Execution.vsql_get_catalog_snapshot(missing)
+
+        Exporter.get_logger().log.debug(
+            """Fetched the catalog snapshot in {diff}:\n\t{vals}""".format(
+                diff=datetime.now() - before_snapshot,
+                vals="\n\t".join(
+                    f"{k}: {int(v.size_mb)} mb, {v.rows} rows, {int(v.avg_row_bytes)} bytes per row"
+                    for k, v in table_stats.items()
+                ),
+            )
+        )
+        self.table_stats.update(table_stats)
+        return {tbl: self.table_stats[tbl] for tbl in tables if tbl in self.table_stats}
+
+    def plan_table(
+        self,
+        tbl,
+        part_col,
+        sample_size=0,
+        validate=False,
+        from_date=None,
+        to_date=None,
+        table_stats=None,
+        window_predicate=None,
+    ):
+        """Plans the export of one table into export tasks. Nothing is exported here, but the target
+            date range is deleted when exporting idempotently and the checksum commands are written.
+
+        Arguments:
+            tbl (str): The name of the table in shcema.table format.
+            part_col (str): The partition column, None if the table has none.
+            sample_size (int): This is the size of the sample if we just want to sample the latest date. 
+            validate (bool): flag for whether or not to do validation.
+            from_date (str): A date string in ISO 8601 format that determins the minimum date.
+            to_date (str): A date string in ISO 8601 format that determins the maximum date.
+            table_stats (TableStats): The catalog snapshot of the table if it was already fetched.
+            window_predicate (str): The predicate of the rows to export, used instead of the dates, e.g. of an incremental export.
+
+        Raises:
+            None
+        Returns:
+            tasks (list[ExportTask]): The tasks that export the table.
+        """
+        table_output_path = self.output_dir / tbl
+        MigrationUtility.clear_dir(table_output_path)
+
+        Exporter.get_logger().log.info(f"Planning export for {tbl}.")
+
+        # The behavior will be a little different if there is no 'part_col' defined.
+        # There won't be a predicate at all, so there will be no 'min_val' either.
+        # if sample_size is > 0, then these values will stay blank for remainder
+        # of this function. sample_size of zero implies the whole table will be moved
+        min_val = predicate = order_by_col = ""
+        if sample_size > 0:
+            if part_col:
+                min_val, max_val = self.sampler.sample(
+                    table=tbl, column=part_col, sample_size=sample_size
                 )
-                
-                # This delete statement makes the load idempotent
-                if ConstantCatalog.IDEMPOTENT_EXPORT:
-                    Execution.ybsql_delete_date_range(
-                        table=tbl, predicate=f" AND {predicate}"
-                    )
-                
-                # Dont need to break up the data in chunks if it is just a small table.
-                # Check and see if table is not over either 10GB and window is 2 years or less
-                # OR if table is just under 2 GB. This is just a roough estimate
-                if (
-                    (
-                        int(table_size_mb)
-                        < ConstantCatalog.EXPORT_TABLE_WITH_WINDOW_THRESHOLD_MB
-                        and (
-                            weeks_in_window < ConstantCatalog.EXPORT_WEEKS_WINDOW
-                            and weeks_in_window > 0
-                        )
-                    ) 
-                    or (
-                        int(table_size_mb) 
-                        < ConstantCatalog.EXPORT_WHOLE_TABLE_THRESHOLD_MB
-                    ) 
-                    or ( ConstantCatalog.EXPORT_AS_CHUNKS_FLAG == False )
-                ):
-                    Exporter.get_logger().log.debug(
-                        f"""{tbl} not chunking becasue mb size is only {table_size_mb} and the date range is '{'Not Set' if weeks_in_window == -1 else str(weeks_in_window)}' weeks.
-                        EXPORT_AS_CHUNKS_FLAG has been set to '{ConstantCatalog.EXPORT_AS_CHUNKS_FLAG}'."""
-                    )
-                    
-                    if ConstantCatalog.EXPORT_COMPRESSED == True:
-                        Execution.vsql(
-                            StatementCatalog.select_from_table(
-                                schema_and_table=tbl,predicate=f" AND {predicate}"
-                            ),
-                            output_path=f"{table_output_path}/0.{ConstantCatalog.DATA_FILES_EXTENSION}.{ConstantCatalog.DATA_COMPRESS_EXTENSION}",
-                            field_delimiter=r"\t",
-                            compressed=True,
-                        )
-                    else:
-                    
-                        Execution.vsql(
-                            StatementCatalog.select_from_table(
-                                schema_and_table=tbl,
-                                predicate=predicate,
-                                col_order_by_desc=order_by_col,
-                            ),
-                            output_path=f"{table_output_path}/0.{ConstantCatalog.DATA_FILES_EXTENSION}",
-                            field_delimiter=r"\t",
-                        )
-                else:
-                    Exporter.get_logger().log.debug(
-                        f"{tbl} is chunking because the data mb is too big '{table_size_mb}' and the date range is '{'Not Set' if weeks_in_window == -1 else str(weeks_in_window)}' weeks."
-                    )
-                    chunk_size = Execution.vsql_get_chunk_size(table=tbl)
-                    Exporter.get_logger().log.debug(
-                        f"Each {tbl} file will have a chunk of '{chunk_size}' records."
-                    )
-                    where_clauses = Execution.vsql_get_chunk_where_clauses(
-                        table=tbl,
-                        column=part_col,
-                        chunk_size=chunk_size,
-                        predicate=f" AND {predicate}",
-                    )
 
-                    date_filtered_where_clauses = [
-                        clause + " AND " + predicate for clause in where_clauses
-                    ]
-                    numbered_clauses = zip(
-                        range(len(where_clauses)), date_filtered_where_clauses
-                    )
-                    total_rows = int(chunk_size) * len(where_clauses)
-                    Exporter.get_logger().log.debug(
-                        f"""Up to {total_rows} {tbl} rows to export. Date window = "{predicate or 'None'}"."""
-                    )
-                    
-                    self.parallelize_table_export(
-                        numbered_clauses=numbered_clauses,
-                        schema_and_table=tbl,
-                        output_path=str(table_output_path),
-                    )
+                predicate = ConstantCatalog.YB_CHECK_SUM_PREDICATE(
+                    table=tbl, part_col=part_col, min_val=min_val, max_val=max_val
+                )
+
+                order_by_col = part_col
 
                 if validate:
                     self._write_checksum_command(
-                        tbl=tbl, part_col=part_col, extra_predicate=predicate
+                        tbl=tbl,
+                        part_col=part_col,
+                        sample_max_val=max_val,
+                        sample_min_val=min_val,
                     )
 
-            # if sample size is zero, then move the whole table
+            return [
+                ExportTask(
+                    table=tbl,
+                    query=StatementCatalog.select_from_table(
+                        schema_and_table=tbl,
+                        predicate=predicate,
+                        col_order_by_desc=order_by_col,
+                    ),
+                    output_path=f"{table_output_path}/{Codec.file_name(0, self.codec)}",
+                    codec=self.codec,
+                )
+            ]
+
+        if table_stats is None:
+            table_stats = Execution.vsql_get_catalog_snapshot([tbl])[tbl]
+        table_size_mb = int(table_stats.size_mb)
+
+        if window_predicate is not None or to_date or from_date:
+            date_col = ConstantCatalog.DATE_COL(table=tbl)
+            no_date_tables = ConstantCatalog.NO_DATE_TABLES()
+
+            weeks_in_window = -1
+            if window_predicate is not None:
+                predicate = window_predicate
+            elif tbl in no_date_tables:
+                predicate = ""
+            elif all([to_date, from_date]):
+                predicate = (
+                    f"{date_col} >= '{from_date}' AND {date_col} < '{to_date}'"
+                )
+                fmt_str = "%Y-%m-%d %H:%M:%S"
+                window = datetime.strptime(to_date, fmt_str) - datetime.strptime(
+                    from_date, fmt_str
+                )
+                weeks_in_window = window.total_seconds() / 60 / 60 / 24 / 7
+            elif not to_date:
+                predicate = f"{date_col} >= '{from_date}'"
             else:
-                chunk_size = Execution.vsql_get_chunk_size(table=tbl)
-                where_clauses = Execution.vsql_get_chunk_where_clauses(
-                    table=tbl, column=column, chunk_size=chunk_size
+                predicate = f"{date_col} < '{to_date}'"
+
+            Exporter.get_logger().log.debug(
+                f"{tbl} predicate based on user provided input dates or the watermark: '{predicate}'."
+            )
+            
+            # This delete statement makes the load idempotent
+            if ConstantCatalog.IDEMPOTENT_EXPORT:
+                Execution.ybsql_delete_date_range(
+                    table=tbl, predicate=f" AND {predicate}"
                 )
-                numbered_clauses = zip(range(len(where_clauses)), where_clauses)
-                table_size_mb = Execution.vsql_get_table_size_mb(table=tbl)
-
-                # if table is less than two gigabyte, really no need to break it up into chunks
-                # there is no need to apply any where filter either
-                if int(table_size_mb) < ConstantCatalog.EXPORT_WHOLE_TABLE_THRESHOLD_MB:
-                    Execution.vsql(
-                        StatementCatalog.select_from_table(
+
+            if validate:
+                self._write_checksum_command(
+                    tbl=tbl, part_col=part_col, extra_predicate=predicate
+                )
+            
+            # Dont need to break up the data in chunks if it is just a small table.
+            # Check and see if table is not over either 10GB and window is 2 years or less
+            # OR if table is just under 2 GB. This is just a roough estimate
+            if (
+                (
+                    int(table_size_mb)
+                    < ConstantCatalog.EXPORT_TABLE_WITH_WINDOW_THRESHOLD_MB
+                    and (
+                        weeks_in_window < ConstantCatalog.EXPORT_WEEKS_WINDOW
+                        and weeks_in_window > 0
+                    )
+                ) 
+                or (
+                    int(table_size_mb) 
+                    < ConstantCatalog.EXPORT_WHOLE_TABLE_THRESHOLD_MB
+                ) 
+                or ( ConstantCatalog.EXPORT_AS_CHUNKS_FLAG == False )
+            ):
+                Exporter.get_logger().log.debug(
+                    f"""{tbl} not chunking becasue mb size is only {table_size_mb} and the date range is '{'Not Set' if weeks_in_window == -1 else str(weeks_in_window)}' weeks.
+                    EXPORT_AS_CHUNKS_FLAG has been set to '{ConstantCatalog.EXPORT_AS_CHUNKS_FLAG}'."""
+                )
+                
+                return [
+                    ExportTask(
+                        table=tbl,
+                        query=StatementCatalog.select_from_table(
                             schema_and_table=tbl,
                             predicate=predicate,
                             col_order_by_desc=order_by_col,
                         ),
-                        output_path=f"{str(table_output_path)}/0.{ConstantCatalog.DATA_FILES_EXTENSION}",
-                        field_delimiter=r"\t",
+                        output_path=f"{table_output_path}/{Codec.file_name(0, self.codec)}",
+                        codec=self.codec,
+                        estimated_mb=int(table_size_mb),
+                        roll_mb=ConstantCatalog.EXPORT_ROLL_FILE_MB,
                     )
+                ]
 
-                else:
-                    Exporter.get_logger().log.debug(f"""All {tbl} rows being exported.""")
-                    self.parallelize_table_export(
-                        numbered_clauses=numbered_clauses,
-                        schema_and_table=tbl,
-                        output_path=str(table_output_path),
-                    )
+            Exporter.get_logger().log.debug(
+                f"{tbl} is chunking because the data mb is too big '{table_size_mb}' and the date range is '{'Not Set' if weeks_in_window == -1 else str(weeks_in_window)}' weeks."
+            )
+            chunk_size = self._chunk_size(tbl, table_stats)
+            Exporter.get_logger().log.debug(
+                f"Each {tbl} file will have a chunk of '{chunk_size}' records."
+            )
+            where_clauses = self.boundary_planner(tbl, windowed=True).plan(
+                table=tbl,
+                column=part_col,
+                chunk_size=chunk_size,
+                predicate=f" AND {predicate}",
+            )
 
-                if validate:
-                    self._write_checksum_command(tbl=tbl, part_col=part_col)
+            date_filtered_where_clauses = [
+                clause + " AND " + predicate for clause in where_clauses
+            ]
+            total_rows = int(chunk_size) * len(where_clauses)
+            Exporter.get_logger().log.debug(
+                f"""Up to {total_rows} {tbl} rows to export. Date window = "{predicate or 'None'}"."""
+            )
 
-            export_time = datetime.now() - before_export_table
-            Exporter.get_logger().log.info(
-                f"Table {tbl} export finished. Time elapsed: {export_time}."
+            return self._chunk_tasks(
+                schema_and_table=tbl,
+                output_path=str(table_output_path),
+                numbered_clauses=enumerate(date_filtered_where_clauses),
+                table_size_mb=int(table_size_mb),
             )
 
+        # if sample size is zero, then move the whole table
+        if validate:
+            self._write_checksum_command(tbl=tbl, part_col=part_col)
+
+        # if table is less than two gigabyte, really no need to break it up into chunks
+        # there is no need to apply any where filter either
+        if (
+            int(table_size_mb) < ConstantCatalog.EXPORT_WHOLE_TABLE_THRESHOLD_MB
+            or not part_col
+        ):
+            return [
+                ExportTask(
+                    table=tbl,
+                    query=StatementCatalog.select_from_table(
+                        schema_and_table=tbl,
+                        predicate=predicate,
+                        col_order_by_desc=order_by_col,
+                    ),
+                    output_path=f"{table_output_path}/{Codec.file_name(0, self.codec)}",
+                    codec=self.codec,
+                    estimated_mb=int(table_size_mb),
+                    roll_mb=ConstantCatalog.EXPORT_ROLL_FILE_MB,
+                )
+            ]
+
+        Exporter.get_logger().log.debug(f"""All {tbl} rows being exported.""")
+        chunk_size = self._chunk_size(tbl, table_stats)
+        where_clauses = self.boundary_planner(tbl).plan(
+            table=tbl, column=part_col, chunk_size=chunk_size
+        )
+        return self._chunk_tasks(
+            schema_and_table=tbl,
+            output_path=str(table_output_path),
+            numbered_clauses=enumerate(where_clauses),
+            table_size_mb=int(table_size_mb),
+        )
+
     def parallelize_table_export(self, numbered_clauses, schema_and_table, output_path):
         """Distributes the extraction of data to other threads. Keeps the worker pool full of threads.
 
@@ -300,63 +653,138 @@ class Exporter:
             output_path (str): output_path fo files in str ISO 8601 format
 
         Raises:
-            IOException
+            ExportFailedError: If any of the chunks failed to export
         Returns:
             None
         """
-        before_export_time = datetime.now()
-        with concurrent.futures.ThreadPoolExecutor(os.cpu_count() * 2) as executor:
+        self._run_tasks(
+            self._chunk_tasks(
+                schema_and_table=schema_and_table,
+                output_path=output_path,
+                numbered_clauses=numbered_clauses,
+            )
+        )
 
-            # Schedule the first N futures. We don't want to schedule them all
-            # at once, to avoid consuming excessive amounts of memory
+    def _chunk_tasks(
+        self, schema_and_table, output_path, numbered_clauses, table_size_mb=0
+    ):
+        """Creates one export task per WHERE clause.
 
-            futures = {
-                executor.submit(
-                    Execution.vsql,
-                    StatementCatalog.select_from_table(
-                        schema_and_table, predicate=predicate
-                    ),
-                    f"{output_path}/{str(id)}.{ConstantCatalog.DATA_FILES_EXTENSION}",
-                    r"\t",
-                    "",
-                )
-                for id, predicate in itertools.islice(
-                    numbered_clauses, os.cpu_count() * 2
-                )
-            }
+        Arguments:
+            schema_and_table (str): The name of the table in shcema.table format.
+            output_path (str): The directory of the files.
+            numbered_clauses (list[(int, string)]): This has an int for numbering the files and a string
+                which is the WHERE clause of the query.
+            table_size_mb (int): The size of the table, spread evenly over the chunks as their estimate.
 
-            while futures:
-                done, futures = concurrent.futures.wait(
-                    futures, return_when=concurrent.futures.FIRST_COMPLETED
-                )
+        Raises:
+            None
+        Returns:
+            tasks (list[ExportTask]): One task per chunk.
+        """
+        numbered_clauses = list(numbered_clauses)
+        chunk_mb = table_size_mb / max(len(numbered_clauses), 1)
+        return [
+            ExportTask(
+                table=schema_and_table,
+                query=StatementCatalog.select_from_table(
+                    schema_and_table, predicate=predicate
+                ),
+                output_path=f"{output_path}/{Codec.file_name(id, self.codec)}",
+                codec=self.codec,
+                estimated_mb=chunk_mb,
+            )
+            for id, predicate in numbered_clauses
+        ]
 
-                for fut in done:
-                    try:
-                        after_table_export_time = datetime.now()
-                        diff = after_table_export_time - before_export_time
-                        Exporter.get_logger().log.debug(
-                            f"An export completed for {schema_and_table}. Total Time elapsed: {diff}."
-                        )
-                    except Exception as e:
-                        Exporter.get_logger().log.error(e)
-
-                for id, predicate in itertools.islice(numbered_clauses, len(done)):
-                    futures.add(
-                        executor.submit(
-                            Execution.vsql,
-                            StatementCatalog.select_from_table(
-                                schema_and_table, predicate=predicate
-                            ),
-                            f"{output_path}/{str(id)}.{ConstantCatalog.DATA_FILES_EXTENSION}",
-                            r"\t",
-                            "",
-                        )
-                    )
-        after_whole_export_time = datetime.now()
-        diff = after_whole_export_time - before_export_time
-        Exporter.get_logger().log.debug(
-            f"Entire export completed for {schema_and_table}. Total Time elapsed: {diff}."
+    def _chunk_size(self, tbl, table_stats):
+        """The amount of rows per chunk file, from the catalog snapshot when it has the row count.
+
+        Arguments:
+            tbl (str): The name of the table in shcema.table format.
+            table_stats (TableStats): The catalog snapshot of the table.
+
+        Raises:
+            None
+        Returns:
+            chunk_size (int): The amount of rows per file.
+        """
+        chunk_size = table_stats.chunk_size()
+        if chunk_size <= 0:
+            chunk_size = Execution.vsql_get_chunk_size(table=tbl)
+        return chunk_size
+
+    def _run_tasks(self, tasks):
+        """Runs the export tasks on the scheduler.
+
+        Arguments:
+            tasks (list[ExportTask]): The tasks to run.
+
+        Raises:
+            ExportFailedError: If any of the tasks failed
+        Returns:
+            None
+        """
+        tasks = [
+            StreamLoadTask.of(
+                task,
+                self.pipeline.importer.load_log_file_path,
+                self.pipeline.importer.load_tuner,
+            )
+            if self.stream or task.table in self.streamed_tables
+            else task
+            for task in tasks
+        ]
+        scheduler = ExportScheduler(
+            on_complete=self._task_exported,
+            extractor=self.extractor,
+            disk_budget=self.disk_budget if self.pipeline is not None else None,
         )
+        failed = scheduler.run(tasks)
+        if self.manifest is not None:
+            for task, e in failed:
+                self.manifest.mark_failed(task, e)
+        if failed:
+            raise ExportFailedError(
+                "Failed to export: "
+                + ", ".join(f"{task.table} '{task.output_path}' ({e})" for task, e in failed)
+            )
+
+    def _task_exported(self, task):
+        """Records a finished export file in the manifest, and hands it to the pipeline when pipelining.
+            A streamed chunk is recorded as loaded.
+
+        Arguments:
+            task (ExportTask): The task that finished.
+        Raises:
+            None
+        Returns:
+            None
+        """
+        if isinstance(task, StreamLoadTask):
+            # the chunk was loaded while it was exported
+            if self.manifest is not None:
+                self.manifest.mark_loaded(task.table, task.output_path)
+            return
+        if self.manifest is not None:
+            self.manifest.mark_exported(task)
+        if self.pipeline is not None:
+            for path in task.output_paths():
+                self.pipeline.submit(task.table, path)
+
+    def _chunk_loaded(self, schema_table, file_path):
+        if self.manifest is not None:
+            self.manifest.mark_loaded(schema_table, file_path)
+        if self.disk_budget is not None:
+            # a loaded chunk is never exported again, the manifest keeps its digest
+            num_bytes = os.path.getsize(file_path)
+            os.remove(file_path)
+            self.disk_budget.release(num_bytes)
+
+    def _chunk_load_failed(self, schema_table, file_path):
+        # the file is kept for a resume, but the exports must not wait on it
+        if self.disk_budget is not None:
+            self.disk_budget.release(os.path.getsize(file_path))
 
     def _clear_checksum_file(self):
         """Clears the path for the checksum file.
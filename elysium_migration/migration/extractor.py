@@ -0,0 +1,350 @@
+import concurrent.futures
+import os
+import threading
+import time
+from datetime import datetime
+
+from elysium_migration import Logger
+from elysium_migration.configuration import Platform
+from elysium_migration.configuration.connect.pool import ConnectionPool
+from elysium_migration.configuration.constants import ConstantCatalog
+from elysium_migration.migration.compression import BlockCompressor, FileWriter, RollingWriter
+from elysium_migration.migration.execute import Execution
+
+
+class Extractor:
+    """
+    This class is an interface for the backends that run an export query and write the result to a file
+
+    Args:
+        None
+
+    Attributes:
+        None
+    """
+
+    logger = None
+
+    @classmethod
+    def get_logger(cls):
+        if cls.logger is None:
+            cls.logger = Logger(log_name=__name__)
+        return cls.logger
+
+    @staticmethod
+    def from_name(name=ConstantCatalog.EXPORT_EXTRACTOR):
+        """Returns the extractor backend for the given name
+
+        Arguments:
+            name (str): Either 'vsql' or 'odbc'
+
+        Raises:
+            ValueError: If there is no backend with that name
+        Returns:
+            extractor (Extractor): The extractor backend
+        """
+        if name == "vsql":
+            return VsqlExtractor()
+        elif name == "odbc":
+            return OdbcExtractor()
+        raise ValueError(f"Unknown extractor '{name}'. Valid extractors are: vsql, odbc")
+
+    def extract(self, query, output_path, field_delimiter=r"\t", codec=None, table=None):
+        """Executes the query and writes the result to the output path. Returns the ChunkDigest of the file,
+        taken while it was written, or None when the data didn't go through the process."""
+        raise NotImplementedError
+
+    def stream(self, query, write, field_delimiter=r"\t", table=None):
+        """Executes the query and hands the result to `write` while it is still running"""
+        raise NotImplementedError
+
+    def extract_rolling(
+        self, query, path_of, roll_bytes, field_delimiter=r"\t", codec=None, table=None
+    ):
+        """Executes the query once and rolls the result over into files of about roll_bytes each,
+            every file with the header line
+
+        Arguments:
+            query (str): The query for vertica
+            path_of (callable): Returns the path of the file with the given number, starting at 0
+            roll_bytes (int): The amount of uncompressed bytes per file
+            field_delimiter (str): The delimiter used to seperated fields
+            codec (Codec): The codec to compress the files with, None to not compress
+            table (str): The table of the query, for the throttle
+
+        Raises:
+            Exception: Any error of the query or of writing the files
+        Returns:
+            parts (list[(str, ChunkDigest)]): The path and digest of every file written, in order
+        """
+        before_extract = datetime.now()
+        with RollingWriter(
+            path_of, roll_bytes, codec, self._compression_executor()
+        ) as writer:
+            self.stream(query, writer.write, field_delimiter=field_delimiter, table=table)
+
+        Extractor.get_logger().log.debug(
+            f"Extracted {writer.bytes_in} bytes to {len(writer.paths)} files. Time elapsed: {datetime.now() - before_extract}."
+        )
+        return list(zip(writer.paths, writer.digests))
+
+    def close(self):
+        pass
+
+    def _compression_executor(self):
+        return None
+
+
+class VsqlExtractor(Extractor):
+    """
+    Extractor that runs one vsql process per query. Compressed output is compressed in process, in blocks
+    on a thread pool shared by every query, instead of piping each query into a single threaded utility.
+
+    Args:
+        block_compression (bool): Whether to compress in process. Otherwise vsql is piped into the codec utility,
+            unless the export has a bytes limit. Such an export is always streamed and compressed in process.
+        compression_threads (int): The size of the shared compression thread pool. 0 means the cpu count.
+
+    Attributes:
+        block_compression (bool): This is where we store the block_compression flag.
+        compression_threads (int): This is where we store the compression_threads.
+    """
+
+    def __init__(
+        self,
+        block_compression=ConstantCatalog.EXPORT_BLOCK_COMPRESSION,
+        compression_threads=ConstantCatalog.EXPORT_COMPRESSION_THREADS,
+    ):
+        self.block_compression = block_compression
+        self.compression_threads = compression_threads or os.cpu_count()
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def extract(
+        self, query, output_path, field_delimiter=r"\t", codec=None, table=None
+    ):
+        """Executes the query with vsql and writes the result to the output path
+
+        Arguments:
+            query (str): The query for vertica
+            output_path (str): The path of the file where the data will go
+            field_delimiter (str): The delimiter used to seperated fields
+            codec (Codec): The codec to compress the output with, None to not compress
+            table (str): The table of the query, for the throttle
+
+        Raises:
+            CalledProcessError: If vsql exits with a non zero status
+        Returns:
+            digest (ChunkDigest): The digest of the file, None when vsql wrote it
+        """
+        # an export with a bytes limit is streamed, so its bytes are throttled while vsql sends them
+        throttle = Execution.throttle_of()
+        throttled = throttle is not None and throttle.limits_bytes(table)
+        if not throttled and (codec is None or not self.block_compression):
+            Execution.vsql(
+                query,
+                output_path=output_path,
+                field_delimiter=field_delimiter,
+                codec=codec,
+                table=table,
+            )
+            return None
+
+        before_extract = datetime.now()
+        if codec is None:
+            with FileWriter(output_path) as writer:
+                Execution.vsql_stream(
+                    query, write=writer.write, field_delimiter=field_delimiter, table=table
+                )
+            Extractor.get_logger().log.debug(
+                f"Extracted {writer.bytes_in} bytes to '{output_path}'. Time elapsed: {datetime.now() - before_extract}."
+            )
+            return writer.digest()
+
+        with BlockCompressor(codec, output_path, self._pool()) as compressor:
+            Execution.vsql_stream(
+                query,
+                write=compressor.write,
+                field_delimiter=field_delimiter,
+                table=table,
+            )
+
+        Extractor.get_logger().log.debug(
+            f"Extracted {compressor.bytes_in} bytes to '{output_path}', {compressor.bytes_out} bytes compressed. Time elapsed: {datetime.now() - before_extract}."
+        )
+        return compressor.digest()
+
+    def stream(self, query, write, field_delimiter=r"\t", table=None):
+        Execution.vsql_stream(
+            query, write=write, field_delimiter=field_delimiter, table=table
+        )
+
+    def close(self):
+        """Stops the compression thread pool
+
+        Arguments:
+            None
+        Raises:
+            None
+        Returns:
+            None
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _compression_executor(self):
+        if not self.block_compression:
+            return None
+        return self._pool()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    self.compression_threads
+                )
+            return self._executor
+
+
+class OdbcExtractor(Extractor):
+    """
+    Extractor that streams the result of the query in batches of `fetchmany` over pooled ODBC connections,
+    instead of paying a process startup and a new login for each query.
+    The output has the same layout as `vsql -A` - a header line, delimited fields and empty strings for NULLs.
+
+    Args:
+        connect (callable): Returns a new DB-API connection. The default is a pyodbc connection to vertica.
+        batch_size (int): The amount of rows per `fetchmany`.
+        max_connections (int): The size of the connection pool. 0 means twice the cpu count, like the scheduler.
+
+    Attributes:
+        pool (ConnectionPool): The pool of the connections used for extraction.
+        batch_size (int): This is where we store the batch_size.
+    """
+
+    def __init__(
+        self,
+        connect=None,
+        batch_size=ConstantCatalog.EXPORT_FETCH_BATCH_SIZE,
+        max_connections=ConstantCatalog.EXPORT_MAX_WORKERS,
+    ):
+        self.pool = ConnectionPool(
+            connect=connect or ConnectionPool.platform_connect(Platform.VERTICA),
+            max_size=max_connections or os.cpu_count() * 2,
+        )
+        self.batch_size = batch_size
+
+    def extract(
+        self, query, output_path, field_delimiter=r"\t", codec=None, table=None
+    ):
+        """Executes the query and streams the result to the output path
+
+        Arguments:
+            query (str): The query for vertica
+            output_path (str): The path of the file where the data will go
+            field_delimiter (str): The delimiter used to seperated fields
+            codec (Codec): The codec to compress the output with, None to not compress
+            table (str): The table of the query, for the throttle
+
+        Raises:
+            Error: Any DB-API error of the query
+        Returns:
+            digest (ChunkDigest): The size, rows and crc32 of the file
+        """
+        # the vsql backend gets the delimiter as a bash $'' string
+        delimiter = field_delimiter.encode().decode("unicode_escape")
+        before_extract = datetime.now()
+
+        with Execution.throttled(table), self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                before_query = time.monotonic()
+                cursor.execute(query)
+                # execute returns once the query runs, after any time in the queue of the resource pool
+                Execution.first_byte(time.monotonic() - before_query)
+                digest = self._write(cursor, output_path, delimiter, codec, table)
+            finally:
+                cursor.close()
+
+        Extractor.get_logger().log.debug(
+            f"Extracted {digest.rows} rows to '{output_path}'. Time elapsed: {datetime.now() - before_extract}."
+        )
+        return digest
+
+    def stream(self, query, write, field_delimiter=r"\t", table=None):
+        """Executes the query and hands the result to `write` in batches, in the layout of `extract`
+
+        Arguments:
+            query (str): The query for vertica
+            write (callable): Called with the bytes of the header line and of every batch
+            field_delimiter (str): The delimiter used to seperated fields
+            table (str): The table of the query, for the throttle
+
+        Raises:
+            Error: Any DB-API error of the query
+        Returns:
+            rows (int): The amount of rows written
+        """
+        delimiter = field_delimiter.encode().decode("unicode_escape")
+        rows = 0
+        with Execution.throttled(table), self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                before_query = time.monotonic()
+                cursor.execute(query)
+                # execute returns once the query runs, after any time in the queue of the resource pool
+                Execution.first_byte(time.monotonic() - before_query)
+                write(
+                    (delimiter.join(col[0] for col in cursor.description) + "\n").encode()
+                )
+                for text, num_rows in self._batches(cursor, delimiter, table):
+                    write(text.encode())
+                    rows += num_rows
+            finally:
+                cursor.close()
+        return rows
+
+    def close(self):
+        """Closes every pooled connection
+
+        Arguments:
+            None
+        Raises:
+            None
+        Returns:
+            None
+        """
+        self.pool.close()
+
+    def _write(self, cursor, output_path, delimiter, codec, table=None):
+        with FileWriter(output_path, codec) as writer:
+            writer.write(
+                (delimiter.join(col[0] for col in cursor.description) + "\n").encode()
+            )
+            for text, _ in self._batches(cursor, delimiter, table):
+                writer.write(text.encode())
+        return writer.digest()
+
+    def _batches(self, cursor, delimiter, table=None):
+        while True:
+            batch = cursor.fetchmany(self.batch_size)
+            if not batch:
+                break
+            text = "".join(
+                delimiter.join(OdbcExtractor._format(val) for val in row) + "\n"
+                for row in batch
+            )
+            Execution.read_bytes(len(text), table)
+            yield text, len(batch)
+
+    @staticmethod
+    def _format(val):
+        if val is None:
+            return ""
+        if val is True:
+            return "t"
+        if val is False:
+            return "f"
+        return str(val)
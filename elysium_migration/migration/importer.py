@@ -1,15 +1,29 @@
+import concurrent.futures
+import contextlib
 import glob
+import heapq
+import itertools
+import math
 import os
 import shutil
+import threading
 from datetime import datetime
 from pathlib import Path
 
 from elysium_migration import Logger
+from elysium_migration.migration.compression import Codec
 from elysium_migration.migration.execute import Execution
+from elysium_migration.migration.integrity import ChunkIntegrityError
+from elysium_migration.migration.loadtuning import LoadTuner
+from elysium_migration.migration.manifest import ChunkStatus, ExportManifest
 from elysium_migration.migration.utility import MigrationUtility
 from elysium_migration.configuration.constants import ConstantCatalog
 
 
+class ImportFailedError(Exception):
+    pass
+
+
 class Importer:
     """
     Class for importing database objects 
@@ -19,12 +33,22 @@ class Importer:
         input_dir (Path): The directory from which to import the data from.
         script_dir (Path): The directory where the scripts will be during execution. 
         validation_results_dir (Path): After the process completes, the validtion results will be in this directory. 
+        max_workers (int): The max amount of tables loaded at once. 1 loads the tables one after the other.
+        batch_concurrency (int): The max amount of batches of one table loaded at once, when IMPORT_BATCH_FILES_FLAG is set.
+        auto_tune (bool): Whether to choose the readers and cores of every ybload from its files and the loads
+            running beside it, instead of YB_NUM_READERS and YB_NUM_CORES.
+        verify_chunks (bool): Whether to verify the files of every ybload against the manifest of the export,
+            right before they are loaded.
 
     Attributes:
         import_objects (list[str]): This is where we store the import objects.
         input_dir (Path): This is where we store the input_dir.
         script_dir (Path): This is where the script_dir is stored.  
         validation_results_dir (Path): This is where the validation_results_dir is stored.  
+        max_workers (int): This is where the max_workers is stored.
+        batch_concurrency (int): This is where the batch_concurrency is stored.
+        load_tuner (LoadTuner): This is where the tuner of the loads is stored, None when not auto tuning.
+        verify_chunks (bool): This is where the verify_chunks flag is stored.
         null_character_errors (list[str]): This is the list of tables that have known null characters. This is not really used now.
         load_log_file_path (Path): This is where the path of the log file for the load utility is stored. 
 
@@ -46,11 +70,23 @@ class Importer:
         input_dir: Path,
         script_dir: Path,
         validation_results_dir: Path,
+        max_workers=ConstantCatalog.IMPORT_MAX_WORKERS,
+        batch_concurrency=ConstantCatalog.IMPORT_BATCH_CONCURRENCY,
+        auto_tune=ConstantCatalog.YB_LOAD_AUTO_TUNE,
+        verify_chunks=ConstantCatalog.IMPORT_VERIFY_CHUNKS,
     ):
         self.import_objects = import_objects
         self.input_dir = input_dir
         self.script_dir = script_dir
         self.validation_results_dir = validation_results_dir
+        self.max_workers = max(1, max_workers)
+        self.batch_concurrency = max(1, batch_concurrency)
+        self.load_tuner = None
+        if auto_tune:
+            self.load_tuner = LoadTuner(slots=self.max_workers * self.batch_concurrency)
+        self.verify_chunks = verify_chunks
+        self._manifest = None
+        self._manifest_lock = threading.Lock()
         self.null_character_errors = self.import_objects["tables"]
         self.load_log_file_path = self.validation_results_dir / "logs" / "ybload"
 
@@ -65,7 +101,9 @@ class Importer:
             extras (str): This is for any command line arguments to be passed to the load utility.
 
         Raises:
-            SystemExit: If there is no data in the directory to import from
+            FileNotFoundError: If there is no data directory of a table, when the tables are imported one at a time
+            ChunkIntegrityError: If a data file doesn't match the manifest of the export, when the tables are imported one at a time
+            ImportFailedError: If any table failed, when the tables are imported in parallel
 
         Returns:
             None
@@ -76,94 +114,384 @@ class Importer:
             "Initiating imports from {path}...".format(path=str(self.input_dir))
         )
 
-        for schema_table in self.import_objects["tables"]:
+        if self.verify_chunks and not self._export_manifest():
+            Importer.get_logger().log.warning(
+                f"There is no manifest in '{self.input_dir}'. The data files are not verified."
+            )
 
-            if not (self.load_log_file_path).exists:
-                os.makedirs(self.load_log_file_path)
+        os.makedirs(self.load_log_file_path, exist_ok=True)
+        if self.max_workers > 1:
+            self.import_tables_parallel(field_delimiter=field_delimiter, extras=extras)
+        else:
+            for schema_table in self.import_objects["tables"]:
+                self.import_table(
+                    schema_table, field_delimiter=field_delimiter, extras=extras
+                )
 
-            fmt_str = "%Y%m%d%H%M%S"
-            now_str = datetime.now().strftime(fmt_str)
+        if validate:
+            self._create_validation_results()
 
-            total_extras = f"{extras} --logfile {self.load_log_file_path}/{schema_table}_{now_str}.log --logfile-log-level DEBUG "
-            p = self.input_dir / schema_table
-            if not p.exists():
-                Importer.get_logger.log.fatal(
-                    f"{schema_table} directory of ingestion files '{p}' does not exist."
-                )
-                raise SystemExit(
-                    f"{schema_table} directory of ingestion files '{p}' does not exist."
-                )
+    def import_table(self, schema_table, field_delimiter=r"\t", extras=""):
+        """Imports the data files of one table, in one ybload or in batches of IMPORT_FILES_BATCH_SIZE files.
 
-            if ConstantCatalog.EXPORT_COMPRESSED:
-                files = glob.glob(
-                    f"{p}/*.{ConstantCatalog.DATA_FILES_EXTENSION}.{ConstantCatalog.DATA_COMPRESS_EXTENSION}
-                )
-            else:
-                files = glob.glob(f"{p}/*.{ConstantCatalog.DATA_FILES_EXTENSION}")
-                    
-            files_batch_size = ConstantCatalog.IMPORT_FILES_BATCH_SIZE
-            if ConstantCatalog.IMPORT_BATCH_FILES_FLAG and (
-                len(files) > files_batch_size
-            ):
-                logger.log.debug(
-                    f"Batch Importing {len(files)} {schema_table} files. IMPORT_BATCH_FILES_FLAG: True."
+        Args:
+            schema_table (str): The name of the table in 'schema.table' format.
+            field_delimiter (str): The field delimiter used in the ybload commands.
+            extras (str): This is for any command line arguments to be passed to the load utility.
+
+        Raises:
+            FileNotFoundError: If there is no data directory of the table
+            CalledProcessError: If ybload exits with a non zero status
+            ChunkIntegrityError: If a file doesn't match the manifest of the export
+
+        Returns:
+            None
+
+        """
+        fmt_str = "%Y%m%d%H%M%S"
+        now_str = datetime.now().strftime(fmt_str)
+
+        total_extras = f"{extras} --logfile {self.load_log_file_path}/{schema_table}_{now_str}.log --logfile-log-level DEBUG "
+        p = self.input_dir / schema_table
+        if not p.exists():
+            Importer.get_logger().log.error(
+                f"{schema_table} directory of ingestion files '{p}' does not exist."
+            )
+            raise FileNotFoundError(
+                f"{schema_table} directory of ingestion files '{p}' does not exist."
+            )
+
+        files = Codec.data_files(p)
+                
+        files_batch_size = ConstantCatalog.IMPORT_FILES_BATCH_SIZE
+        target_bytes = ConstantCatalog.IMPORT_BATCH_TARGET_MB * 1024 ** 2
+        sizes = None
+        batched = False
+        if ConstantCatalog.IMPORT_BATCH_FILES_FLAG:
+            # the sizes are only read for bin-packing
+            sizes = self.file_sizes(files) if target_bytes else None
+            batched = len(files) > files_batch_size or (
+                target_bytes and sum(sizes.values()) > target_bytes
+            )
+        if batched:
+            batches = Importer.file_batches(
+                files, files_batch_size, sizes=sizes, target_bytes=target_bytes
+            )
+            Importer.get_logger().log.debug(
+                f"Batch Importing {len(files)} {schema_table} files in {len(batches)} batches, {self.batch_concurrency} at once. IMPORT_BATCH_FILES_FLAG: True."
+            )
+            self.load_batches(
+                schema_table, batches, field_delimiter=field_delimiter, extras=extras
+            )
+            Importer.get_logger().log.info(
+                f"Table {schema_table} done importing all files."
+            )
+        else:
+            Importer.get_logger().log.debug(
+                f"Importing {len(files)} {schema_table} files {files}: IMPORT_BATCH_FILES_FLAG = False..."
+            )
+
+            self._ybload(schema_table, files, field_delimiter, total_extras)
+
+            Importer.get_logger().log.info(f"Imported all {schema_table} files.")
+
+    @staticmethod
+    def file_batches(files, batch_size, sizes=None, target_bytes=0):
+        """Splits the files of a table into batches of batch_size files, in order.
+            With a target size, the files are bin-packed by size instead. There are enough batches for about
+            target_bytes each, and for batch_size files each. Every file, the biggest first, goes to the
+            batch with the fewest bytes, so the batches that load side by side finish at about the same time.
+
+        Args:
+            files (list[str]): The paths of the files.
+            batch_size (int): The max amount of files per batch.
+            sizes (dict[str:int]): The bytes of every file, only needed with a target size.
+            target_bytes (int): The bytes per batch to aim for, 0 to split by count.
+
+        Raises:
+            None
+
+        Returns:
+            batches (list[list[str]]): The batches, the files of each in the order of files
+        """
+        if not target_bytes or not files:
+            return [files[i : i + batch_size] for i in range(0, len(files), batch_size)]
+
+        total = sum(sizes[fi] for fi in files)
+        num_batches = max(
+            math.ceil(total / target_bytes), math.ceil(len(files) / batch_size), 1
+        )
+        bins = [(0, i) for i in range(num_batches)]
+        members = [[] for _ in range(num_batches)]
+        for fi in sorted(files, key=lambda fi: sizes[fi], reverse=True):
+            full = []
+            size, i = heapq.heappop(bins)
+            # batches that have batch_size files are skipped, there are enough batches for every file
+            while len(members[i]) >= batch_size:
+                full.append((size, i))
+                size, i = heapq.heappop(bins)
+            members[i].append(fi)
+            heapq.heappush(bins, (size + sizes[fi], i))
+            for entry in full:
+                heapq.heappush(bins, entry)
+
+        order = {fi: n for n, fi in enumerate(files)}
+        return [
+            sorted(batch, key=order.get)
+            for batch in sorted(members, key=lambda batch: -sum(sizes[fi] for fi in batch))
+            if batch
+        ]
+
+    def file_sizes(self, files):
+        """Returns the bytes of every file, as recorded in the manifest of the export or from `os.stat`
+
+        Args:
+            files (list[str]): The paths of the files.
+
+        Raises:
+            OSError: If a file that isn't in the manifest can't be read
+
+        Returns:
+            sizes (dict[str:int]): The bytes of every file
+        """
+        manifest = self._export_manifest()
+        sizes = {}
+        for fi in files:
+            size = manifest.size_of(fi) if manifest else None
+            sizes[fi] = os.stat(fi).st_size if size is None else size
+        return sizes
+
+    def load_batches(self, schema_table, batches, field_delimiter=r"\t", extras=""):
+        """Loads the batches of files of one table, up to batch_concurrency ybload processes at once.
+            When a batch fails, the batches that didn't start yet are skipped.
+
+        Args:
+            schema_table (str): The name of the table in 'schema.table' format.
+            batches (list[list[str]]): The batches of files, every batch is loaded by one ybload.
+            field_delimiter (str): The field delimiter used in the ybload commands.
+            extras (str): This is for any command line arguments to be passed to the load utility.
+
+        Raises:
+            CalledProcessError: The error of the first batch that failed, after the running batches finished
+
+        Returns:
+            None
+        """
+
+        def load(count, files_slice):
+            Importer.get_logger().log.debug(
+                f"Initiating {schema_table} import batch #{count}. Number of files: {len(files_slice)}."
+            )
+            self.load_files(
+                schema_table=schema_table,
+                files=files_slice,
+                field_delimiter=field_delimiter,
+                extras=extras,
+            )
+            Importer.get_logger().log.debug(
+                f"Completed executing import of {len(files_slice)} {schema_table} files '{' '.join(files_slice)}'... "
+            )
+
+        pending = enumerate(batches, start=1)
+        error = None
+        with concurrent.futures.ThreadPoolExecutor(self.batch_concurrency) as executor:
+            futures = {
+                executor.submit(load, *batch)
+                for batch in itertools.islice(pending, self.batch_concurrency)
+            }
+            while futures:
+                done, futures = concurrent.futures.wait(
+                    futures, return_when=concurrent.futures.FIRST_COMPLETED
                 )
-                start = 0
-                count = 1
-                while True:
-
-                    if start == (len(files)):
-                        logger.log.info(
-                            f"Table {schema_table} done importing all files."
-                        )
-                        break
-
-                    files_remaining = len(files) - start
-                    size_slice = min(files_batch_size, files_remaining)
-                    end = start + size_slice
-                    logger.log.debug(
-                        f"Initiating {schema_table} import batch #{count}. End index: {end} Start index: {start} Number of files: {size_slice}."
+                for fut in done:
+                    if error is None and fut.exception() is not None:
+                        error = fut.exception()
+                # no new batch starts after a failure
+                if error is None:
+                    futures |= {
+                        executor.submit(load, *batch)
+                        for batch in itertools.islice(pending, len(done))
+                    }
+        if error is not None:
+            raise error
+
+    def import_tables_parallel(self, field_delimiter=r"\t", extras=""):
+        """Imports the tables with up to max_workers ybload processes at once, one table per worker.
+            A failed table doesn't stop the others. The tables are reported in the order they finish.
+
+        Args:
+            field_delimiter (str): The field delimiter used in all the subsequent ybload commands.
+            extras (str): This is for any command line arguments to be passed to the load utility.
+
+        Raises:
+            ImportFailedError: If any of the tables failed, after every table finished
+
+        Returns:
+            results (list[(str, timedelta, Exception)]): The table, time elapsed and error (None if it succeeded)
+                of every table, in the order they finished
+
+        """
+        tables = self.import_objects["tables"]
+        Importer.get_logger().log.info(
+            f"Importing {len(tables)} tables with {self.max_workers} concurrent loads..."
+        )
+        before_import = datetime.now()
+        results = []
+
+        def run(schema_table):
+            started = datetime.now()
+            self.import_table(schema_table, field_delimiter=field_delimiter, extras=extras)
+            return datetime.now() - started
+
+        with concurrent.futures.ThreadPoolExecutor(self.max_workers) as executor:
+            futures = {executor.submit(run, tbl): tbl for tbl in tables}
+            for fut in concurrent.futures.as_completed(futures):
+                schema_table = futures[fut]
+                try:
+                    elapsed = fut.result()
+                    results.append((schema_table, elapsed, None))
+                    Importer.get_logger().log.info(
+                        f"Table {schema_table} import finished ({len(results)}/{len(tables)}). Time elapsed: {elapsed}."
                     )
-                    files_slice = files[start:end]
-                    files_expr = " ".join(files_slice)
-
-                    Execution.ybload(
-                        table=schema_table,
-                        input_path=files_expr,
-                        extras=total_extras,
-                        field_delimiter=field_delimiter,
+                except Exception as e:
+                    results.append((schema_table, None, e))
+                    Importer.get_logger().log.error(
+                        f"Table {schema_table} import failed ({len(results)}/{len(tables)}): {e}"
                     )
 
-                    logger.log.debug(
-                        f"Completed executing import of {len(files_slice)} {schema_table} files '{files_expr}'... "
-                    )
+        failed = [(tbl, e) for tbl, _, e in results if e is not None]
+        Importer.get_logger().log.info(
+            f"Parallel import completed. Failed tables: {len(failed)}. Total Time elapsed: {datetime.now() - before_import}."
+        )
+        if failed:
+            raise ImportFailedError(
+                "Failed to import: " + ", ".join(f"{tbl} ({e})" for tbl, e in failed)
+            )
+        return results
 
-                    count += 1
-                    start = start + size_slice
-            else:
-                Importer.get_logger().log.debug(
-                    f"Importing {len(files)} {schema_table} files {files}: IMPORT_BATCH_FILES_FLAG = False..."
-                )
+    def verify_files(self, schema_table, files):
+        """Verifies the size, rows and crc32 of the data files of one load against the manifest of the export,
+            right before they are loaded. Files that don't match are marked failed in the manifest, so exporting
+            again with `--resume` replaces them. Without a manifest nothing is verified.
 
-                if ConstantCatalog.EXPORT_COMPRESSED:
-                    files = glob.glob(
-                        f"{p}/*.{ConstantCatalog.DATA_FILES_EXTENSION}.{ConstantCatalog.DATA_COMPRESS_EXTENSION}
-                    )
-                else:
-                    files = glob.glob(f"{p}/*.{ConstantCatalog.DATA_FILES_EXTENSION}")
-                    
-                files_expr = " ".join(files)
-                Execution.ybload(
-                    table=schema_table,
-                    input_path=files_expr,
-                    extras=total_extras,
-                    field_delimiter=field_delimiter,
-                )
+        Args:
+            schema_table (str): The name of the table in 'schema.table' format.
+            files (list[str]): The paths of the files.
 
-                Importer.get_logger().log.info(f"Imported all {schema_table} files.")
+        Raises:
+            ChunkIntegrityError: If any of the files doesn't match the manifest
 
-        if validate:
-            self._create_validation_results()
+        Returns:
+            None
+
+        """
+        manifest = self._export_manifest()
+        if not manifest:
+            return
+
+        before_verify = datetime.now()
+        # crc32 and decompression release the GIL, so the files are read in parallel
+        with concurrent.futures.ThreadPoolExecutor(min(len(files), os.cpu_count()) or 1) as executor:
+            problems = [
+                (fi, problem)
+                for fi, problem in zip(files, executor.map(manifest.verify, files))
+                if problem is not None
+            ]
+
+        for fi, problem in problems:
+            Importer.get_logger().log.error(f"Data file '{fi}' {problem}.")
+            if fi in manifest:
+                manifest.mark(fi, ChunkStatus.FAILED, error=problem)
+
+        if problems:
+            raise ChunkIntegrityError(
+                f"{len(problems)} of {len(files)} {schema_table} data files don't match the export manifest. "
+                "Export again with --resume to replace them."
+            )
+        Importer.get_logger().log.debug(
+            f"Verified {len(files)} {schema_table} data files. Time elapsed: {datetime.now() - before_verify}."
+        )
+
+    def commit_watermarks(self, watermarks):
+        """Moves the watermarks of the tables to the marks recorded by an incremental export, once its rows are loaded.
+            Nothing is committed when the data in the input directory isn't from an incremental export.
+
+        Args:
+            watermarks (WatermarkStore): The store of the watermarks.
+
+        Raises:
+            None
+
+        Returns:
+            None
+
+        """
+        manifest = ExportManifest.load(self.input_dir)
+        if manifest is None:
+            return
+
+        for schema_table, target in manifest.run.get("watermark_targets", {}).items():
+            if schema_table in self.import_objects["tables"] and target["value"] is not None:
+                watermarks.commit(schema_table, target["column"], target["value"])
+
+    def is_incremental(self):
+        """Returns whether the data in the input directory is from an incremental export"""
+        manifest = ExportManifest.load(self.input_dir)
+        return manifest is not None and "watermark_targets" in manifest.run
+
+    def load_files(self, schema_table, files, field_delimiter=r"\t", extras=""):
+        """Loads the given files into one table with a single ybload execution.
+
+        Args:
+            schema_table (str): The name of the table in 'schema.table' format.
+            files (list[str]): The paths of the files to load.
+            field_delimiter (str): The field delimiter used in the ybload command.
+            extras (str): This is for any command line arguments to be passed to the load utility.
+
+        Raises:
+            CalledProcessError: If ybload exits with a non zero status
+            ChunkIntegrityError: If a file doesn't match the manifest of the export
+
+        Returns:
+            The bytes encoded object returned from the cli
+        """
+        os.makedirs(self.load_log_file_path, exist_ok=True)
+
+        fmt_str = "%Y%m%d%H%M%S%f"
+        now_str = datetime.now().strftime(fmt_str)
+
+        total_extras = f"{extras} --logfile {self.load_log_file_path}/{schema_table}_{now_str}.log --logfile-log-level DEBUG "
+        files_expr = " ".join(str(fi) for fi in files)
+
+        Importer.get_logger().log.debug(
+            f"Loading {len(files)} {schema_table} files '{files_expr}'..."
+        )
+        return self._ybload(schema_table, files, field_delimiter, total_extras)
+
+    def _export_manifest(self):
+        # shared by the loads, so the marks of failed files all go to one manifest
+        with self._manifest_lock:
+            if self._manifest is None:
+                self._manifest = ExportManifest.load(self.input_dir) or False
+            return self._manifest
+
+    def _ybload(self, schema_table, files, field_delimiter, extras):
+        if self.verify_chunks:
+            self.verify_files(schema_table, files)
+        if self.load_tuner is None:
+            tuning = contextlib.nullcontext((None, None))
+        else:
+            num_bytes = sum(self.file_sizes(files).values())
+            tuning = self.load_tuner.load(len(files), num_bytes, schema_table)
+        with tuning as (num_readers, num_cores):
+            return Execution.ybload(
+                table=schema_table,
+                input_path=" ".join(str(fi) for fi in files),
+                extras=extras,
+                field_delimiter=field_delimiter,
+                num_readers=num_readers,
+                num_cores=num_cores,
+            )
 
     def _pre_process_files_per_table(self, files, p):
         """Pre processes the files in the input directory. This is not used now. 
@@ -181,7 +509,7 @@ class Importer:
         """
 
         for fi in files:
-            logger.log.debug(
+            Importer.get_logger().log.debug(
                 f"Processing {fi}. Remove Nulls Flag: {null_character_errors_flag}."
             )
 
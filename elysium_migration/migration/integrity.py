@@ -0,0 +1,157 @@
+import os
+import zlib
+
+
+class ChunkIntegrityError(Exception):
+    pass
+
+
+class ChunkDigest:
+    """
+    Class for the integrity metadata of an exported file - its size, its amount of rows and a crc32 of its bytes.
+    It is taken while the export writes the file and taken again before the file is loaded, so a truncated
+    or changed file is never handed to ybload.
+
+    Args:
+        size (int): The amount of bytes of the file, as on disk.
+        rows (int): The amount of data lines, without the header line.
+        crc32 (int): The crc32 of the bytes of the file, as on disk.
+
+    Attributes:
+        size (int): This is where we store the size.
+        rows (int): This is where we store the rows.
+        crc32 (int): This is where we store the crc32.
+    """
+
+    def __init__(self, size, rows, crc32):
+        self.size = size
+        self.rows = rows
+        self.crc32 = crc32
+
+    @staticmethod
+    def of_file(path, codec=None, read_size=1024 ** 2):
+        """Reads a file once and returns its digest. The crc32 is over the bytes on disk, taken while the
+            codec reads them, the rows are counted in the decompressed data.
+
+        Arguments:
+            path (str): The path of the file
+            codec (Codec): The codec of the file, None if not compressed
+            read_size (int): The amount of bytes read at once
+
+        Raises:
+            OSError: If the file can't be read
+        Returns:
+            digest (ChunkDigest): The digest of the file
+        """
+        lines = 0
+        with DigestFile(open(path, "rb")) as raw:
+            f = raw if codec is None else codec.open(raw, "rb")
+            try:
+                for block in iter(lambda: f.read(read_size), b""):
+                    lines += block.count(b"\n")
+                # anything after the end of the compressed data is part of the file too
+                for _ in iter(lambda: raw.read(read_size), b""):
+                    pass
+            finally:
+                if f is not raw:
+                    f.close()
+        return raw.digest(lines)
+
+    @staticmethod
+    def from_dict(fields):
+        """Returns the digest of a manifest entry, None if the entry has no digest"""
+        if fields.get("crc32") is None:
+            return None
+        return ChunkDigest(fields["bytes"], fields["rows"], fields["crc32"])
+
+    def to_dict(self):
+        return {"bytes": self.size, "rows": self.rows, "crc32": self.crc32}
+
+    def verify(self, path, codec=None):
+        """Compares the file with the digest. The size is compared first, so a truncated file isn't read.
+
+        Arguments:
+            path (str): The path of the file
+            codec (Codec): The codec of the file, None if not compressed
+
+        Raises:
+            None
+        Returns:
+            problem (str): What doesn't match, None if the file matches the digest
+        """
+        try:
+            size = os.path.getsize(path)
+        except OSError as e:
+            return f"can't be read: {e}"
+        if size != self.size:
+            return f"has {size} bytes, expected {self.size}"
+
+        try:
+            actual = ChunkDigest.of_file(path, codec)
+        except (OSError, EOFError, zlib.error) as e:
+            return f"can't be read: {e}"
+        if actual.crc32 != self.crc32:
+            return f"has crc32 {actual.crc32:08x}, expected {self.crc32:08x}"
+        if actual.rows != self.rows:
+            return f"has {actual.rows} rows, expected {self.rows}"
+        return None
+
+    def __eq__(self, other):
+        return isinstance(other, ChunkDigest) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"ChunkDigest({self.size} bytes, {self.rows} rows, crc32 {self.crc32:08x})"
+
+
+class DigestFile:
+    """
+    Class for a binary file that takes the size and crc32 of the bytes that go through it, read or written.
+    A codec can write or read through it, so the digest of the bytes on disk is taken in the same pass
+    that compresses or decompresses them.
+
+    Args:
+        file: The binary file object, it is closed with this one.
+
+    Attributes:
+        size (int): The amount of bytes read or written.
+        crc32 (int): The crc32 of the bytes read or written.
+    """
+
+    def __init__(self, file):
+        self.size = 0
+        self.crc32 = 0
+        self._file = file
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def read(self, size=-1):
+        data = self._file.read(size)
+        self._add(data)
+        return data
+
+    def write(self, data):
+        self._file.write(data)
+        self._add(data)
+        return len(data)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def digest(self, lines):
+        """Returns the digest of the file, from the amount of lines of its data. Every file starts with the header line."""
+        return ChunkDigest(self.size, max(lines - 1, 0), self.crc32)
+
+    def _add(self, data):
+        self.size += len(data)
+        self.crc32 = zlib.crc32(data, self.crc32)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
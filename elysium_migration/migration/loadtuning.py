@@ -0,0 +1,113 @@
+import contextlib
+import math
+import os
+import threading
+import time
+
+from elysium_migration import Logger
+from elysium_migration.configuration.constants import ConstantCatalog
+
+
+class LoadTuner:
+    """
+    Class for choosing the readers and cores of every ybload from what it loads and the cores that are free.
+    A load gets a reader per file up to one per YB_LOAD_MB_PER_READER, since a reader only reads one source
+    at a time, and a core per YB_LOAD_MB_PER_CORE. Every load gets at most its share of the cores of the host,
+    the total divided by the loads that can run at once, and never more than the cores no other load holds.
+    A load waits while every core is held, so the loads together never ask for more cores than there are.
+    The cores of a load are held until it finished.
+
+    Args:
+        total_cores (int): The cores of the host shared by all the loads. None for YB_NUM_CORES, or the cpu count.
+        slots (int): The amount of loads that can run at once, e.g. the import workers times the batch concurrency.
+        max_readers (int): The max amount of readers of one load.
+        mb_per_reader (float): The MB of data that warrant another reader.
+        mb_per_core (float): The MB of data that warrant another core.
+
+    Attributes:
+        total_cores (int): This is where we store the total_cores.
+        slots (int): This is where we store the slots.
+        max_readers (int): This is where we store the max_readers.
+        allocated (int): The amount of cores held by the loads running now.
+    """
+
+    logger = None
+
+    @classmethod
+    def get_logger(cls):
+        if cls.logger is None:
+            cls.logger = Logger(log_name=__name__)
+        return cls.logger
+
+    def __init__(
+        self,
+        total_cores=None,
+        slots=1,
+        max_readers=ConstantCatalog.YB_NUM_READERS,
+        mb_per_reader=ConstantCatalog.YB_LOAD_MB_PER_READER,
+        mb_per_core=ConstantCatalog.YB_LOAD_MB_PER_CORE,
+    ):
+        self.total_cores = total_cores or ConstantCatalog.YB_NUM_CORES or os.cpu_count()
+        self.slots = max(1, slots)
+        self.max_readers = max(1, max_readers)
+        self.reader_bytes = mb_per_reader * 1024 ** 2
+        self.core_bytes = mb_per_core * 1024 ** 2
+        self.allocated = 0
+        self._cond = threading.Condition()
+
+    def settings(self, num_files, num_bytes, free_cores=None):
+        """Returns the readers and cores of a load
+
+        Arguments:
+            num_files (int): The amount of files of the load
+            num_bytes (int): The bytes of the files of the load
+            free_cores (int): The cores no other load holds, None when they all are free
+        Raises:
+            None
+        Returns:
+            settings ((int, int)): The amount of readers and of cores
+        """
+        free_cores = self.total_cores if free_cores is None else free_cores
+        readers = min(
+            num_files, math.ceil(num_bytes / self.reader_bytes), self.max_readers
+        )
+        cores = min(
+            math.ceil(num_bytes / self.core_bytes),
+            self.total_cores // self.slots,
+            free_cores,
+        )
+        return max(readers, 1), max(cores, 1)
+
+    @contextlib.contextmanager
+    def load(self, num_files, num_bytes, table=None):
+        """Holds the cores of a load for the duration of the with block, and yields its readers and cores.
+            Waits while every core is held by other loads.
+
+        Arguments:
+            num_files (int): The amount of files of the load
+            num_bytes (int): The bytes of the files of the load
+            table (str): The table of the load, only for the log
+        Raises:
+            None
+        Returns:
+            settings ((int, int)): The amount of readers and of cores
+        """
+        before_wait = time.monotonic()
+        with self._cond:
+            while self.allocated >= self.total_cores:
+                self._cond.wait()
+            readers, cores = self.settings(
+                num_files, num_bytes, self.total_cores - self.allocated
+            )
+            self.allocated += cores
+            allocated = self.allocated
+        LoadTuner.get_logger().log.debug(
+            f"Loading {num_files} {table} files of {num_bytes // 1024 ** 2} MB with {readers} readers and {cores} cores. "
+            f"Cores held: {allocated}/{self.total_cores}. Waited {time.monotonic() - before_wait:.1f}s."
+        )
+        try:
+            yield readers, cores
+        finally:
+            with self._cond:
+                self.allocated -= cores
+                self._cond.notify_all()
@@ -0,0 +1,312 @@
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from elysium_migration import Logger
+from elysium_migration.configuration.constants import ConstantCatalog
+from elysium_migration.migration.compression import Codec
+from elysium_migration.migration.integrity import ChunkDigest
+from elysium_migration.migration.scheduler import ExportTask
+
+
+class ChunkStatus:
+    PLANNED = "planned"
+    EXPORTED = "exported"
+    LOADED = "loaded"
+    FAILED = "failed"
+
+
+class ExportManifest:
+    """
+    Class for the manifest of an export run. It records every planned chunk (table, query, file, status and
+    the size, rows and crc32 of the exported file) in a json file in the output directory, and is saved after
+    every change so a run that was killed or failed can be resumed with only the chunks that are missing or failed.
+    The importer verifies every file against it before loading.
+    The parts of a rolled chunk get their own entries once it is exported, which point back to the chunk with
+    'part_of'. A rolled chunk is exported again as a whole, unless any of its parts was loaded.
+
+    Args:
+        output_dir (Path): The output directory of the run, the manifest is stored in it.
+        run (dict): The parameters of the run, e.g. the dates. A resume only uses a manifest with the same run.
+
+    Attributes:
+        path (Path): The path of the manifest file.
+        run (dict): This is where we store the run.
+        chunks (dict[str:dict]): The entry of every chunk, by its file relative to the output directory.
+    """
+
+    logger = None
+
+    @classmethod
+    def get_logger(cls):
+        if cls.logger is None:
+            cls.logger = Logger(log_name=__name__)
+        return cls.logger
+
+    def __init__(self, output_dir: Path, run=None):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / ConstantCatalog.MANIFEST_FILE
+        self.run = run or {}
+        self.chunks = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load(output_dir: Path):
+        """Loads the manifest of the output directory
+
+        Arguments:
+            output_dir (Path): The output directory of the run
+
+        Raises:
+            None
+        Returns:
+            manifest (ExportManifest): The manifest, None if there is no manifest
+        """
+        manifest = ExportManifest(output_dir)
+        if not manifest.path.exists():
+            return None
+        with open(manifest.path, "r") as f:
+            content = json.load(f)
+        manifest.run = content["run"]
+        manifest.chunks = content["chunks"]
+        return manifest
+
+    def matches(self, run):
+        """Returns whether the manifest is of a run with the same parameters. The watermarks that the planning
+            queried are not parameters, a resume commits the ones of the manifest.
+
+        Arguments:
+            run (dict): The parameters of the run
+        Raises:
+            None
+        Returns:
+            matches (bool): Whether it is the same run
+        """
+        planned = {k: v for k, v in self.run.items() if k != "watermark_targets"}
+        return planned == run
+
+    def add_tasks(self, tasks):
+        """Records the planned tasks and saves the manifest
+
+        Arguments:
+            tasks (list[ExportTask]): The planned tasks, in the order they should start
+        Raises:
+            None
+        Returns:
+            None
+        """
+        with self._lock:
+            for task in tasks:
+                self.chunks[self._key(task.output_path)] = {
+                    "table": task.table,
+                    "query": task.query,
+                    "codec": None if task.codec is None else task.codec.name,
+                    "level": None if task.codec is None else task.codec.level,
+                    "field_delimiter": task.field_delimiter,
+                    "estimated_mb": task.estimated_mb,
+                    "roll_mb": task.roll_mb,
+                    "parts": None,
+                    "status": ChunkStatus.PLANNED,
+                    "bytes": None,
+                    "rows": None,
+                    "crc32": None,
+                    "error": None,
+                    "updated": datetime.now().isoformat(),
+                }
+            self._save()
+
+    def mark(self, output_path, status, error=None, **fields):
+        """Sets the status of a chunk, plus any other fields like bytes and rows, and saves the manifest
+
+        Arguments:
+            output_path (str): The path of the chunk file
+            status (str): The ChunkStatus
+            error (Exception): The error when failed
+        Raises:
+            KeyError: If the chunk isn't in the manifest
+        Returns:
+            None
+        """
+        with self._lock:
+            chunk = self.chunks[self._key(output_path)]
+            chunk.update(fields)
+            chunk["status"] = status
+            chunk["error"] = None if error is None else str(error)
+            chunk["updated"] = datetime.now().isoformat()
+            self._save()
+
+    def mark_exported(self, task):
+        if task.roll_mb:
+            self._mark_parts(task)
+            return
+        digest = task.digest or ChunkDigest.of_file(task.output_path, task.codec)
+        self.mark(task.output_path, ChunkStatus.EXPORTED, **digest.to_dict())
+
+    def mark_failed(self, task, error):
+        self.mark(task.output_path, ChunkStatus.FAILED, error=error)
+
+    def mark_loaded(self, schema_table, file_path):
+        self.mark(file_path, ChunkStatus.LOADED)
+
+    def pending_tasks(self):
+        """Returns the tasks of the chunks that are not exported yet, or whose file is missing or has another size.
+            Loaded chunks are never exported again, even if their file was removed.
+
+        Arguments:
+            None
+        Raises:
+            None
+        Returns:
+            tasks (list[ExportTask]): The tasks to export again, in the planned order
+        """
+        return [
+            self._task(key, chunk)
+            for key, chunk in self.chunks.items()
+            if not chunk.get("part_of")
+            and (
+                chunk["status"] in (ChunkStatus.PLANNED, ChunkStatus.FAILED)
+                or (chunk["status"] == ChunkStatus.EXPORTED and not self._complete(key, chunk))
+            )
+        ]
+
+    def unloaded_tasks(self):
+        """Returns the tasks of the chunks that are exported but not loaded yet, when pipelining
+
+        Arguments:
+            None
+        Raises:
+            None
+        Returns:
+            tasks (list[ExportTask]): The exported tasks
+        """
+        return [
+            self._task(key, chunk)
+            for key, chunk in self.chunks.items()
+            if chunk["status"] == ChunkStatus.EXPORTED
+            and not chunk.get("parts")
+            and self._size(key) == chunk["bytes"]
+            and self._parent_complete(chunk)
+        ]
+
+    def verify(self, file_path):
+        """Compares a data file with the size, rows and crc32 recorded when it was exported
+
+        Arguments:
+            file_path (str): The path of the data file
+        Raises:
+            None
+        Returns:
+            problem (str): Why the file can't be loaded, None if it matches the manifest
+        """
+        chunk = self.chunks.get(self._key(file_path))
+        if chunk is None:
+            return "is not in the manifest"
+        digest = ChunkDigest.from_dict(chunk)
+        if digest is None or chunk["status"] not in (
+            ChunkStatus.EXPORTED,
+            ChunkStatus.LOADED,
+        ):
+            return f"is not exported completely, its chunk is {chunk['status']}"
+        codec = None if chunk["codec"] is None else Codec(chunk["codec"], chunk["level"])
+        return digest.verify(file_path, codec)
+
+    def size_of(self, file_path):
+        """Returns the bytes of a data file as recorded when it was exported, None if there is no record"""
+        chunk = self.chunks.get(self._key(file_path))
+        return None if chunk is None else chunk["bytes"]
+
+    def summary(self):
+        """Returns the amount of chunks per status"""
+        counts = {}
+        for chunk in self.chunks.values():
+            if chunk.get("parts"):
+                continue
+            counts[chunk["status"]] = counts.get(chunk["status"], 0) + 1
+        return counts
+
+    def _task(self, key, chunk):
+        return ExportTask(
+            table=chunk["table"],
+            query=chunk["query"],
+            output_path=str(self.output_dir / key),
+            codec=None if chunk["codec"] is None else Codec(chunk["codec"], chunk["level"]),
+            field_delimiter=chunk["field_delimiter"],
+            estimated_mb=chunk["estimated_mb"],
+            roll_mb=0 if chunk.get("part_of") else chunk.get("roll_mb", 0),
+        )
+
+    def _mark_parts(self, task):
+        # the parts of an earlier export of the chunk are replaced
+        with self._lock:
+            key = self._key(task.output_path)
+            chunk = self.chunks[key]
+            for part_key in chunk.get("parts") or []:
+                self.chunks.pop(part_key, None)
+
+            part_keys = []
+            for path, digest in task.parts:
+                part_key = self._key(path)
+                self.chunks[part_key] = dict(
+                    chunk,
+                    roll_mb=0,
+                    parts=None,
+                    part_of=key,
+                    status=ChunkStatus.EXPORTED,
+                    error=None,
+                    updated=datetime.now().isoformat(),
+                    **digest.to_dict(),
+                )
+                part_keys.append(part_key)
+
+            chunk.update(
+                parts=part_keys,
+                status=ChunkStatus.EXPORTED,
+                bytes=sum(digest.size for _, digest in task.parts),
+                rows=sum(digest.rows for _, digest in task.parts),
+                crc32=None,
+                error=None,
+                updated=datetime.now().isoformat(),
+            )
+            self._save()
+
+    def _parent_complete(self, chunk):
+        # the parts of a chunk that is exported again are not loaded on their own
+        if not chunk.get("part_of"):
+            return True
+        parent = self.chunks[chunk["part_of"]]
+        return parent["status"] == ChunkStatus.EXPORTED and self._complete(
+            chunk["part_of"], parent
+        )
+
+    def _complete(self, key, chunk):
+        if not chunk.get("parts"):
+            return self._size(key) == chunk["bytes"]
+        parts = [self.chunks[part_key] for part_key in chunk["parts"]]
+        # loaded rows can't be exported again
+        if any(part["status"] == ChunkStatus.LOADED for part in parts):
+            return True
+        return all(
+            part["status"] == ChunkStatus.EXPORTED and self._size(part_key) == part["bytes"]
+            for part_key, part in zip(chunk["parts"], parts)
+        )
+
+    def __contains__(self, file_path):
+        return self._key(file_path) in self.chunks
+
+    def _size(self, key):
+        try:
+            return os.path.getsize(self.output_dir / key)
+        except OSError:
+            return None
+
+    def _key(self, output_path):
+        return str(Path(output_path).resolve().relative_to(self.output_dir.resolve()))
+
+    def _save(self):
+        # called while holding the lock. The rename makes sure a crash never leaves half a manifest
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"run": self.run, "chunks": self.chunks}, f, indent=1)
+        os.replace(tmp_path, self.path)
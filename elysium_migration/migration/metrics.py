@@ -0,0 +1,63 @@
+import threading
+
+from elysium_migration import Logger
+
+
+class RunMetrics:
+    """
+    Class for the counters of a run, e.g. the seconds spent waiting on the throttle. Any thread can add to them,
+    and the totals are logged at the end of the run.
+
+    Args:
+        None
+
+    Attributes:
+        counters (dict[str:float]): The total of every counter.
+    """
+
+    logger = None
+
+    @classmethod
+    def get_logger(cls):
+        if cls.logger is None:
+            cls.logger = Logger(log_name=__name__)
+        return cls.logger
+
+    def __init__(self):
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, amount=1):
+        """Adds an amount to a counter
+
+        Arguments:
+            name (str): The name of the counter, e.g. 'throttle_bytes_wait_s'
+            amount (float): The amount to add
+        Raises:
+            None
+        Returns:
+            None
+        """
+        if not amount:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def get(self, name):
+        with self._lock:
+            return self.counters.get(name, 0)
+
+    def log_summary(self):
+        """Logs the total of every counter"""
+        with self._lock:
+            counters = dict(self.counters)
+        if not counters:
+            return
+        RunMetrics.get_logger().log.info(
+            "Run metrics:\n\t{vals}".format(
+                vals="\n\t".join(
+                    f"{k}: {round(v, 3) if isinstance(v, float) else v}"
+                    for k, v in sorted(counters.items())
+                )
+            )
+        )
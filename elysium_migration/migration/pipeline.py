@@ -0,0 +1,178 @@
+import queue
+import threading
+from datetime import datetime
+
+from elysium_migration import Logger
+from elysium_migration.configuration.constants import ConstantCatalog
+
+
+class PipelineLoadError(Exception):
+    pass
+
+
+class ChunkLoadPipeline:
+    """
+    Class for loading exported chunk files into the target while the export is still running.
+
+    Every file handed to `submit` is queued for a pool of loader threads which call ybload
+    through the importer. The number of chunks that are exported but not yet loaded is bounded,
+    so `submit` blocks the exporting thread once the window is full.
+
+    Args:
+        importer (Importer): The importer used to execute the loads.
+        num_loaders (int): The amount of loader threads (concurrent ybload processes).
+        max_in_flight (int): The max amount of chunks that are exported but not yet loaded.
+        field_delimiter (str): The field delimiter used in all the subsequent ybload commands.
+        on_loaded (callable): Optional function called with the table and file of each successful load.
+        on_failed (callable): Optional function called with the table and file of each failed load.
+
+    Attributes:
+        importer (Importer): This is where we store the importer.
+        num_loaders (int): This is where we store the num_loaders.
+        field_delimiter (str): This is where we store the field_delimiter.
+        on_loaded (callable): This is where we store the on_loaded function.
+        on_failed (callable): This is where we store the on_failed function.
+        loaded (list[(str, str)]): The table and file of every successful load.
+        errors (list[(str, str, Exception)]): The table, file and exception of every failed load.
+    """
+
+    logger = None
+
+    @classmethod
+    def get_logger(cls):
+        if cls.logger is None:
+            cls.logger = Logger(log_name=__name__)
+        return cls.logger
+
+    _STOP = None
+
+    def __init__(
+        self,
+        importer,
+        num_loaders=ConstantCatalog.PIPELINE_NUM_LOADERS,
+        max_in_flight=ConstantCatalog.PIPELINE_MAX_IN_FLIGHT_CHUNKS,
+        field_delimiter=r"\t",
+        on_loaded=None,
+        on_failed=None,
+    ):
+        self.importer = importer
+        self.num_loaders = num_loaders
+        if getattr(importer, "load_tuner", None) is not None:
+            # the cores are shared by the loaders of the pipeline
+            importer.load_tuner.slots = max(importer.load_tuner.slots, num_loaders)
+        self.field_delimiter = field_delimiter
+        self.on_loaded = on_loaded
+        self.on_failed = on_failed
+        self.loaded = []
+        self.errors = []
+        self._queue = queue.Queue()
+        self._window = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close(raise_errors=type is None)
+
+    def start(self):
+        """Starts the loader threads.
+
+        Arguments:
+            None
+        Raises:
+            None
+        Returns:
+            None
+        """
+        for i in range(self.num_loaders):
+            thread = threading.Thread(
+                target=self._work, name=f"chunk-loader-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, schema_table, file_path):
+        """Queues an exported file for loading. Blocks while the in-flight window is full.
+
+        Arguments:
+            schema_table (str): The name of the table in 'schema.table' format.
+            file_path (str): The path of the exported file.
+        Raises:
+            None
+        Returns:
+            None
+        """
+        self._window.acquire()
+        ChunkLoadPipeline.get_logger().log.debug(
+            f"Queueing {schema_table} file '{file_path}' for loading..."
+        )
+        self._queue.put((schema_table, str(file_path)))
+
+    def close(self, raise_errors=True):
+        """Waits for every queued file to be loaded and stops the loader threads.
+
+        Arguments:
+            raise_errors (bool): Whether to raise if any of the loads failed.
+        Raises:
+            PipelineLoadError: If any of the loads failed and raise_errors is set.
+        Returns:
+            None
+        """
+        for _ in self._threads:
+            self._queue.put(ChunkLoadPipeline._STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+        ChunkLoadPipeline.get_logger().log.info(
+            f"Pipeline finished. Files loaded: {len(self.loaded)}. Failed loads: {len(self.errors)}."
+        )
+        if raise_errors and self.errors:
+            raise PipelineLoadError(
+                "Failed to load: "
+                + ", ".join(f"{tbl} '{fi}' ({e})" for tbl, fi, e in self.errors)
+            )
+
+    def _work(self):
+        """Loads queued files until the stop marker is received.
+
+        Arguments:
+            None
+        Raises:
+            None
+        Returns:
+            None
+        """
+        while True:
+            item = self._queue.get()
+            if item is ChunkLoadPipeline._STOP:
+                break
+
+            schema_table, file_path = item
+            before_load = datetime.now()
+            try:
+                self.importer.load_files(
+                    schema_table=schema_table,
+                    files=[file_path],
+                    field_delimiter=self.field_delimiter,
+                )
+                with self._lock:
+                    self.loaded.append((schema_table, file_path))
+                if self.on_loaded is not None:
+                    self.on_loaded(schema_table, file_path)
+                ChunkLoadPipeline.get_logger().log.debug(
+                    f"Loaded {schema_table} file '{file_path}'. Time elapsed: {datetime.now() - before_load}."
+                )
+            except Exception as e:
+                with self._lock:
+                    self.errors.append((schema_table, file_path, e))
+                ChunkLoadPipeline.get_logger().log.error(
+                    f"Load of {schema_table} file '{file_path}' failed: {e}"
+                )
+                if self.on_failed is not None:
+                    self.on_failed(schema_table, file_path)
+            finally:
+                self._window.release()
@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta
+
+from elysium_migration import Logger
+from elysium_migration.configuration.constants import ConstantCatalog
+from elysium_migration.migration.boundaries import BoundaryPlanner
+from elysium_migration.migration.execute import Execution
+
+
+class Sampler:
+    """
+    This class is an interface for the strategies that find the range of the partitioning column holding the
+    latest rows of a table, for `--sample-size` exports. The export and its checksum use the range as
+    `column >= min AND column < max`.
+
+    Args:
+        None
+
+    Attributes:
+        None
+    """
+
+    logger = None
+
+    @classmethod
+    def get_logger(cls):
+        if cls.logger is None:
+            cls.logger = Logger(log_name=__name__)
+        return cls.logger
+
+    @staticmethod
+    def from_name(name=ConstantCatalog.EXPORT_SAMPLE_STRATEGY):
+        """Returns the sampler for the given name
+
+        Arguments:
+            name (str): Either 'top_k', 'window' or 'rank'
+
+        Raises:
+            ValueError: If there is no strategy with that name
+        Returns:
+            sampler (Sampler): The sampler
+        """
+        samplers = {"top_k": TopKSampler, "window": WindowSampler, "rank": RankSampler}
+        if name not in samplers:
+            raise ValueError(
+                f"Unknown sample strategy '{name}'. Valid strategies are: {', '.join(samplers)}"
+            )
+        return samplers[name]()
+
+    def range(self, table, column, sample_size):
+        """Returns the min and max of the column for the latest rows, the way vsql prints them"""
+        raise NotImplementedError
+
+    def sample(self, table, column, sample_size):
+        """Finds the range of the column that holds about sample_size of the latest rows
+
+        Arguments:
+            table (str): The name of the table in 'schema.table' format
+            column (str): The name of the partitioning column
+            sample_size (int): The amount of rows
+
+        Raises:
+            None
+        Returns:
+            results ((str, str)): The min and max of the column, formatted the way vsql prints them
+        """
+        before_sample = datetime.now()
+        min_val, max_val = self.range(table, column, sample_size)
+        Sampler.get_logger().log.debug(
+            f"{type(self).__name__} sampled {table} from {column} '{min_val}' to '{max_val}'. Time elapsed: {datetime.now() - before_sample}."
+        )
+        return min_val, max_val
+
+
+class TopKSampler(Sampler):
+    """
+    Takes the min and max of the sample_size + 1 highest values in one bounded top-k query.
+    """
+
+    def range(self, table, column, sample_size):
+        return Execution.vsql_get_top_k_range(
+            table=table, column=column, k=sample_size + 1
+        )
+
+
+class WindowSampler(Sampler):
+    """
+    Counts the rows in a window below the max of the column, growing the window until it holds the sample.
+    A window that holds more than overshoot times the sample is narrowed, to the share of it that should hold
+    twice the sample, then halfway between the widest window short of the sample and the narrowest one above.
+    Every probe is a range count on the partitioning column, so it only reads the latest data. Columns that
+    aren't numeric or timestamps, and tables where no window fits, fall back to the top-k query.
+
+    Args:
+        window_hours (int): The first window of a timestamp column, in hours. Numeric columns start at sample_size.
+        growth (int): The window is multiplied by this after every probe that is short of the sample.
+        max_probes (int): The max amount of probes before falling back to the top-k query.
+        overshoot (int): The most rows a window can hold, as a multiple of the sample.
+    """
+
+    def __init__(
+        self,
+        window_hours=ConstantCatalog.EXPORT_SAMPLE_WINDOW_HOURS,
+        growth=ConstantCatalog.EXPORT_SAMPLE_WINDOW_GROWTH,
+        max_probes=ConstantCatalog.EXPORT_SAMPLE_MAX_PROBES,
+        overshoot=ConstantCatalog.EXPORT_SAMPLE_WINDOW_OVERSHOOT,
+    ):
+        self.window_hours = window_hours
+        self.growth = growth
+        self.max_probes = max_probes
+        self.overshoot = overshoot
+
+    def range(self, table, column, sample_size):
+        max_val = Execution.vsql_get_max_col_val(table=table, column=column)
+        hi = BoundaryPlanner.parse_value(
+            max_val, Execution.vsql_is_character_column(table=table, column=column)
+        )
+        if isinstance(hi, datetime):
+            window = timedelta(hours=self.window_hours)
+        elif isinstance(hi, (int, float)):
+            window = sample_size
+        else:
+            return TopKSampler().range(table, column, sample_size)
+
+        # The widest window short of the sample and the narrowest one above overshoot times the sample
+        short, wide = None, None
+        for _ in range(self.max_probes):
+            min_val, _, count = Execution.vsql_get_key_range(
+                table=table,
+                column=column,
+                predicate=f"AND {column} >= {BoundaryPlanner.literal(hi - window)}",
+            )
+            if sample_size < count <= sample_size * self.overshoot:
+                return min_val, max_val
+
+            if count > sample_size:
+                wide = window
+                Sampler.get_logger().log.debug(
+                    f"The {table}.{column} window of {window} holds {count} rows, narrowing it."
+                )
+            else:
+                short = window
+
+            if wide is None:
+                window = window * self.growth
+            elif short is None:
+                window = window * (2 * sample_size / count)
+            else:
+                window = short + (wide - short) / 2
+            if isinstance(hi, int):
+                window = int(window)
+            if window in (short, wide) or not window:
+                break
+
+        Sampler.get_logger().log.debug(
+            f"No window of {table}.{column} holds between {sample_size} and {sample_size * self.overshoot} rows. Using the top-k query."
+        )
+        return TopKSampler().range(table, column, sample_size)
+
+
+class RankSampler(Sampler):
+    """
+    Ranks every value after DATE_FILTER and takes the max in a second query. This is the slowest, it is kept
+    for tables where the other strategies pick a different range than before.
+    """
+
+    def range(self, table, column, sample_size):
+        min_val = Execution.vsql_get_sample_filter_val(
+            table=table, part_col=column, sample_size=sample_size
+        )
+        return min_val, Execution.vsql_get_max_col_val(table=table, column=column)
@@ -0,0 +1,349 @@
+import concurrent.futures
+import itertools
+import os
+from datetime import datetime
+
+from elysium_migration import Logger
+from elysium_migration.configuration.constants import ConstantCatalog
+from elysium_migration.migration.compression import Codec
+from elysium_migration.migration.concurrency import ConcurrencyController
+from elysium_migration.migration.execute import Execution
+from elysium_migration.migration.extractor import Extractor
+from elysium_migration.migration.integrity import ChunkDigest
+
+
+class ExportTask:
+    """
+    Class for a single unit of export work, which is one query written to one file.
+    The file is written to a temporary name and only renamed to the output path once the export succeeded,
+    so the output path never holds a partial file.
+    When rolling, the query is written to numbered parts of about roll_mb each instead, e.g. '0_0.csv.gz',
+    '0_1.csv.gz' for the output path '0.csv.gz', so a single scan still gives ybload many sources.
+
+    Args:
+        table (str): The name of the table in 'schema.table' format.
+        query (str): The query for vertica.
+        output_path (str): The path of the file where the data will go.
+        codec (Codec): The codec to compress the output with, None to not compress.
+        field_delimiter (str): The delimiter used to seperated fields.
+        estimated_mb (float): The estimated size of the data, used for ordering the tasks and reserving the disk budget.
+        roll_mb (int): The uncompressed MB per part when rolling, 0 to write a single file.
+
+    Attributes:
+        table (str): This is where we store the table.
+        query (str): This is where we store the query.
+        output_path (str): This is where we store the output_path.
+        codec (Codec): This is where we store the codec.
+        field_delimiter (str): This is where we store the field_delimiter.
+        estimated_mb (float): This is where we store the estimated_mb.
+        roll_mb (int): This is where we store the roll_mb.
+        digest (ChunkDigest): The size, rows and crc32 of the output file, set when the export succeeded.
+        parts (list[(str, ChunkDigest)]): The path and digest of every part when rolling, set when the export succeeded.
+        metered (bool): Whether the bytes of the export went to the meter while they streamed, set when the export succeeded.
+        stages_files (bool): Whether the task writes files that take room on disk until they are loaded.
+    """
+
+    stages_files = True
+
+    def __init__(
+        self,
+        table,
+        query,
+        output_path,
+        codec=None,
+        field_delimiter=r"\t",
+        estimated_mb=0,
+        roll_mb=0,
+    ):
+        self.table = table
+        self.query = query
+        self.output_path = output_path
+        self.codec = codec
+        self.field_delimiter = field_delimiter
+        self.estimated_mb = estimated_mb
+        self.roll_mb = roll_mb
+        self.digest = None
+        self.parts = []
+        self.metered = False
+
+    @property
+    def temp_path(self):
+        # the data file globs of the importer don't match this name
+        return f"{self.output_path}.{ConstantCatalog.EXPORT_TEMP_EXTENSION}"
+
+    def run(self, extractor):
+        """Executes the query and writes the result to the temporary path. When the export succeeded
+            the file is renamed to the output path. Its digest is the one the extractor took while writing,
+            the file is only read back for it when the extractor didn't see the data.
+
+        Arguments:
+            extractor (Extractor): The backend that executes the query.
+        Raises:
+            Exception: Any error of the extractor
+        Returns:
+            None
+        """
+        if self.roll_mb:
+            self._run_rolling(extractor)
+            return
+
+        try:
+            digest = extractor.extract(
+                self.query,
+                output_path=self.temp_path,
+                field_delimiter=self.field_delimiter,
+                codec=self.codec,
+                table=self.table,
+            )
+            # the file is only read back when the data didn't go through the process, e.g. vsql piped into gzip
+            self.digest = digest or ChunkDigest.of_file(self.temp_path, self.codec)
+            self.metered = digest is not None
+            os.replace(self.temp_path, self.output_path)
+        except Exception:
+            if os.path.exists(self.temp_path):
+                os.remove(self.temp_path)
+            raise
+
+    def part_path(self, number):
+        """Returns the path of a part when rolling, e.g. '0_1.csv.gz' for the output path '0.csv.gz'."""
+        directory, name = os.path.split(self.output_path)
+        id = name.split(".")[0]
+        return os.path.join(directory, Codec.file_name(f"{id}_{number}", self.codec))
+
+    def output_paths(self):
+        """Returns the path of every file of the task - the parts when rolling, otherwise the output path."""
+        if self.roll_mb:
+            return [path for path, _ in self.parts]
+        return [self.output_path]
+
+    def output_bytes(self):
+        """Returns the size of the output files, 0 for the ones that don't exist."""
+        total = 0
+        for path in self.output_paths():
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    def _run_rolling(self, extractor):
+        # the parts of an earlier export of the task would be loaded too
+        id = os.path.basename(self.output_path).split(".")[0]
+        for path in Codec.data_files(os.path.dirname(self.output_path)):
+            if os.path.basename(path).startswith(f"{id}_"):
+                os.remove(path)
+
+        temp_paths = []
+
+        def temp_path_of(number):
+            temp_paths.append(
+                f"{self.part_path(number)}.{ConstantCatalog.EXPORT_TEMP_EXTENSION}"
+            )
+            return temp_paths[-1]
+
+        try:
+            written = extractor.extract_rolling(
+                self.query,
+                path_of=temp_path_of,
+                roll_bytes=int(self.roll_mb * 1024 ** 2),
+                field_delimiter=self.field_delimiter,
+                codec=self.codec,
+                table=self.table,
+            )
+            parts = [
+                (self.part_path(number), digest)
+                for number, (_, digest) in enumerate(written)
+            ]
+            for (path, _), temp_path in zip(parts, temp_paths):
+                os.replace(temp_path, path)
+            self.parts = parts
+            self.metered = True
+        except Exception:
+            for temp_path in temp_paths:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            raise
+
+    def __repr__(self):
+        return f"ExportTask({self.table}, '{self.output_path}')"
+
+
+class ExportScheduler:
+    """
+    Class for running the export tasks of all the tables with one shared worker budget.
+    Tasks are pulled in order, so tasks from different tables run side by side.
+    When adaptive, the amount of tasks in flight is set by a ConcurrencyController during the run,
+    between EXPORT_MIN_WORKERS and max_workers.
+
+    Args:
+        max_workers (int): The max amount of tasks running at once. 0 means twice the cpu count.
+        on_complete (callable): Optional function called with each task that finished successfully.
+        extractor (Extractor): The backend that executes the queries. The default is set by EXPORT_EXTRACTOR.
+        adaptive (bool): Whether to adapt the amount of tasks running at once to the observed throughput.
+        controller (ConcurrencyController): Optional controller to use when adaptive.
+        disk_budget (DiskBudget): Optional budget of the staged bytes. Every task reserves its estimated bytes
+            and waits to start while they don't fit.
+
+    Attributes:
+        max_workers (int): This is where we store the max_workers.
+        on_complete (callable): This is where we store the on_complete function.
+        extractor (Extractor): This is where we store the extractor.
+        controller (ConcurrencyController): This is where we store the controller, None if not adaptive.
+        disk_budget (DiskBudget): This is where we store the disk_budget, None if there is none.
+        failed (list[(ExportTask, Exception)]): Every task that failed and its exception.
+    """
+
+    logger = None
+
+    @classmethod
+    def get_logger(cls):
+        if cls.logger is None:
+            cls.logger = Logger(log_name=__name__)
+        return cls.logger
+
+    def __init__(
+        self,
+        max_workers=ConstantCatalog.EXPORT_MAX_WORKERS,
+        on_complete=None,
+        extractor=None,
+        adaptive=ConstantCatalog.EXPORT_ADAPTIVE_CONCURRENCY,
+        controller=None,
+        disk_budget=None,
+    ):
+        self.max_workers = max_workers or os.cpu_count() * 2
+        self.on_complete = on_complete
+        self.extractor = extractor or Extractor.from_name()
+        self.controller = controller
+        if adaptive and controller is None:
+            self.controller = ConcurrencyController(ceiling=self.max_workers)
+        self.disk_budget = disk_budget
+        self.failed = []
+
+    @staticmethod
+    def order_tasks(tasks, pinned_tables=None):
+        """Orders the tasks longest-processing-time-first, so the biggest work starts first and the
+            tail of the run isn't set by a big table that happened to be listed last.
+            Tasks of pinned tables go before everything else, in the pinned order.
+
+        Arguments:
+            tasks (list[ExportTask]): The tasks to order.
+            pinned_tables (list[str]): Optional tables in 'schema.table' format to start first.
+        Raises:
+            None
+        Returns:
+            tasks (list[ExportTask]): The ordered tasks.
+        """
+        pinned_rank = {tbl: i for i, tbl in enumerate(pinned_tables or [])}
+        unpinned = len(pinned_rank)
+
+        return sorted(
+            tasks,
+            key=lambda task: (
+                pinned_rank.get(task.table, unpinned),
+                -task.estimated_mb,
+            ),
+        )
+
+    def run(self, tasks):
+        """Runs all the tasks, keeping the worker pool full until every task is done.
+
+        Arguments:
+            tasks (list[ExportTask]): The tasks to run, in the order they should start.
+        Raises:
+            None
+        Returns:
+            failed (list[(ExportTask, Exception)]): Every task that failed and its exception.
+        """
+        tasks = list(tasks)
+        remaining = {}
+        for task in tasks:
+            remaining[task.table] = remaining.get(task.table, 0) + 1
+        started = {}
+
+        before_export_time = datetime.now()
+        ExportScheduler.get_logger().log.info(
+            f"Scheduling {len(tasks)} export tasks of {len(remaining)} tables on {self._limit()} workers, up to {self.max_workers}."
+        )
+
+        pending = iter(tasks)
+        # the controller meters the bytes while the exports stream, and decides every window even when none finishes
+        Execution.set_meter(self.controller)
+        timeout = None if self.controller is None else self.controller.window_s
+        try:
+            self._run(pending, remaining, started, before_export_time, timeout)
+        finally:
+            Execution.set_meter(None)
+
+        ExportScheduler.get_logger().log.info(
+            f"Entire export completed. Failed tasks: {len(self.failed)}. Total Time elapsed: {datetime.now() - before_export_time}."
+        )
+        return self.failed
+
+    def _run(self, pending, remaining, started, before_export_time, timeout):
+        with concurrent.futures.ThreadPoolExecutor(self.max_workers) as executor:
+
+            def submit(task):
+                started.setdefault(task.table, datetime.now())
+                return executor.submit(self._run_task, task)
+
+            # Schedule the first N futures. We don't want to schedule them all
+            # at once, to avoid consuming excessive amounts of memory
+            futures = {
+                submit(task): task
+                for task in itertools.islice(pending, self._limit())
+            }
+
+            while futures:
+                done, _ = concurrent.futures.wait(
+                    futures, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+
+                for fut in done:
+                    task = futures.pop(fut)
+                    remaining[task.table] -= 1
+                    try:
+                        fut.result()
+                        ExportScheduler.get_logger().log.debug(
+                            f"An export completed for {task.table}: '{task.output_path}'. Total Time elapsed: {datetime.now() - before_export_time}."
+                        )
+                        if self.controller is not None and not task.metered:
+                            # vsql wrote the file itself, its bytes are only known now
+                            self.controller.add_bytes(task.output_bytes())
+                        if self.on_complete is not None:
+                            self.on_complete(task)
+                    except Exception as e:
+                        self.failed.append((task, e))
+                        ExportScheduler.get_logger().log.error(
+                            f"Export of {task.table} to '{task.output_path}' failed: {e}"
+                        )
+                        if self.controller is not None:
+                            self.controller.record(failed=True)
+
+                    if remaining[task.table] == 0:
+                        ExportScheduler.get_logger().log.info(
+                            f"Table {task.table} export finished. Time elapsed: {datetime.now() - started[task.table]}."
+                        )
+
+                for task in itertools.islice(
+                    pending, max(self._limit() - len(futures), 0)
+                ):
+                    futures[submit(task)] = task
+                if self.controller is not None:
+                    self.controller.tick(in_flight=len(futures))
+
+    def _run_task(self, task):
+        if self.disk_budget is None or not task.stages_files:
+            task.run(self.extractor)
+            return
+        reserved = int(task.estimated_mb * 1024 ** 2)
+        self.disk_budget.reserve(reserved)
+        try:
+            task.run(self.extractor)
+        finally:
+            # a failed task removed its files, it settles at 0
+            self.disk_budget.settle(reserved, task.output_bytes())
+
+    def _limit(self):
+        if self.controller is None:
+            return self.max_workers
+        return self.controller.limit
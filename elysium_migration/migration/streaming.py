@@ -0,0 +1,181 @@
+import contextlib
+import errno
+import os
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+from elysium_migration import Logger
+from elysium_migration.migration.execute import Execution
+from elysium_migration.migration.scheduler import ExportTask
+
+
+class StreamLoadTask(ExportTask):
+    """
+    Class for an export task that loads its query straight into the target, without staging a file.
+    The query is written uncompressed into a named pipe next to the output path, which a ybload process reads
+    while it is being written. Nothing changes on the vertica side, the extractor writes to the pipe like to a file.
+    The task holds a write end of the pipe itself, so ybload only sees the end of the data when the query
+    succeeded. When it failed, ybload is stopped before that and commits nothing.
+
+    Args:
+        table (str): The name of the table in 'schema.table' format.
+        query (str): The query for vertica.
+        output_path (str): The path the file would have had, the pipe is named after it.
+        field_delimiter (str): The delimiter used to seperated fields.
+        estimated_mb (float): The estimated size of the data, used for ordering the tasks.
+        load_log_dir (Path): The directory of the ybload log files.
+        load_tuner (LoadTuner): The tuner of the readers and cores of ybload, None for the defaults.
+
+    Attributes:
+        load_log_dir (Path): This is where we store the load_log_dir.
+        load_tuner (LoadTuner): This is where we store the load_tuner.
+        fifo_path (str): The path of the named pipe.
+    """
+
+    # nothing is written to disk, the disk budget doesn't apply
+    stages_files = False
+
+    logger = None
+
+    @classmethod
+    def get_logger(cls):
+        if cls.logger is None:
+            cls.logger = Logger(log_name=__name__)
+        return cls.logger
+
+    def __init__(
+        self,
+        table,
+        query,
+        output_path,
+        field_delimiter=r"\t",
+        estimated_mb=0,
+        load_log_dir=None,
+        load_tuner=None,
+    ):
+        super(StreamLoadTask, self).__init__(
+            table,
+            query,
+            output_path,
+            codec=None,
+            field_delimiter=field_delimiter,
+            estimated_mb=estimated_mb,
+        )
+        self.load_log_dir = load_log_dir
+        self.load_tuner = load_tuner
+        self.fifo_path = f"{output_path}.fifo"
+
+    @classmethod
+    def of(cls, task, load_log_dir=None, load_tuner=None):
+        """Returns the streamed version of an export task"""
+        return cls(
+            table=task.table,
+            query=task.query,
+            output_path=task.output_path,
+            field_delimiter=task.field_delimiter,
+            estimated_mb=task.estimated_mb,
+            load_log_dir=load_log_dir,
+            load_tuner=load_tuner,
+        )
+
+    def run(self, extractor):
+        """Executes the query into the named pipe while ybload loads it
+
+        Arguments:
+            extractor (Extractor): The backend that executes the query.
+        Raises:
+            CalledProcessError: If ybload exits with a non zero status
+            Exception: Any error of the extractor, ybload is stopped then
+        Returns:
+            None
+        """
+        if os.path.exists(self.fifo_path):
+            os.remove(self.fifo_path)
+        os.mkfifo(self.fifo_path)
+        before_load = datetime.now()
+
+        if self.load_tuner is None:
+            tuning = contextlib.nullcontext((None, None))
+        else:
+            # the pipe is a single source, one reader reads it
+            tuning = self.load_tuner.load(1, self.output_bytes(), self.table)
+
+        with tuning as (num_readers, num_cores), tempfile.TemporaryFile() as output:
+            load = Execution.ybload_process(
+                table=self.table,
+                input_path=self.fifo_path,
+                extras=self._load_extras(),
+                field_delimiter=self.field_delimiter,
+                num_readers=num_readers,
+                num_cores=num_cores,
+                output=output,
+            )
+            try:
+                writer = StreamLoadTask._open_writer(self.fifo_path, load)
+                if writer is None:
+                    raise self._load_error(load, output)
+                extracted = False
+                try:
+                    digest = extractor.extract(
+                        self.query,
+                        output_path=self.fifo_path,
+                        field_delimiter=self.field_delimiter,
+                        codec=None,
+                        table=self.table,
+                    )
+                    extracted = True
+                    self.metered = digest is not None
+                finally:
+                    if not extracted:
+                        # ybload must not see the end of the data, it would commit what it has
+                        load.kill()
+                        load.wait()
+                    os.close(writer)
+
+                if load.wait() != 0:
+                    raise self._load_error(load, output)
+            finally:
+                if load.poll() is None:
+                    load.kill()
+                    load.wait()
+                os.remove(self.fifo_path)
+
+        StreamLoadTask.get_logger().log.debug(
+            f"Streamed {self.table} '{self.query}' into the target. Time elapsed: {datetime.now() - before_load}."
+        )
+
+    def output_bytes(self):
+        # nothing is staged, the estimate stands in for the throughput of the concurrency controller
+        return int(self.estimated_mb * 1024 ** 2)
+
+    def _load_extras(self):
+        if self.load_log_dir is None:
+            return ""
+        os.makedirs(self.load_log_dir, exist_ok=True)
+        now_str = datetime.now().strftime("%Y%m%d%H%M%S%f")
+        return f" --logfile {self.load_log_dir}/{self.table}_{now_str}.log --logfile-log-level DEBUG "
+
+    @staticmethod
+    def _open_writer(fifo_path, process, poll_s=0.05):
+        # opening the write end doesn't block but fails until ybload opened the read end
+        while True:
+            try:
+                return os.open(fifo_path, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError as e:
+                if e.errno != errno.ENXIO:
+                    raise
+            if process.poll() is not None:
+                return None
+            time.sleep(poll_s)
+
+    @staticmethod
+    def _load_error(process, output):
+        output.seek(0)
+        return subprocess.CalledProcessError(
+            process.returncode, process.args, output=output.read()
+        )
+
+    def __repr__(self):
+        return f"StreamLoadTask({self.table}, '{self.fifo_path}')"
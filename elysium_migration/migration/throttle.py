@@ -0,0 +1,260 @@
+import contextlib
+import threading
+import time
+from datetime import datetime
+
+from elysium_migration import Logger
+from elysium_migration.configuration.constants import ConstantCatalog
+
+
+class TokenBucket:
+    """
+    Class for a token bucket that limits a rate, e.g. bytes per second. A caller takes what it needs even when
+    the bucket is short and then waits off the debt, so the callers after it wait longer and the rate holds
+    for any amount of threads.
+
+    Args:
+        rate (float): The amount of tokens per second. 0 means unlimited.
+        burst_s (float): The amount of seconds of tokens the bucket holds when it is full.
+        clock (callable): Returns the current time in seconds.
+        sleep (callable): Sleeps for an amount of seconds.
+
+    Attributes:
+        rate (float): This is where we store the rate.
+    """
+
+    def __init__(self, rate=0, burst_s=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst_s = burst_s
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = rate * burst_s
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+    def acquire(self, amount):
+        """Takes an amount of tokens, and waits when the bucket is in debt
+
+        Arguments:
+            amount (float): The amount of tokens
+        Raises:
+            None
+        Returns:
+            waited (float): The amount of seconds waited
+        """
+        with self._lock:
+            if self.rate <= 0:
+                return 0
+            self._refill()
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def _refill(self):
+        now = self.clock()
+        if self.rate > 0:
+            self._tokens = min(
+                self._tokens + (now - self._last) * self.rate, self.rate * self.burst_s
+            )
+        self._last = now
+
+
+class Throttle:
+    """
+    Class for limiting what the exports take from a source host - bytes per second and queries at once.
+    The limits follow a time of day schedule, e.g. a reduced budget during business hours and full speed overnight.
+    Tables can have their own bytes per second on top of the limit of the host. Every wait is added to the run metrics.
+
+    Args:
+        host (str): The source host.
+        schedule (list[dict]): The entries of the schedule, with 'start' and 'end' in '%H:%M' format, 'mb_per_s'
+            and 'max_queries'. The first entry that covers the time of day applies.
+            An entry can cross midnight. 0 means unlimited.
+        mb_per_s (float): The bytes per second when no entry applies, in MB. 0 means unlimited.
+        max_queries (int): The queries at once when no entry applies. 0 means unlimited.
+        table_mb_per_s (dict[str:float]): The MB per second of single tables, by 'schema.table'.
+        metrics (RunMetrics): The run metrics the waits are added to.
+        now (callable): Returns the current datetime.
+
+    Attributes:
+        host (str): This is where we store the host.
+        mb_per_s (float): The current MB per second of the host.
+        max_queries (int): The current max amount of queries at once.
+    """
+
+    logger = None
+
+    @classmethod
+    def get_logger(cls):
+        if cls.logger is None:
+            cls.logger = Logger(log_name=__name__)
+        return cls.logger
+
+    def __init__(
+        self,
+        host="",
+        schedule=None,
+        mb_per_s=ConstantCatalog.EXPORT_THROTTLE_MB_PER_S,
+        max_queries=ConstantCatalog.EXPORT_THROTTLE_MAX_QUERIES,
+        table_mb_per_s=None,
+        metrics=None,
+        now=datetime.now,
+        sleep=time.sleep,
+    ):
+        self.host = host
+        self.schedule = (
+            ConstantCatalog.EXPORT_THROTTLE_SCHEDULE if schedule is None else schedule
+        )
+        self.default_mb_per_s = mb_per_s
+        self.default_max_queries = max_queries
+        self.metrics = metrics
+        self.now = now
+        self.mb_per_s = None
+        self.max_queries = None
+        self._bucket = TokenBucket(sleep=sleep)
+        self._table_buckets = {
+            table: TokenBucket(rate * 1024 ** 2, sleep=sleep)
+            for table, rate in (table_mb_per_s or {}).items()
+        }
+        self._active = 0
+        self._cond = threading.Condition()
+        self._refresh()
+
+    @classmethod
+    def from_config(cls, host, objects, metrics=None):
+        """Returns the throttle of a host, with the table limits set by 'throttled_tables' in the config file,
+            in form <schema>.<table>.<mb_per_s>.
+
+        Arguments:
+            host (str): The source host
+            objects (dict): The objects of the config file
+            metrics (RunMetrics): The run metrics the waits are added to
+        Raises:
+            ValueError: If a limit isn't a number
+        Returns:
+            throttle (Throttle): The throttle
+        """
+        table_mb_per_s = {}
+        for s in (objects or {}).get("throttled_tables") or []:
+            sc, tbl, rate = s.split(".", 2)
+            table_mb_per_s[f"{sc}.{tbl}"] = float(rate)
+        return cls(host=host, table_mb_per_s=table_mb_per_s, metrics=metrics)
+
+    def limited(self):
+        """Returns if anything is limited - a default limit, a schedule entry or a table. A throttle that
+            limits nothing isn't set, so the exports keep piping vsql into the codec utility."""
+        return bool(
+            self.default_max_queries
+            or any(entry.get("max_queries") for entry in self.schedule)
+            or self.limits_bytes()
+        )
+
+    def limits_bytes(self, table=None):
+        """Returns if the bytes of the table are limited at any time of day, only then an export has to be streamed
+
+        Arguments:
+            table (str): The table of the export, None for any table
+        Raises:
+            None
+        Returns:
+            limits_bytes (bool): If the bytes are limited
+        """
+        return bool(
+            self.default_mb_per_s
+            or any(entry.get("mb_per_s") for entry in self.schedule)
+            or (table in self._table_buckets if table else self._table_buckets)
+        )
+
+    def limits(self, now=None):
+        """Returns the limits that apply at a time of day
+
+        Arguments:
+            now (datetime): The time, the default is now
+        Raises:
+            None
+        Returns:
+            limits ((float, int)): The MB per second and the max amount of queries at once
+        """
+        now = now or self.now()
+        time_of_day = now.strftime("%H:%M")
+        for entry in self.schedule:
+            start, end = entry["start"], entry["end"]
+            if (start <= time_of_day < end) or (
+                start > end and (time_of_day >= start or time_of_day < end)
+            ):
+                return entry.get("mb_per_s", 0), entry.get("max_queries", 0)
+        return self.default_mb_per_s, self.default_max_queries
+
+    @contextlib.contextmanager
+    def query(self, table=None):
+        """Waits until another query may run against the host, for the duration of the with block
+
+        Arguments:
+            table (str): The table of the query, only for the log
+        Raises:
+            None
+        Returns:
+            None
+        """
+        self._refresh()
+        before_wait = time.monotonic()
+        with self._cond:
+            while self.max_queries and self._active >= self.max_queries:
+                self._cond.wait(1)
+                self._refresh()
+            self._active += 1
+        waited = time.monotonic() - before_wait
+        self._add("throttle_query_wait_s", waited)
+        if waited >= 1:
+            Throttle.get_logger().log.debug(
+                f"Waited {waited:.1f}s for a query slot on '{self.host}' for {table}. Max queries: {self.max_queries}."
+            )
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify()
+
+    def consume(self, num_bytes, table=None):
+        """Takes bytes from the budget of the host and of the table, and waits when they are used up
+
+        Arguments:
+            num_bytes (int): The amount of bytes read from the host
+            table (str): The table of the bytes
+        Raises:
+            None
+        Returns:
+            waited (float): The amount of seconds waited
+        """
+        self._refresh()
+        waited = self._bucket.acquire(num_bytes)
+        if table in self._table_buckets:
+            waited += self._table_buckets[table].acquire(num_bytes)
+        self._add("throttle_bytes_wait_s", waited)
+        self._add("throttle_bytes", num_bytes)
+        return waited
+
+    def _refresh(self):
+        mb_per_s, max_queries = self.limits()
+        if (mb_per_s, max_queries) == (self.mb_per_s, self.max_queries):
+            return
+        Throttle.get_logger().log.info(
+            f"Throttle of '{self.host}' is now {mb_per_s or 'unlimited'} MB/s and {max_queries or 'unlimited'} queries at once."
+        )
+        self._bucket.set_rate(mb_per_s * 1024 ** 2)
+        with self._cond:
+            self.mb_per_s, self.max_queries = mb_per_s, max_queries
+            self._cond.notify_all()
+
+    def _add(self, name, amount):
+        if self.metrics is not None:
+            self.metrics.add(name, amount)
@@ -3,7 +3,7 @@ import shutil
 from pathlib import Path
 
 import elysium_migration
-from elysium_migration import logger
+from elysium_migration import Logger
 from elysium_migration.migration.execute import ScriptCatalog
 
 
@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from elysium_migration import Logger
+
+
+class WatermarkStore:
+    """
+    Class for the on-disk SQLite store of the high-water mark of every table for incremental exports.
+    The mark is the highest value of the watermark column that is loaded into the target. An incremental
+    export only takes the rows above it, and the mark is only moved once the import of those rows succeeded.
+
+    Args:
+        path (Path): The path of the SQLite file. The directory is created if it doesn't exist.
+
+    Attributes:
+        path (Path): This is where we store the path.
+    """
+
+    logger = None
+
+    @classmethod
+    def get_logger(cls):
+        if cls.logger is None:
+            cls.logger = Logger(log_name=__name__)
+        return cls.logger
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        os.makedirs(self.path.parent, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS watermarks (
+                    table_name TEXT NOT NULL PRIMARY KEY,
+                    column_name TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    committed_at REAL NOT NULL
+                )
+                """
+            )
+
+    def get(self, table, column):
+        """Returns the committed mark of a table, or None if nothing was loaded incrementally yet.
+            A mark of another column doesn't count, the column of the table was changed.
+
+        Arguments:
+            table (str): The name of the table in 'schema.table' format.
+            column (str): The watermark column of the table.
+        Raises:
+            None
+        Returns:
+            value (str): The mark, formatted the way vsql prints it, or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT column_name, value FROM watermarks WHERE table_name = ?",
+                (table,),
+            ).fetchone()
+
+        if row is None or row[0] != column:
+            return None
+        return row[1]
+
+    def commit(self, table, column, value):
+        """Moves the mark of a table, after the rows up to it were loaded.
+
+        Arguments:
+            table (str): The name of the table in 'schema.table' format.
+            column (str): The watermark column of the table.
+            value (str): The new mark.
+        Raises:
+            None
+        Returns:
+            None
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?, ?)",
+                (table, column, value, time.time()),
+            )
+        WatermarkStore.get_logger().log.info(
+            f"Committed the {table} watermark {column} = '{value}'."
+        )
+
+    def reset(self, table=None):
+        """Deletes the mark of a table, or of every table, so the next incremental export takes every row.
+
+        Arguments:
+            table (str): Optional name of the table in 'schema.table' format.
+        Raises:
+            None
+        Returns:
+            None
+        """
+        sql, params = "DELETE FROM watermarks WHERE 1=1", []
+        if table is not None:
+            sql += " AND table_name = ?"
+            params.append(table)
+
+        with self._lock, self._conn:
+            deleted = self._conn.execute(sql, params).rowcount
+        WatermarkStore.get_logger().log.info(
+            f"Reset {deleted} watermarks. Table: {table or 'all'}."
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
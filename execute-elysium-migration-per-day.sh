@@ -14,9 +14,15 @@ lastdate=""
 scriptlog=""
 
 finish(){
+	status=$?
 	dt=`date '+%Y-%m-%d %H:%M:%S'`
 	echo "["$dt"] The last day loaded was "${lastdate}". Check logs to see if import for the next day already started." >> "${scriptlog}"
-	rm -rf ${datadir}/*
+	# keep the exported chunks and their manifest after a failure, so the export can be resumed
+	if [ "$status" -eq "0" ]; then
+		rm -rf ${datadir}/*
+	else
+		echo "["$dt"] Exit status "${status}". Keeping "${datadir}" so the next run resumes the export." >> "${scriptlog}"
+	fi
 }
 trap finish EXIT
 
@@ -102,7 +108,12 @@ for day in $arr; do
 	echo "["$dt"] Exporting data from ${fromdate} to ${todate}..." | tee -a $scriptlog
 	sleep 2
 	
-	elysium-migrate-cli export -o ${datadir} -c $(pwd)/tests/configuration/vertica_test_all.yaml -ed $(pwd) -ll DEBUG  -lp ${applogname} --from-date ${fromdate}" 00:00:00" --to-date ${todate}" 00:00:00" 2>&1 1>>${scriptlog}
+	elysium-migrate-cli export -o ${datadir} -c $(pwd)/tests/configuration/vertica_test_all.yaml -ed $(pwd) -ll DEBUG  -lp ${applogname} --from-date ${fromdate}" 00:00:00" --to-date ${todate}" 00:00:00" --resume 2>&1 1>>${scriptlog}
+	if [ "$?" -ne "0" ]; then
+		dt=`date '+%Y-%m-%d %H:%M:%S'`
+		echo "["$dt"] Export from ${fromdate} to ${todate} failed. Not importing." | tee -a $scriptlog
+		exit 1
+	fi
 	
 	dt=`date '+%Y-%m-%d %H:%M:%S'`
 	echo "["$dt"] Export finished. Now importing data from ${fromdate} to ${todate}..." | tee -a $scriptlog
@@ -0,0 +1,88 @@
+import json
+import threading
+
+import pytest
+
+from elysium_migration.migration.backfill import Backfill
+
+
+def _backfill(tmp_path, **kwargs):
+    return Backfill(
+        export_objects={"tables": ["Elysium.T0"]},
+        output_dir=tmp_path,
+        script_dir=tmp_path,
+        validation_results_dir=tmp_path,
+        **kwargs,
+    )
+
+
+def test_windows():
+    assert Backfill.windows("2021-06-01 00:00:00", "2021-06-04 00:00:00") == [
+        ("2021-06-01 00:00:00", "2021-06-02 00:00:00"),
+        ("2021-06-02 00:00:00", "2021-06-03 00:00:00"),
+        ("2021-06-03 00:00:00", "2021-06-04 00:00:00"),
+    ]
+    assert Backfill.windows("2021-06-01 00:00:00", "2021-06-04 00:00:00", 2) == [
+        ("2021-06-01 00:00:00", "2021-06-03 00:00:00"),
+        ("2021-06-03 00:00:00", "2021-06-04 00:00:00"),
+    ]
+
+
+def test_export_overlaps_the_previous_import(tmp_path):
+    backfill = _backfill(tmp_path, days_in_flight=2)
+    events = []
+    release = threading.Event()
+
+    def export_window(window, resume=False):
+        events.append(("export", window[0][:10]))
+        if window[0].startswith("2021-06-02"):
+            # the import of the first day is still running
+            release.set()
+        return tmp_path / window[0][:10]
+
+    def import_window(window, window_dir):
+        if window[0].startswith("2021-06-01"):
+            assert release.wait(5)
+        events.append(("import", window[0][:10]))
+
+    backfill.export_window = export_window
+    backfill.import_window = import_window
+    backfill.run("2021-06-01 00:00:00", "2021-06-04 00:00:00")
+
+    assert events.index(("export", "2021-06-02")) < events.index(("import", "2021-06-01"))
+    assert [e for e in events if e[0] == "import"] == [
+        ("import", "2021-06-01"),
+        ("import", "2021-06-02"),
+        ("import", "2021-06-03"),
+    ]
+
+
+def test_resume_skips_imported_windows(tmp_path):
+    backfill = _backfill(tmp_path, days_in_flight=1)
+    exported = []
+
+    def export_window(window, resume=False):
+        exported.append(window[0][:10])
+        return tmp_path
+
+    def failing_import(window, window_dir):
+        if window[0].startswith("2021-06-02"):
+            raise RuntimeError("ybload failed")
+
+    backfill.export_window = export_window
+    backfill.import_window = failing_import
+    with pytest.raises(RuntimeError):
+        backfill.run("2021-06-01 00:00:00", "2021-06-04 00:00:00")
+
+    with open(backfill.state_path) as f:
+        assert json.load(f)["done"] == ["2021-06-01 00:00:00"]
+
+    exported.clear()
+    backfill.import_window = lambda window, window_dir: None
+    backfill.run("2021-06-01 00:00:00", "2021-06-04 00:00:00", resume=True)
+
+    assert exported == ["2021-06-02", "2021-06-03"]
+
+
+def test_validation_doesnt_overlap_windows(tmp_path):
+    assert _backfill(tmp_path, days_in_flight=3, validate=True).days_in_flight == 1
@@ -0,0 +1,159 @@
+import pytest
+
+from elysium_migration.migration.boundaries import (
+    BoundaryPlanner,
+    DateHistogramPlanner,
+    PercentilePlanner,
+    RangePlanner,
+    RowNumberPlanner,
+)
+from elysium_migration.migration.execute import Execution
+
+
+@pytest.fixture(autouse=True)
+def numeric_columns(monkeypatch):
+    monkeypatch.setattr(
+        Execution, "vsql_is_character_column", lambda table, column: False
+    )
+
+
+def test_where_clauses_are_half_open_and_deduplicated():
+    clauses = BoundaryPlanner.where_clauses("Id", ["300", "100", "100", "100", "200"])
+
+    assert clauses == [
+        "(Id < 100 OR Id IS NULL)",
+        "Id >= 100 AND Id < 200",
+        "Id >= 200 AND Id < 300",
+        "Id >= 300",
+    ]
+
+
+def test_where_clauses_quote_timestamps():
+    clauses = BoundaryPlanner.where_clauses(
+        "MartModifiedDate", ["2021-06-15 00:00:00", "2021-06-15 00:00:00"]
+    )
+
+    assert clauses == [
+        "(MartModifiedDate < '2021-06-15 00:00:00' OR MartModifiedDate IS NULL)",
+        "MartModifiedDate >= '2021-06-15 00:00:00'",
+    ]
+
+
+def test_where_clauses_without_boundaries():
+    assert BoundaryPlanner.where_clauses("Id", []) == ["1 = 1"]
+
+
+def test_where_clauses_keep_character_keys_as_strings():
+    clauses = BoundaryPlanner.where_clauses(
+        "AccountNumber", ["00123", "0099", "00123"], character=True
+    )
+
+    assert clauses == [
+        "(AccountNumber < '00123' OR AccountNumber IS NULL)",
+        "AccountNumber >= '00123' AND AccountNumber < '0099'",
+        "AccountNumber >= '0099'",
+    ]
+
+
+def test_row_number_planner_on_a_character_column(monkeypatch):
+    monkeypatch.setattr(
+        Execution, "vsql_is_character_column", lambda table, column: True
+    )
+    monkeypatch.setattr(
+        Execution,
+        "vsql_get_chunk_boundaries",
+        lambda table, column, chunk_size, predicate="": ["00123", "1e5"],
+    )
+
+    clauses = RowNumberPlanner().plan("Elysium.T0", "AccountNumber", chunk_size=1000)
+
+    assert clauses == [
+        "(AccountNumber < '00123' OR AccountNumber IS NULL)",
+        "AccountNumber >= '00123' AND AccountNumber < '1e5'",
+        "AccountNumber >= '1e5'",
+    ]
+
+
+def test_range_planner_splits_evenly(monkeypatch):
+    monkeypatch.setattr(
+        Execution,
+        "vsql_get_key_range",
+        lambda table, column, predicate="": ("0", "1000", 4000),
+    )
+
+    clauses = RangePlanner().plan("Elysium.T0", "Id", chunk_size=1000)
+
+    assert clauses == [
+        "(Id < 250 OR Id IS NULL)",
+        "Id >= 250 AND Id < 500",
+        "Id >= 500 AND Id < 750",
+        "Id >= 750",
+    ]
+
+
+def test_range_planner_small_key_range_has_no_empty_chunks(monkeypatch):
+    monkeypatch.setattr(
+        Execution,
+        "vsql_get_key_range",
+        lambda table, column, predicate="": ("1", "2", 10_000),
+    )
+
+    clauses = RangePlanner().plan("Elysium.T0", "Id", chunk_size=1000)
+
+    assert clauses == ["(Id < 2 OR Id IS NULL)", "Id >= 2"]
+
+
+def test_percentile_planner(monkeypatch):
+    requested = []
+    monkeypatch.setattr(
+        Execution,
+        "vsql_get_key_range",
+        lambda table, column, predicate="": ("0", "100", 3000),
+    )
+
+    def percentiles(table, column, percentiles, predicate=""):
+        requested.extend(percentiles)
+        return ["10.5", "90"]
+
+    monkeypatch.setattr(Execution, "vsql_get_key_percentiles", percentiles)
+
+    clauses = PercentilePlanner().plan("Elysium.T0", "Id", chunk_size=1000)
+
+    assert requested == [0.333333, 0.666667]
+    assert clauses == [
+        "(Id < 10.5 OR Id IS NULL)",
+        "Id >= 10.5 AND Id < 90",
+        "Id >= 90",
+    ]
+
+
+def test_date_histogram_planner(monkeypatch):
+    requested = []
+
+    def histogram(table, column, granularity="hour", predicate=""):
+        requested.append((column, granularity, predicate))
+        return [
+            ("", 5),
+            ("2021-06-15 00:00:00", 600),
+            ("2021-06-15 01:00:00", 500),
+            ("2021-06-15 02:00:00", 2500),
+            ("2021-06-15 03:00:00", 100),
+            ("2021-06-15 04:00:00", 100),
+        ]
+
+    monkeypatch.setattr(Execution, "vsql_get_date_histogram", histogram)
+
+    predicate = " AND CLOCK_TIMESTAMP >= '2021-06-15 00:00:00' AND CLOCK_TIMESTAMP < '2021-06-16 00:00:00'"
+    clauses = DateHistogramPlanner().plan("Elysium.T0", "Id", chunk_size=1000, predicate=predicate)
+
+    assert requested == [("CLOCK_TIMESTAMP", "hour", predicate)]
+    assert clauses == [
+        "(CLOCK_TIMESTAMP < '2021-06-15 02:00:00' OR CLOCK_TIMESTAMP IS NULL)",
+        "CLOCK_TIMESTAMP >= '2021-06-15 02:00:00' AND CLOCK_TIMESTAMP < '2021-06-15 03:00:00'",
+        "CLOCK_TIMESTAMP >= '2021-06-15 03:00:00'",
+    ]
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        BoundaryPlanner.from_name("sort")
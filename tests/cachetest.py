@@ -0,0 +1,57 @@
+import time
+
+from elysium_migration.migration.cache import MetadataCache
+from elysium_migration.migration.execute import Execution
+
+
+def test_cache_persists_between_instances(tmp_path):
+    path = tmp_path / "cache" / "metadata.sqlite"
+    MetadataCache(path).set("Elysium.T0", "column_names", ["id", "name"])
+
+    assert MetadataCache(path).get("Elysium.T0", "column_names") == ["id", "name"]
+    assert MetadataCache(path).get("Elysium.T0", "table_size_mb") is None
+
+
+def test_cache_expires_after_ttl(tmp_path):
+    cache = MetadataCache(tmp_path / "metadata.sqlite", ttl_s=0.05)
+    cache.set("Elysium.T0", "table_size_mb", "120.5")
+
+    assert cache.get("Elysium.T0", "table_size_mb") == "120.5"
+    time.sleep(0.1)
+    assert cache.get("Elysium.T0", "table_size_mb") is None
+
+
+def test_cache_invalidate(tmp_path):
+    cache = MetadataCache(tmp_path / "metadata.sqlite")
+    for tbl in ["Elysium.T0", "Elysium.T1"]:
+        cache.set(tbl, "chunk_size", "1000")
+        cache.set(tbl, "table_size_mb", "10")
+
+    cache.invalidate(table="Elysium.T0")
+    assert cache.get("Elysium.T0", "chunk_size") is None
+    assert cache.get("Elysium.T1", "chunk_size") == "1000"
+
+    cache.invalidate(kind="table_size_mb")
+    assert cache.get("Elysium.T1", "table_size_mb") is None
+    assert cache.get("Elysium.T1", "chunk_size") == "1000"
+
+    cache.invalidate()
+    assert cache.get("Elysium.T1", "chunk_size") is None
+
+
+def test_execution_reads_from_cache(tmp_path, monkeypatch):
+    queries = []
+
+    def query_value(query, platform=None):
+        queries.append(query)
+        return "42"
+
+    monkeypatch.setattr(Execution, "query_value", query_value)
+    Execution.set_metadata_cache(MetadataCache(tmp_path / "metadata.sqlite"))
+    try:
+        assert Execution.vsql_get_table_size_mb(table="Elysium.T0") == "42"
+        assert Execution.vsql_get_table_size_mb(table="Elysium.T0") == "42"
+    finally:
+        Execution.set_metadata_cache(None)
+
+    assert len(queries) == 1
@@ -0,0 +1,47 @@
+from elysium_migration.migration.cache import MetadataCache
+from elysium_migration.migration.execute import Execution, StatementCatalog, TableStats
+
+
+def test_snapshot_query_filters_every_table():
+    query = StatementCatalog.get_catalog_snapshot(["Elysium.T0", "Elysium.T1"])
+
+    assert "(sc.schema_name = 'Elysium' AND p.anchor_table_name = 'T0')" in query
+    assert "(sc.schema_name = 'Elysium' AND p.anchor_table_name = 'T1')" in query
+    assert query.count("v_monitor.storage_containers") == 1
+
+
+def test_table_stats_chunk_size():
+    stats = TableStats(rows=10_000_000, used_bytes=20_000 * 1024 ** 2)
+
+    assert stats.size_mb == 20_000
+    assert stats.avg_row_bytes == 20_000 * 1024 ** 2 / 10_000_000
+    # 5000 mb per file out of 20000 mb
+    assert stats.chunk_size(chunk_size_mb=5000) == 2_500_000
+    assert TableStats().chunk_size() == 0
+
+
+def test_snapshot_queries_only_uncached_tables(tmp_path, monkeypatch):
+    queries = []
+
+    def query_rows(query, platform=None):
+        queries.append(query)
+        return [["Elysium", "T1", "100", "2048", "20.48"]]
+
+    monkeypatch.setattr(Execution, "query_rows", query_rows)
+    cache = MetadataCache(tmp_path / "metadata.sqlite")
+    cache.set("Elysium.T0", "catalog_snapshot", [5, 50])
+    Execution.set_metadata_cache(cache)
+    try:
+        snapshot = Execution.vsql_get_catalog_snapshot(
+            ["Elysium.T0", "Elysium.T1", "Elysium.Empty"]
+        )
+    finally:
+        Execution.set_metadata_cache(None)
+
+    assert len(queries) == 1
+    assert "'T0'" not in queries[0]
+    assert (snapshot["Elysium.T0"].rows, snapshot["Elysium.T0"].used_bytes) == (5, 50)
+    assert (snapshot["Elysium.T1"].rows, snapshot["Elysium.T1"].used_bytes) == (100, 2048)
+    assert snapshot["Elysium.Empty"].rows == 0
+    assert cache.get("Elysium.T1", "catalog_snapshot") == [100, 2048]
+    assert cache.get("Elysium.Empty", "catalog_snapshot") is None
@@ -0,0 +1,111 @@
+import concurrent.futures
+import gzip
+import math
+import zlib
+
+import pytest
+
+from elysium_migration.migration.compression import BlockCompressor, Codec, RollingWriter
+from elysium_migration.migration.execute import StatementCatalog
+
+
+def test_from_name():
+    assert Codec.from_name("none") is None
+    assert Codec.from_name("zstd", 0).level == 3
+    assert Codec.from_name("gzip", 9).command() == "gzip -c -9"
+    with pytest.raises(ValueError):
+        Codec.from_name("bzip2")
+
+
+def test_file_name():
+    assert Codec.file_name(3) == "3.csv"
+    assert Codec.file_name(3, Codec("gzip")) == "3.csv.gz"
+    assert Codec.file_name(3, Codec("zstd")) == "3.csv.zst"
+    assert Codec.file_name(3, Codec("lz4")) == "3.csv.lz4"
+
+
+def test_data_files_finds_every_codec(tmp_path):
+    for name in ["0.csv", "1.csv.gz", "2.csv.zst", "3.csv.lz4", "checksum.log"]:
+        (tmp_path / name).touch()
+
+    assert [f.split("/")[-1] for f in Codec.data_files(tmp_path)] == [
+        "0.csv",
+        "1.csv.gz",
+        "2.csv.zst",
+        "3.csv.lz4",
+    ]
+
+
+def test_gzip_round_trip(tmp_path):
+    codec = Codec("gzip", 1)
+    path = tmp_path / "0.csv.gz"
+    with codec.open(path, "wt") as f:
+        f.write("ID\n1\n")
+
+    with codec.open(path, "rt") as f:
+        assert f.read() == "ID\n1\n"
+
+
+def test_vsql_pipes_through_codec():
+    statement = StatementCatalog.vsql(
+        "SELECT 1", output_path="/data/0.csv.zst", field_delimiter=r"\t", codec=Codec("zstd")
+    )
+
+    assert statement.endswith("| zstd -q -c -3 > /data/0.csv.zst")
+    assert "-o /data" not in statement
+
+
+def test_block_compressor_writes_gzip_members_in_order(tmp_path):
+    data = b"".join(f"{i}\tSYM{i}\t{i * 1.5}\n".encode() for i in range(20000))
+    path = tmp_path / "0.csv.gz"
+
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        with BlockCompressor(
+            Codec("gzip", 1), path, executor, block_size=4096, max_pending=2
+        ) as compressor:
+            for i in range(0, len(data), 1000):
+                compressor.write(data[i : i + 1000])
+
+    raw = path.read_bytes()
+    members = 0
+    while raw:
+        d = zlib.decompressobj(wbits=31)
+        d.decompress(raw)
+        raw = d.unused_data
+        members += 1
+
+    assert members == math.ceil(len(data) / 4096)
+    assert gzip.decompress(path.read_bytes()) == data
+    assert compressor.bytes_in == len(data)
+    assert compressor.bytes_out == path.stat().st_size
+
+
+def test_rolling_writer_cuts_at_line_ends(tmp_path):
+    lines = [f"{i}\tname {i}\n".encode() for i in range(100)]
+    data = b"id\tname\n" + b"".join(lines)
+
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        with RollingWriter(
+            lambda n: str(tmp_path / f"0_{n}.csv.gz"), 200, Codec("gzip"), executor
+        ) as writer:
+            # the stream is handed over in pieces that split lines and the header
+            for i in range(0, len(data), 7):
+                writer.write(data[i : i + 7])
+
+    assert len(writer.paths) > 1
+    rows = []
+    for path in writer.paths:
+        with gzip.open(path, "rb") as f:
+            content = f.read().splitlines(keepends=True)
+        assert content[0] == b"id\tname\n"
+        rows.extend(content[1:])
+    assert rows == lines
+
+
+def test_rolling_writer_without_rows(tmp_path):
+    with RollingWriter(lambda n: str(tmp_path / f"0_{n}.csv"), 200) as writer:
+        writer.write(b"id\tname\n")
+
+    assert writer.paths == [str(tmp_path / "0_0.csv")]
+    with open(writer.paths[0], "rb") as f:
+        assert f.read() == b"id\tname\n"
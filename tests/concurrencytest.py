@@ -0,0 +1,122 @@
+from elysium_migration.migration.concurrency import ConcurrencyController
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+MB = 1024 ** 2
+
+
+def test_additive_increase_while_throughput_keeps_up():
+    clock = FakeClock()
+    controller = ConcurrencyController(
+        floor=2, ceiling=5, initial=2, window_s=10, clock=clock
+    )
+
+    for _ in range(5):
+        controller.record(num_bytes=10 * MB)
+        clock.now += 10
+        controller.record(num_bytes=100 * MB)
+
+    assert controller.limit == 5
+    assert [(old, new) for old, new, _ in controller.decisions] == [
+        (2, 3),
+        (3, 4),
+        (4, 5),
+    ]
+
+
+def test_multiplicative_decrease_on_errors():
+    controller = ConcurrencyController(
+        floor=2, ceiling=16, initial=16, window_s=10, clock=FakeClock()
+    )
+
+    controller.record(failed=True)
+    assert controller.limit == 12
+    controller.record(failed=True)
+    controller.record(failed=True)
+    controller.record(failed=True)
+    controller.record(failed=True)
+    assert controller.limit == 3
+    controller.record(failed=True)
+    assert controller.limit == 2
+
+
+def test_decrease_when_throughput_drops():
+    clock = FakeClock()
+    controller = ConcurrencyController(
+        floor=1, ceiling=20, initial=8, window_s=10, clock=clock
+    )
+
+    clock.now += 10
+    controller.record(num_bytes=1000 * MB)
+    assert controller.limit == 9
+
+    clock.now += 10
+    controller.record(num_bytes=500 * MB)
+    assert controller.limit == 6
+    assert "dropped" in controller.decisions[-1][2]
+
+
+def test_no_decision_inside_window():
+    clock = FakeClock()
+    controller = ConcurrencyController(floor=1, ceiling=8, initial=4, window_s=10, clock=clock)
+
+    clock.now += 5
+    controller.record(num_bytes=MB)
+
+    assert controller.limit == 4
+    assert controller.decisions == []
+
+
+def test_metered_bytes_decide_without_finished_exports():
+    clock = FakeClock()
+    controller = ConcurrencyController(floor=1, ceiling=8, initial=4, window_s=10, clock=clock)
+
+    controller.add_bytes(100 * MB)
+    clock.now += 10
+    assert controller.tick(in_flight=4) == 5
+
+    controller.add_bytes(40 * MB)
+    clock.now += 10
+    assert controller.tick(in_flight=5) == 3
+    assert "dropped" in controller.decisions[-1][2]
+
+
+def test_tail_of_the_run_isnt_a_throughput_drop():
+    clock = FakeClock()
+    controller = ConcurrencyController(floor=1, ceiling=8, initial=4, window_s=10, clock=clock)
+
+    controller.add_bytes(100 * MB)
+    clock.now += 10
+    controller.tick(in_flight=4)
+
+    # one small table left
+    controller.add_bytes(MB)
+    clock.now += 10
+    assert controller.tick(in_flight=1) == 5
+    assert len(controller.decisions) == 1
+
+
+def test_decrease_when_queries_queue():
+    clock = FakeClock()
+    controller = ConcurrencyController(floor=1, ceiling=16, initial=8, window_s=10, clock=clock)
+
+    for seconds in (0.2, 0.3, 0.4):
+        controller.add_latency(seconds)
+    controller.add_bytes(100 * MB)
+    clock.now += 10
+    assert controller.tick(in_flight=8) == 9
+
+    # the same throughput, but the queries wait in the resource pool
+    for seconds in (5, 6, 7):
+        controller.add_latency(seconds)
+    controller.add_bytes(100 * MB)
+    clock.now += 10
+    assert controller.tick(in_flight=9) == 6
+    assert "first byte" in controller.decisions[-1][2]
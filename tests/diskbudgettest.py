@@ -0,0 +1,136 @@
+import os
+import threading
+from collections import namedtuple
+
+import pytest
+
+from elysium_migration.migration.diskbudget import DiskBudget, InsufficientDiskSpaceError
+from elysium_migration.migration.metrics import RunMetrics
+from elysium_migration.migration.scheduler import ExportScheduler, ExportTask
+
+
+class WritingTask(ExportTask):
+    def __init__(self, table, output_path, num_bytes, estimated_mb=0, on_run=None):
+        super(WritingTask, self).__init__(
+            table, "", str(output_path), estimated_mb=estimated_mb
+        )
+        self.num_bytes = num_bytes
+        self.on_run = on_run
+
+    def run(self, extractor):
+        if self.on_run is not None:
+            self.on_run()
+        with open(self.output_path, "wb") as f:
+            f.write(b"x" * self.num_bytes)
+
+
+def test_check_free_space(tmp_path, monkeypatch):
+    StatVfs = namedtuple("StatVfs", ["f_bavail", "f_frsize"])
+    monkeypatch.setattr(os, "statvfs", lambda path: StatVfs(10, 1024 ** 2))
+
+    assert DiskBudget(tmp_path, budget_mb=10).check_free_space() == 10 * 1024 ** 2
+    with pytest.raises(InsufficientDiskSpaceError):
+        DiskBudget(tmp_path, budget_mb=11).check_free_space()
+
+
+def test_wait_for_room_until_released(tmp_path):
+    metrics = RunMetrics()
+    budget = DiskBudget(tmp_path, budget_mb=1, metrics=metrics)
+    budget.staged(1024 ** 2)
+    waited = threading.Event()
+
+    def export():
+        budget.wait_for_room()
+        waited.set()
+
+    thread = threading.Thread(target=export)
+    thread.start()
+    assert not waited.wait(0.05)
+
+    budget.release(1024)
+    thread.join(5)
+    assert waited.is_set()
+    assert budget.staged_bytes == 1024 ** 2 - 1024
+    assert metrics.get("disk_budget_wait_s") > 0
+
+
+def test_scheduler_pauses_while_over_budget(tmp_path):
+    budget = DiskBudget(tmp_path, budget_mb=0)
+    budget.budget_bytes = 250
+    peak = [0]
+    deleted = []
+
+    def on_complete(task):
+        peak[0] = max(peak[0], budget.staged_bytes)
+        # the pipeline loads and deletes the file in another thread
+        def load():
+            num_bytes = os.path.getsize(task.output_path)
+            os.remove(task.output_path)
+            deleted.append(task.output_path)
+            budget.release(num_bytes)
+
+        threading.Timer(0.01, load).start()
+
+    tasks = [WritingTask("Elysium.T0", tmp_path / f"{i}.csv", 100) for i in range(10)]
+    failed = ExportScheduler(
+        max_workers=1, on_complete=on_complete, adaptive=False, disk_budget=budget
+    ).run(tasks)
+
+    assert failed == []
+    assert peak[0] <= 300
+    # the last loads finish after the export
+    for _ in range(100):
+        if len(deleted) == 10:
+            break
+        threading.Event().wait(0.01)
+    assert budget.staged_bytes == 0
+
+
+def test_reserve_before_export(tmp_path):
+    budget = DiskBudget(tmp_path, budget_mb=0)
+    budget.budget_bytes = 250
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def on_run():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        threading.Event().wait(0.02)
+        with lock:
+            running[0] -= 1
+
+    def on_complete(task):
+        num_bytes = os.path.getsize(task.output_path)
+        os.remove(task.output_path)
+        budget.release(num_bytes)
+
+    # the files are smaller than estimated, the reservations are settled to them
+    tasks = [
+        WritingTask("Elysium.T0", tmp_path / f"{i}.csv", 50, 100 / 1024 ** 2, on_run)
+        for i in range(8)
+    ]
+    failed = ExportScheduler(
+        max_workers=8, on_complete=on_complete, adaptive=False, disk_budget=budget
+    ).run(tasks)
+
+    assert failed == []
+    # only two reservations of 100 bytes fit at once
+    assert peak[0] == 2
+    assert budget.staged_bytes == 0
+
+
+def test_failed_export_settles_its_reservation(tmp_path):
+    budget = DiskBudget(tmp_path, budget_mb=1)
+    reserved = []
+
+    def on_run():
+        reserved.append(budget.staged_bytes)
+        raise RuntimeError("vsql failed")
+
+    task = WritingTask("Elysium.T0", tmp_path / "0.csv", 10, 0.5, on_run)
+    failed = ExportScheduler(max_workers=1, adaptive=False, disk_budget=budget).run([task])
+
+    assert len(failed) == 1
+    assert reserved == [1024 ** 2 // 2]
+    assert budget.staged_bytes == 0
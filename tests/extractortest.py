@@ -0,0 +1,130 @@
+import gzip
+import os
+import subprocess
+import sqlite3
+
+import pytest
+
+from elysium_migration.migration.compression import Codec
+from elysium_migration.migration.execute import Execution
+from elysium_migration.migration.extractor import Extractor, OdbcExtractor, VsqlExtractor
+from elysium_migration.migration.integrity import ChunkDigest
+from elysium_migration.migration.scheduler import ExportTask
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    path = str(tmp_path / "stand_in.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE orders (ID INTEGER, Symbol TEXT, Price REAL)")
+    conn.executemany(
+        "INSERT INTO orders VALUES (?, ?, ?)",
+        [(i, None if i % 3 == 0 else f"SYM{i}", i * 1.5) for i in range(1, 26)],
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def odbc_extractor(sqlite_db):
+    connections = []
+
+    def connect():
+        conn = sqlite3.connect(sqlite_db, check_same_thread=False)
+        connections.append(conn)
+        return conn
+
+    extractor = OdbcExtractor(connect=connect, batch_size=7)
+    extractor.connections = connections
+    yield extractor
+    extractor.close()
+
+
+def test_from_name():
+    assert isinstance(Extractor.from_name("vsql"), VsqlExtractor)
+    assert isinstance(Extractor.from_name("odbc"), OdbcExtractor)
+    with pytest.raises(ValueError):
+        Extractor.from_name("jdbc")
+
+
+def test_odbc_extract_matches_vsql_layout(odbc_extractor, tmp_path):
+    output_path = str(tmp_path / "0.csv")
+
+    digest = odbc_extractor.extract(
+        "SELECT * FROM orders WHERE ID <= 3 ORDER BY ID", output_path
+    )
+
+    assert digest.rows == 3
+    with open(output_path) as f:
+        assert f.read() == "ID\tSymbol\tPrice\n1\tSYM1\t1.5\n2\tSYM2\t3.0\n3\t\t4.5\n"
+
+
+def test_odbc_extract_compressed_in_batches(odbc_extractor, tmp_path):
+    output_path = str(tmp_path / "0.csv.gz")
+
+    digest = odbc_extractor.extract(
+        "SELECT ID FROM orders", output_path, codec=Codec("gzip")
+    )
+
+    assert digest.rows == 25
+    assert digest == ChunkDigest.of_file(output_path, Codec("gzip"))
+    with gzip.open(output_path, "rt") as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "ID"
+    assert lines[1:] == [str(i) for i in range(1, 26)]
+
+
+def test_odbc_extract_reuses_connection(odbc_extractor, tmp_path):
+    for i in range(5):
+        odbc_extractor.extract("SELECT ID FROM orders", str(tmp_path / f"{i}.csv"))
+
+    assert len(odbc_extractor.connections) == 1
+
+
+def test_odbc_extract_discards_broken_connection(odbc_extractor, tmp_path):
+    with pytest.raises(sqlite3.Error):
+        odbc_extractor.extract("SELECT * FROM missing_table", str(tmp_path / "0.csv"))
+    odbc_extractor.extract("SELECT ID FROM orders", str(tmp_path / "1.csv"))
+
+    assert len(odbc_extractor.connections) == 2
+
+
+def test_vsql_extract_block_compresses_stream(tmp_path, monkeypatch):
+    def vsql_stream(query, write, field_delimiter=",", table=None):
+        write(b"ID\n")
+        for i in range(1, 26):
+            write(f"{i}\n".encode())
+
+    monkeypatch.setattr(Execution, "vsql_stream", vsql_stream)
+    extractor = VsqlExtractor(compression_threads=2)
+    output_path = str(tmp_path / "0.csv.gz")
+
+    extractor.extract("SELECT ID FROM orders", output_path, codec=Codec("gzip"))
+    extractor.close()
+
+    with gzip.open(output_path, "rt") as f:
+        assert f.read().splitlines() == ["ID"] + [str(i) for i in range(1, 26)]
+
+
+def test_vsql_failure_fails_the_compression_pipe(tmp_path, monkeypatch):
+    # a vsql that writes part of the rows and then fails
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "vsql").write_text("#!/bin/sh\nprintf 'ID\\n1\\n'\nexit 2\n")
+    os.chmod(bin_dir / "vsql", 0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    task = ExportTask("Elysium.T0", "SELECT ID FROM orders", str(tmp_path / "0.csv.gz"), codec=Codec("gzip"))
+    with pytest.raises(subprocess.CalledProcessError):
+        task.run(VsqlExtractor(block_compression=False))
+
+    assert not os.path.exists(task.output_path)
+    assert not os.path.exists(task.temp_path)
+
+
+def test_base_extractor_is_abstract(tmp_path):
+    with pytest.raises(NotImplementedError):
+        Extractor().extract("SELECT 1", str(tmp_path / "0.csv"))
+    with pytest.raises(NotImplementedError):
+        Extractor().extract_rolling("SELECT 1", lambda n: str(tmp_path / f"0_{n}.csv"), 1024)
@@ -0,0 +1,195 @@
+import os
+import threading
+import time
+
+import pytest
+
+from elysium_migration.configuration.constants import ConstantCatalog
+from elysium_migration.migration.importer import Importer, ImportFailedError
+from elysium_migration.migration.manifest import ChunkStatus, ExportManifest
+from elysium_migration.migration.scheduler import ExportTask
+
+
+def _importer(tmp_path, tables, max_workers):
+    return Importer(
+        {"tables": tables}, tmp_path, tmp_path, tmp_path / "validation", max_workers=max_workers
+    )
+
+
+def test_tables_load_side_by_side(tmp_path):
+    tables = [f"Elysium.T{i}" for i in range(6)]
+    importer = _importer(tmp_path, tables, max_workers=3)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def import_table(schema_table, field_delimiter=r"\t", extras=""):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        # the first table is the slowest, it finishes last
+        time.sleep(0.1 if schema_table == "Elysium.T0" else 0.01)
+        with lock:
+            running[0] -= 1
+
+    importer.import_table = import_table
+    results = importer.import_tables_parallel()
+
+    assert peak[0] == 3
+    assert sorted(tbl for tbl, _, _ in results) == tables
+    assert results[-1][0] == "Elysium.T0"
+    assert all(e is None for _, _, e in results)
+
+
+def test_failed_table_doesnt_stop_the_others(tmp_path):
+    tables = ["Elysium.T0", "Elysium.T1", "Elysium.T2"]
+    importer = _importer(tmp_path, tables, max_workers=2)
+    loaded = []
+
+    def import_table(schema_table, field_delimiter=r"\t", extras=""):
+        if schema_table == "Elysium.T0":
+            raise RuntimeError("ybload failed")
+        loaded.append(schema_table)
+
+    importer.import_table = import_table
+    with pytest.raises(ImportFailedError, match="Elysium.T0 \\(ybload failed\\)"):
+        importer.import_tables_parallel()
+
+    assert sorted(loaded) == ["Elysium.T1", "Elysium.T2"]
+
+
+def test_missing_directory_fails_only_its_table(tmp_path):
+    os.makedirs(tmp_path / "Elysium.T1")
+    (tmp_path / "Elysium.T1" / "0.csv").write_text("id\n1\n")
+    importer = _importer(tmp_path, ["Elysium.T0", "Elysium.T1"], max_workers=2)
+    loaded = []
+    importer._ybload = lambda schema_table, files, field_delimiter, extras: loaded.append(schema_table)
+
+    with pytest.raises(ImportFailedError, match="Elysium.T0") as e:
+        importer.import_tables_parallel()
+
+    assert loaded == ["Elysium.T1"]
+    assert "Elysium.T1" not in str(e.value)
+
+
+def test_interrupt_stops_the_import(tmp_path):
+    importer = _importer(tmp_path, ["Elysium.T0"], max_workers=1)
+
+    def import_table(schema_table, field_delimiter=r"\t", extras=""):
+        raise KeyboardInterrupt
+
+    importer.import_table = import_table
+    with pytest.raises(KeyboardInterrupt):
+        importer.import_tables_parallel()
+
+
+def test_file_sizes_only_read_when_batching(tmp_path, monkeypatch):
+    os.makedirs(tmp_path / "Elysium.T0")
+    (tmp_path / "Elysium.T0" / "0.csv").write_text("id\n1\n")
+    importer = Importer({"tables": ["Elysium.T0"]}, tmp_path, tmp_path, tmp_path / "validation")
+    loaded = []
+
+    def file_sizes(files):
+        raise AssertionError("file sizes are read without batching")
+
+    monkeypatch.setattr(ConstantCatalog, "IMPORT_BATCH_FILES_FLAG", False)
+    monkeypatch.setattr(ConstantCatalog, "IMPORT_BATCH_TARGET_MB", 1)
+    importer.file_sizes = file_sizes
+    importer._ybload = lambda schema_table, files, field_delimiter, extras: loaded.extend(files)
+    importer.import_table("Elysium.T0")
+
+    assert loaded == [str(tmp_path / "Elysium.T0" / "0.csv")]
+
+
+def test_file_batches():
+    files = [f"{i}.csv.gz" for i in range(5)]
+    assert Importer.file_batches(files, 2) == [
+        ["0.csv.gz", "1.csv.gz"],
+        ["2.csv.gz", "3.csv.gz"],
+        ["4.csv.gz"],
+    ]
+
+
+def test_batches_of_a_table_load_side_by_side(tmp_path):
+    importer = Importer(
+        {"tables": ["Elysium.T0"]}, tmp_path, tmp_path, tmp_path / "validation", batch_concurrency=2
+    )
+    running, peak = [0], [0]
+    loaded = []
+    lock = threading.Lock()
+
+    def load_files(schema_table, files, field_delimiter=r"\t", extras=""):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+            loaded.extend(files)
+
+    importer.load_files = load_files
+    batches = Importer.file_batches([f"{i}.csv.gz" for i in range(8)], 2)
+    importer.load_batches("Elysium.T0", batches)
+
+    assert peak[0] == 2
+    assert sorted(loaded) == sorted(f"{i}.csv.gz" for i in range(8))
+
+
+def test_failed_batch_cancels_the_rest(tmp_path):
+    importer = Importer(
+        {"tables": ["Elysium.T0"]}, tmp_path, tmp_path, tmp_path / "validation", batch_concurrency=1
+    )
+    loaded = []
+
+    def load_files(schema_table, files, field_delimiter=r"\t", extras=""):
+        if files == ["1.csv.gz"]:
+            raise RuntimeError("ybload failed")
+        loaded.extend(files)
+
+    importer.load_files = load_files
+    with pytest.raises(RuntimeError):
+        importer.load_batches("Elysium.T0", [["0.csv.gz"], ["1.csv.gz"], ["2.csv.gz"]])
+
+    assert loaded == ["0.csv.gz"]
+
+
+def test_file_batches_by_size():
+    sizes = {"0.csv.gz": 900, "1.csv.gz": 500, "2.csv.gz": 400, "3.csv.gz": 100}
+    sizes.update({f"{i}.csv.gz": 10 for i in range(4, 14)})
+    files = sorted(sizes)
+
+    batches = Importer.file_batches(files, 100, sizes=sizes, target_bytes=1000)
+
+    assert sorted(fi for batch in batches for fi in batch) == files
+    totals = [sum(sizes[fi] for fi in batch) for batch in batches]
+    assert len(batches) == 2
+    assert max(totals) - min(totals) <= 100
+
+
+def test_file_batches_by_size_keep_the_max_files():
+    sizes = {f"{i}.csv.gz": 10 for i in range(10)}
+    sizes["10.csv.gz"] = 1000
+
+    batches = Importer.file_batches(sorted(sizes), 4, sizes=sizes, target_bytes=10 ** 6)
+
+    assert len(batches) == 3
+    assert all(len(batch) <= 4 for batch in batches)
+
+
+def test_file_sizes_from_the_manifest(tmp_path):
+    tasks = [
+        ExportTask("Elysium.T0", "", str(tmp_path / "Elysium.T0" / f"{i}.csv"))
+        for i in range(2)
+    ]
+    manifest = ExportManifest(tmp_path, {})
+    manifest.add_tasks(tasks)
+    manifest.mark(tasks[0].output_path, ChunkStatus.EXPORTED, bytes=123, rows=1, crc32=0)
+    os.makedirs(tmp_path / "Elysium.T0")
+    for task in tasks:
+        with open(task.output_path, "w") as f:
+            f.write("id\n1\n")
+
+    importer = Importer({"tables": ["Elysium.T0"]}, tmp_path, tmp_path, tmp_path / "validation")
+    assert importer.file_sizes([t.output_path for t in tasks]) == {
+        tasks[0].output_path: 123,
+        tasks[1].output_path: 5,
+    }
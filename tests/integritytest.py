@@ -0,0 +1,162 @@
+import concurrent.futures
+import os
+
+import pytest
+
+from elysium_migration.migration.compression import BlockCompressor, Codec, FileWriter
+from elysium_migration.migration.execute import Execution
+from elysium_migration.migration.extractor import VsqlExtractor
+from elysium_migration.migration.importer import Importer
+from elysium_migration.migration.integrity import ChunkDigest, ChunkIntegrityError
+from elysium_migration.migration.manifest import ChunkStatus, ExportManifest
+from elysium_migration.migration.scheduler import ExportTask
+
+
+class WritingExtractor:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.paths = []
+
+    def extract(self, query, output_path, field_delimiter=r"\t", codec=None, table=None):
+        self.paths.append(output_path)
+        with codec.open(output_path, "wt") as f:
+            f.write("id\n1\n2\n3\n")
+        if self.fail:
+            raise RuntimeError("vsql was killed")
+
+
+def _task(tmp_path, id=0):
+    path = tmp_path / "Elysium.T0" / Codec.file_name(id, Codec("gzip"))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return ExportTask("Elysium.T0", "SELECT 1", str(path), codec=Codec("gzip"))
+
+
+def test_digest_counts_rows_of_concatenated_members(tmp_path):
+    path = tmp_path / "0.csv.gz"
+    codec = Codec("gzip")
+    with open(path, "wb") as f:
+        f.write(codec.compress(b"id\n1\n"))
+        f.write(codec.compress(b"2\n3\n"))
+
+    digest = ChunkDigest.of_file(path, codec)
+
+    assert digest.rows == 3
+    assert digest.size == os.path.getsize(path)
+    assert digest.verify(path, codec) is None
+
+
+def test_verify_detects_truncated_and_changed_files(tmp_path):
+    path = tmp_path / "0.csv"
+    path.write_bytes(b"id\n1\n2\n")
+    digest = ChunkDigest.of_file(path)
+    assert digest.rows == 2
+
+    path.write_bytes(b"id\n1\n")
+    assert "bytes" in digest.verify(path)
+
+    path.write_bytes(b"id\n1\n3\n")
+    assert "crc32" in digest.verify(path)
+
+
+def test_task_renames_only_on_success(tmp_path):
+    task = _task(tmp_path)
+    extractor = WritingExtractor()
+
+    task.run(extractor)
+
+    assert extractor.paths == [task.temp_path]
+    assert not os.path.exists(task.temp_path)
+    assert task.digest == ChunkDigest.of_file(task.output_path, task.codec)
+    assert task.digest.rows == 3
+
+
+def test_failed_task_leaves_no_file(tmp_path):
+    task = _task(tmp_path)
+
+    with pytest.raises(RuntimeError):
+        task.run(WritingExtractor(fail=True))
+
+    assert not os.path.exists(task.temp_path)
+    assert not os.path.exists(task.output_path)
+    assert task.digest is None
+
+
+def test_importer_refuses_files_that_dont_match_the_manifest(tmp_path):
+    tasks = [_task(tmp_path, i) for i in range(2)]
+    manifest = ExportManifest(tmp_path)
+    manifest.add_tasks(tasks)
+    for task in tasks:
+        task.run(WritingExtractor())
+        manifest.mark_exported(task)
+    with open(tasks[1].output_path, "r+b") as f:
+        f.truncate(10)
+
+    importer = Importer(
+        {"tables": ["Elysium.T0"]}, tmp_path, tmp_path, tmp_path / "validation"
+    )
+    with pytest.raises(ChunkIntegrityError):
+        importer.verify_files("Elysium.T0", [task.output_path for task in tasks])
+
+    manifest = ExportManifest.load(tmp_path)
+    assert manifest.chunks["Elysium.T0/1.csv.gz"]["status"] == ChunkStatus.FAILED
+    assert manifest.verify(tasks[0].output_path) is None
+    assert [t.output_path for t in manifest.pending_tasks()] == [tasks[1].output_path]
+
+
+def test_batch_is_verified_before_its_load(tmp_path, monkeypatch):
+    tasks = [_task(tmp_path, i) for i in range(2)]
+    manifest = ExportManifest(tmp_path)
+    manifest.add_tasks(tasks)
+    for task in tasks:
+        task.run(WritingExtractor())
+        manifest.mark_exported(task)
+    with open(tasks[1].output_path, "r+b") as f:
+        f.truncate(10)
+
+    importer = Importer(
+        {"tables": ["Elysium.T0"]}, tmp_path, tmp_path, tmp_path / "validation"
+    )
+    loaded = []
+    monkeypatch.setattr(Execution, "ybload", lambda table, input_path, **kwargs: loaded.append(input_path))
+    importer.load_files("Elysium.T0", [tasks[0].output_path])
+    with pytest.raises(ChunkIntegrityError):
+        importer.load_files("Elysium.T0", [tasks[1].output_path])
+
+    assert loaded == [tasks[0].output_path]
+
+
+def test_writers_take_the_digest_in_stream(tmp_path):
+    data = b"id\n" + b"".join(f"{i}\n".encode() for i in range(1000))
+    plain, compressed = tmp_path / "0.csv", tmp_path / "1.csv.gz"
+
+    with FileWriter(str(plain)) as writer:
+        writer.write(data)
+    assert writer.digest() == ChunkDigest.of_file(plain)
+    assert writer.digest().rows == 1000
+
+    with FileWriter(str(compressed), Codec("gzip")) as writer:
+        writer.write(data)
+    assert writer.digest() == ChunkDigest.of_file(compressed, Codec("gzip"))
+
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        with BlockCompressor(Codec("gzip"), str(compressed), executor, block_size=1000) as compressor:
+            compressor.write(data)
+    assert compressor.digest() == ChunkDigest.of_file(compressed, Codec("gzip"))
+    assert compressor.digest().rows == 1000
+
+
+def test_streamed_export_isnt_read_back(tmp_path, monkeypatch):
+    def vsql_stream(query, write, field_delimiter=",", table=None):
+        write(b"ID\n1\n2\n")
+
+    monkeypatch.setattr(Execution, "vsql_stream", vsql_stream)
+    monkeypatch.setattr(ChunkDigest, "of_file", lambda *args, **kwargs: pytest.fail("read back"))
+    task = _task(tmp_path)
+    extractor = VsqlExtractor(compression_threads=1)
+    try:
+        task.run(extractor)
+    finally:
+        extractor.close()
+
+    assert task.digest.rows == 2
+    assert task.digest.size == os.path.getsize(task.output_path)
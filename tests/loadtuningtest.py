@@ -0,0 +1,101 @@
+import threading
+
+from elysium_migration.migration.execute import Execution, StatementCatalog
+from elysium_migration.migration.importer import Importer
+from elysium_migration.migration.loadtuning import LoadTuner
+
+MB = 1024 ** 2
+
+
+def test_settings_follow_the_batch():
+    tuner = LoadTuner(total_cores=32, max_readers=12, mb_per_reader=1024, mb_per_core=512)
+
+    # one small file gets one reader and one core
+    assert tuner.settings(1, 50 * MB) == (1, 1)
+    # never more readers than files
+    assert tuner.settings(3, 100 * 1024 * MB) == (3, 32)
+    assert tuner.settings(100, 500 * 1024 * MB) == (12, 32)
+    assert tuner.settings(100, 2048 * MB) == (2, 4)
+
+
+def test_loads_never_hold_more_cores_than_there_are():
+    tuner = LoadTuner(total_cores=32, slots=2, max_readers=12, mb_per_reader=1024, mb_per_core=512)
+
+    # every load gets at most its share of the slots
+    assert tuner.settings(100, 500 * 1024 * MB) == (12, 16)
+    assert tuner.settings(100, 500 * 1024 * MB, free_cores=5) == (12, 5)
+
+    tuner = LoadTuner(total_cores=32, slots=1, max_readers=12, mb_per_reader=1024, mb_per_core=512)
+    granted = []
+    # loads that start one after the other only get the cores that are left
+    with tuner.load(100, 500 * 1024 * MB) as first:
+        granted.append(first[1])
+        assert tuner.allocated == 32
+    with tuner.load(1, 1024 * MB) as small:
+        with tuner.load(100, 500 * 1024 * MB) as big:
+            granted += [small[1], big[1]]
+            assert tuner.allocated == 32
+    assert granted == [32, 2, 30]
+    assert tuner.allocated == 0
+
+
+def test_load_waits_for_a_free_core():
+    tuner = LoadTuner(total_cores=4, slots=1, mb_per_core=1)
+    peak = [0]
+    lock = threading.Lock()
+
+    def load():
+        with tuner.load(1, 4 * MB):
+            with lock:
+                peak[0] = max(peak[0], tuner.allocated)
+            threading.Event().wait(0.02)
+
+    threads = [threading.Thread(target=load) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    assert peak[0] == 4
+    assert tuner.allocated == 0
+
+
+def test_statement_flags():
+    statement = StatementCatalog.ybload("Elysium.T0", "a.csv", "", num_cores=3, num_readers=2)
+    assert "--num-cores 3 " in statement
+    assert "--num-readers 2 " in statement
+
+
+def test_importer_passes_the_tuned_settings(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(Execution, "ybload", staticmethod(lambda **kwargs: calls.append(kwargs)))
+    importer = Importer({"tables": ["Elysium.T0"]}, tmp_path, tmp_path, tmp_path / "validation")
+    importer.load_tuner = LoadTuner(total_cores=8, max_readers=12, mb_per_reader=1, mb_per_core=1)
+    files = []
+    for i in range(3):
+        files.append(str(tmp_path / f"T0_{i}.csv"))
+        with open(files[-1], "wb") as f:
+            f.write(b"x" * MB)
+
+    importer.load_files("Elysium.T0", files)
+    assert (calls[0]["num_readers"], calls[0]["num_cores"]) == (3, 3)
+
+    importer.load_tuner = None
+    importer.load_files("Elysium.T0", files[:1])
+    assert (calls[1]["num_readers"], calls[1]["num_cores"]) == (None, None)
+
+
+def test_importer_tuner_is_opt_in(tmp_path):
+    importer = Importer({"tables": ["Elysium.T0"]}, tmp_path, tmp_path, tmp_path / "validation")
+    assert importer.load_tuner is None
+
+    importer = Importer(
+        {"tables": ["Elysium.T0"]},
+        tmp_path,
+        tmp_path,
+        tmp_path / "validation",
+        max_workers=2,
+        batch_concurrency=3,
+        auto_tune=True,
+    )
+    assert importer.load_tuner.slots == 6
@@ -0,0 +1,113 @@
+import os
+
+from elysium_migration.migration.compression import Codec
+from elysium_migration.migration.integrity import ChunkDigest
+from elysium_migration.migration.manifest import ChunkStatus, ExportManifest
+from elysium_migration.migration.scheduler import ExportTask
+
+RUN = {"from_date": "2021-06-15", "to_date": "2021-06-16", "sample_size": None, "tables": ["Elysium.T0"]}
+
+
+def _tasks(output_dir, n=3):
+    tasks = []
+    for i in range(n):
+        path = output_dir / "Elysium" / "T0" / Codec.file_name(i, Codec("gzip"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tasks.append(
+            ExportTask(
+                table="Elysium.T0",
+                query=f"SELECT * FROM Elysium.T0 WHERE Id % {n} = {i}",
+                output_path=str(path),
+                codec=Codec("gzip"),
+                estimated_mb=10.0,
+            )
+        )
+    return tasks
+
+
+def _export(task):
+    with task.codec.open(task.output_path, "wt") as f:
+        f.write("id\tname\n1\ta\n")
+
+
+def test_manifest_round_trip(tmp_path):
+    tasks = _tasks(tmp_path)
+    manifest = ExportManifest(tmp_path, RUN)
+    manifest.add_tasks(tasks)
+    _export(tasks[0])
+    manifest.mark_exported(tasks[0])
+
+    loaded = ExportManifest.load(tmp_path)
+
+    assert loaded.run == RUN
+    assert loaded.summary() == {ChunkStatus.EXPORTED: 1, ChunkStatus.PLANNED: 2}
+    assert loaded.chunks["Elysium/T0/0.csv.gz"]["rows"] == 1
+    assert loaded.verify(tasks[0].output_path) is None
+    task = loaded.pending_tasks()[0]
+    assert task.query == tasks[1].query
+    assert task.codec.name == "gzip"
+
+
+def test_load_without_manifest(tmp_path):
+    assert ExportManifest.load(tmp_path) is None
+
+
+def test_pending_tasks(tmp_path):
+    tasks = _tasks(tmp_path)
+    manifest = ExportManifest(tmp_path, RUN)
+    manifest.add_tasks(tasks)
+
+    for task in tasks:
+        _export(task)
+        manifest.mark_exported(task)
+    manifest.mark_failed(tasks[1], RuntimeError("vsql exited with 1"))
+    # an exported file that is gone is exported again
+    (tmp_path / "Elysium/T0/2.csv.gz").unlink()
+
+    pending = [t.output_path for t in manifest.pending_tasks()]
+
+    assert pending == [tasks[1].output_path, tasks[2].output_path]
+    assert manifest.chunks["Elysium/T0/1.csv.gz"]["error"] == "vsql exited with 1"
+
+
+def test_loaded_chunks_are_not_exported_again(tmp_path):
+    tasks = _tasks(tmp_path, n=2)
+    manifest = ExportManifest(tmp_path, RUN)
+    manifest.add_tasks(tasks)
+    for task in tasks:
+        _export(task)
+        manifest.mark_exported(task)
+    manifest.mark_loaded("Elysium.T0", tasks[0].output_path)
+    # the pipeline may remove loaded files
+    (tmp_path / "Elysium/T0/0.csv.gz").unlink()
+
+    assert manifest.pending_tasks() == []
+    assert [t.output_path for t in manifest.unloaded_tasks()] == [tasks[1].output_path]
+
+
+def test_rolled_chunk(tmp_path):
+    task = _tasks(tmp_path, n=1)[0]
+    task.roll_mb = 1
+    manifest = ExportManifest(tmp_path, RUN)
+    manifest.add_tasks([task])
+
+    for number in range(2):
+        with task.codec.open(task.part_path(number), "wt") as f:
+            f.write("id\tname\n1\ta\n")
+    task.parts = [(path, ChunkDigest.of_file(path, task.codec)) for path in [task.part_path(0), task.part_path(1)]]
+    manifest.mark_exported(task)
+
+    loaded = ExportManifest.load(tmp_path)
+    assert loaded.summary() == {ChunkStatus.EXPORTED: 2}
+    assert loaded.pending_tasks() == []
+    assert sorted(t.output_path for t in loaded.unloaded_tasks()) == [task.part_path(0), task.part_path(1)]
+    assert loaded.verify(task.part_path(1)) is None
+
+    # a missing part exports the whole chunk again, and its other parts aren't loaded on their own
+    os.remove(task.part_path(1))
+    assert [(t.output_path, t.roll_mb) for t in loaded.pending_tasks()] == [(task.output_path, 1)]
+    assert loaded.unloaded_tasks() == []
+
+    # unless a part was loaded already
+    loaded.mark_loaded("Elysium.T0", task.part_path(0))
+    assert loaded.pending_tasks() == []
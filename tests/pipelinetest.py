@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+from elysium_migration.migration.pipeline import ChunkLoadPipeline, PipelineLoadError
+
+
+class FakeImporter:
+    def __init__(self, fail_on=(), delay=0.0):
+        self.fail_on = fail_on
+        self.delay = delay
+        self.loads = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def load_files(self, schema_table, files, field_delimiter=r"\t", extras=""):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+            self.loads.append((schema_table, files))
+        if files[0] in self.fail_on:
+            raise RuntimeError("ybload failed")
+
+
+def test_pipeline_loads_every_submitted_file():
+    importer = FakeImporter()
+    with ChunkLoadPipeline(importer, num_loaders=3, max_in_flight=4) as pipeline:
+        for i in range(20):
+            pipeline.submit("Elysium.FINGAM_Orders", f"/data/{i}.csv")
+
+    assert len(pipeline.loaded) == 20
+    assert sorted(fi[0] for _, fi in importer.loads) == sorted(
+        f"/data/{i}.csv" for i in range(20)
+    )
+
+
+def test_pipeline_bounds_loads_to_num_loaders():
+    importer = FakeImporter(delay=0.01)
+    with ChunkLoadPipeline(importer, num_loaders=2, max_in_flight=2) as pipeline:
+        for i in range(10):
+            pipeline.submit("Elysium.FINGAM_Orders", f"/data/{i}.csv")
+
+    assert importer.max_in_flight <= 2
+
+
+def test_pipeline_reports_failed_loads():
+    importer = FakeImporter(fail_on=("/data/3.csv",))
+    pipeline = ChunkLoadPipeline(importer, num_loaders=2, max_in_flight=2)
+    pipeline.start()
+    for i in range(5):
+        pipeline.submit("Elysium.FINGAM_Orders", f"/data/{i}.csv")
+
+    with pytest.raises(PipelineLoadError):
+        pipeline.close()
+    assert len(pipeline.loaded) == 4
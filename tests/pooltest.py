@@ -0,0 +1,79 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from elysium_migration.configuration.connect.pool import (
+    ConnectionPool,
+    ConnectionPoolExhaustedError,
+)
+
+
+class CountingConnect:
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.opened.append(conn)
+        return conn
+
+
+def test_pool_reuses_connections():
+    connect = CountingConnect()
+    pool = ConnectionPool(connect, max_size=2)
+
+    for _ in range(10):
+        assert pool.query("SELECT 1") == [(1,)]
+
+    assert len(connect.opened) == 1
+
+
+def test_pool_respects_max_size():
+    connect = CountingConnect()
+    pool = ConnectionPool(connect, max_size=2, acquire_timeout_s=0.1)
+
+    first, second = pool.acquire(), pool.acquire()
+    with pytest.raises(ConnectionPoolExhaustedError):
+        pool.acquire()
+
+    threading.Timer(0.05, pool.release, args=(first,)).start()
+    pool.acquire_timeout_s = 5
+    assert pool.acquire() is first
+    assert len(connect.opened) == 2
+
+
+def test_pool_closes_idle_connections():
+    connect = CountingConnect()
+    pool = ConnectionPool(connect, max_size=2, idle_timeout_s=0.01)
+
+    pool.query("SELECT 1")
+    time.sleep(0.05)
+    pool.query("SELECT 1")
+
+    assert len(connect.opened) == 2
+    with pytest.raises(sqlite3.ProgrammingError):
+        connect.opened[0].execute("SELECT 1")
+
+
+def test_pool_replaces_unhealthy_connections():
+    connect = CountingConnect()
+    pool = ConnectionPool(connect, max_size=1, health_check_interval_s=0)
+
+    pool.query("SELECT 1")
+    connect.opened[0].close()
+
+    assert pool.query("SELECT 2") == [(2,)]
+    assert len(connect.opened) == 2
+
+
+def test_pool_discards_connection_after_error():
+    connect = CountingConnect()
+    pool = ConnectionPool(connect, max_size=1)
+
+    with pytest.raises(sqlite3.Error):
+        pool.query("SELECT * FROM missing_table")
+
+    assert pool.query("SELECT 1") == [(1,)]
+    assert len(connect.opened) == 2
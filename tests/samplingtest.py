@@ -0,0 +1,123 @@
+import pytest
+
+from elysium_migration.migration.execute import Execution, StatementCatalog
+from elysium_migration.migration.sampling import Sampler, TopKSampler, WindowSampler
+
+
+@pytest.fixture(autouse=True)
+def numeric_columns(monkeypatch):
+    monkeypatch.setattr(
+        Execution, "vsql_is_character_column", lambda table, column: False
+    )
+
+
+def test_top_k_query_is_bounded():
+    query = StatementCatalog.get_top_k_range("Elysium.T0", "Id", 5001)
+
+    assert "LIMIT 5001" in query
+    assert "RANK()" not in query
+
+
+def test_top_k_sampler(monkeypatch):
+    requested = []
+
+    def top_k_range(table, column, k):
+        requested.append(k)
+        return "95000", "100000"
+
+    monkeypatch.setattr(Execution, "vsql_get_top_k_range", top_k_range)
+
+    assert TopKSampler().sample("Elysium.T0", "Id", 5000) == ("95000", "100000")
+    assert requested == [5001]
+
+
+def test_window_sampler_grows_the_window(monkeypatch):
+    predicates = []
+    counts = iter([10, 300, 6000])
+
+    def key_range(table, column, predicate=""):
+        predicates.append(predicate)
+        return "2021-06-14 12:00:00", "2021-06-15 00:00:00", next(counts)
+
+    monkeypatch.setattr(
+        Execution, "vsql_get_max_col_val", lambda table, column: "2021-06-15 00:00:00"
+    )
+    monkeypatch.setattr(Execution, "vsql_get_key_range", key_range)
+
+    min_val, max_val = WindowSampler(window_hours=1, growth=4).sample(
+        "Elysium.T0", "CLOCK_TIMESTAMP", 5000
+    )
+
+    assert (min_val, max_val) == ("2021-06-14 12:00:00", "2021-06-15 00:00:00")
+    assert predicates == [
+        "AND CLOCK_TIMESTAMP >= '2021-06-14 23:00:00'",
+        "AND CLOCK_TIMESTAMP >= '2021-06-14 20:00:00'",
+        "AND CLOCK_TIMESTAMP >= '2021-06-14 08:00:00'",
+    ]
+
+
+def test_window_sampler_narrows_a_window_far_above_the_sample(monkeypatch):
+    predicates = []
+    counts = iter([100_000_000, 500, 3000])
+
+    def key_range(table, column, predicate=""):
+        predicates.append(predicate)
+        return "2021-06-14 23:00:00", "2021-06-15 00:00:00", next(counts)
+
+    monkeypatch.setattr(
+        Execution, "vsql_get_max_col_val", lambda table, column: "2021-06-15 00:00:00"
+    )
+    monkeypatch.setattr(Execution, "vsql_get_key_range", key_range)
+
+    assert WindowSampler(window_hours=24).sample(
+        "Elysium.T0", "CLOCK_TIMESTAMP", 1000
+    ) == ("2021-06-14 23:00:00", "2021-06-15 00:00:00")
+    # 24 hours hold 100M rows, the share of 2000 rows is ~1.7 seconds, which is short, so it is bisected
+    assert predicates == [
+        "AND CLOCK_TIMESTAMP >= '2021-06-14 00:00:00'",
+        "AND CLOCK_TIMESTAMP >= '2021-06-14 23:59:58.272000'",
+        "AND CLOCK_TIMESTAMP >= '2021-06-14 11:59:59.136000'",
+    ]
+
+
+def test_window_sampler_falls_back_to_top_k_when_no_window_fits(monkeypatch):
+    monkeypatch.setattr(Execution, "vsql_get_max_col_val", lambda table, column: "1000")
+    monkeypatch.setattr(
+        Execution,
+        "vsql_get_key_range",
+        lambda table, column, predicate="": ("1", "1000", 1_000_000),
+    )
+    monkeypatch.setattr(
+        Execution, "vsql_get_top_k_range", lambda table, column, k: ("990", "1000")
+    )
+
+    assert WindowSampler(max_probes=3).sample("Elysium.T0", "Id", 10) == ("990", "1000")
+
+
+def test_window_sampler_falls_back_to_top_k(monkeypatch):
+    monkeypatch.setattr(Execution, "vsql_get_max_col_val", lambda table, column: "100")
+    monkeypatch.setattr(
+        Execution, "vsql_get_key_range", lambda table, column, predicate="": ("1", "100", 100)
+    )
+    monkeypatch.setattr(
+        Execution, "vsql_get_top_k_range", lambda table, column, k: ("1", "100")
+    )
+
+    assert WindowSampler(max_probes=2).sample("Elysium.T0", "Id", 5000) == ("1", "100")
+
+
+def test_window_sampler_on_a_character_column(monkeypatch):
+    monkeypatch.setattr(
+        Execution, "vsql_is_character_column", lambda table, column: True
+    )
+    monkeypatch.setattr(Execution, "vsql_get_max_col_val", lambda table, column: "00123")
+    monkeypatch.setattr(
+        Execution, "vsql_get_top_k_range", lambda table, column, k: ("00001", "00123")
+    )
+
+    assert WindowSampler().sample("Elysium.T0", "AccountNumber", 5000) == ("00001", "00123")
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        Sampler.from_name("random")
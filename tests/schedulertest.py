@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+
+from elysium_migration.migration.compression import Codec
+from elysium_migration.migration.concurrency import ConcurrencyController
+from elysium_migration.migration.execute import Execution
+from elysium_migration.migration.extractor import Extractor
+from elysium_migration.migration.scheduler import ExportScheduler, ExportTask
+
+
+class FakeTask(ExportTask):
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    def __init__(self, table, output_path, fail=False, delay=0.01):
+        super(FakeTask, self).__init__(table, "", output_path)
+        self.fail = fail
+        self.delay = delay
+
+    def run(self, extractor):
+        with FakeTask.lock:
+            FakeTask.running += 1
+            FakeTask.max_running = max(FakeTask.max_running, FakeTask.running)
+        time.sleep(self.delay)
+        with FakeTask.lock:
+            FakeTask.running -= 1
+        if self.fail:
+            raise RuntimeError("vsql failed")
+
+
+def test_scheduler_runs_tables_side_by_side():
+    FakeTask.max_running = 0
+    tasks = [FakeTask(f"Elysium.T{i}", f"/data/Elysium.T{i}/0.csv") for i in range(8)]
+    completed = []
+
+    failed = ExportScheduler(
+        max_workers=4, on_complete=completed.append, adaptive=False
+    ).run(tasks)
+
+    assert failed == []
+    assert sorted(t.output_path for t in completed) == sorted(
+        t.output_path for t in tasks
+    )
+    assert FakeTask.max_running == 4
+
+
+def test_scheduler_collects_failed_tasks():
+    tasks = [
+        FakeTask("Elysium.T0", "/data/Elysium.T0/0.csv"),
+        FakeTask("Elysium.T0", "/data/Elysium.T0/1.csv", fail=True),
+        FakeTask("Elysium.T1", "/data/Elysium.T1/0.csv"),
+    ]
+    completed = []
+
+    failed = ExportScheduler(
+        max_workers=2, on_complete=completed.append, adaptive=False
+    ).run(tasks)
+
+    assert [task.output_path for task, _ in failed] == ["/data/Elysium.T0/1.csv"]
+    assert len(completed) == 2
+
+
+def test_order_tasks_largest_first_with_pinned_tables():
+    tasks = [
+        ExportTask("Elysium.Small", "", "/data/Elysium.Small/0.csv", estimated_mb=10),
+        ExportTask("Elysium.Big", "", "/data/Elysium.Big/0.csv", estimated_mb=5000),
+        ExportTask("Elysium.Big", "", "/data/Elysium.Big/1.csv", estimated_mb=5000),
+        ExportTask("Elysium.Pinned", "", "/data/Elysium.Pinned/0.csv", estimated_mb=1),
+        ExportTask("Elysium.Mid", "", "/data/Elysium.Mid/0.csv", estimated_mb=800),
+    ]
+
+    ordered = ExportScheduler.order_tasks(tasks, pinned_tables=["Elysium.Pinned"])
+
+    assert [task.output_path for task in ordered] == [
+        "/data/Elysium.Pinned/0.csv",
+        "/data/Elysium.Big/0.csv",
+        "/data/Elysium.Big/1.csv",
+        "/data/Elysium.Mid/0.csv",
+        "/data/Elysium.Small/0.csv",
+    ]
+
+
+def test_adaptive_scheduler_stays_within_controller_limit():
+    FakeTask.max_running = 0
+    tasks = [FakeTask(f"Elysium.T{i}", f"/data/Elysium.T{i}/0.csv") for i in range(12)]
+    controller = ConcurrencyController(floor=1, ceiling=8, initial=3, window_s=3600)
+
+    failed = ExportScheduler(max_workers=8, controller=controller).run(tasks)
+
+    assert failed == []
+    assert FakeTask.max_running == 3
+
+
+def test_controller_meters_streamed_bytes_while_exports_run():
+    class StreamingTask(ExportTask):
+        def run(self, extractor):
+            for _ in range(20):
+                Execution.read_bytes(1024 ** 2, self.table)
+                time.sleep(0.01)
+            self.metered = True
+
+    controller = ConcurrencyController(floor=1, ceiling=4, initial=1, window_s=0.05)
+    tasks = [StreamingTask("Elysium.T0", "", "/data/Elysium.T0/0.csv")]
+
+    assert ExportScheduler(max_workers=4, controller=controller).run(tasks) == []
+
+    # the only export ran for several windows, decisions don't wait for it to finish
+    assert controller.decisions
+    assert Execution.meter is None
+
+
+class StreamingExtractor(Extractor):
+    def stream(self, query, write, field_delimiter=r"\t", table=None):
+        write(b"ID\n")
+        for i in range(1000):
+            write(f"{i}\n".encode())
+
+
+def test_rolling_task_writes_parts(tmp_path):
+    stale = tmp_path / "0_7.csv.gz"
+    stale.write_bytes(b"")
+    # about 1000 bytes per part
+    task = ExportTask(
+        "Elysium.T0",
+        "",
+        str(tmp_path / "0.csv.gz"),
+        codec=Codec("gzip"),
+        roll_mb=1000 / 1024 ** 2,
+    )
+
+    task.run(StreamingExtractor())
+
+    paths = task.output_paths()
+    assert len(paths) > 1
+    assert paths[0] == str(tmp_path / "0_0.csv.gz")
+    assert sorted(Codec.data_files(tmp_path)) == sorted(paths)
+    assert sum(digest.rows for _, digest in task.parts) == 1000
+    assert task.output_bytes() == sum(os.path.getsize(p) for p in paths)
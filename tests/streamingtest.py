@@ -0,0 +1,134 @@
+import os
+import subprocess
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from elysium_migration.migration.diskbudget import DiskBudget
+from elysium_migration.migration.execute import Execution
+from elysium_migration.migration.exporter import Exporter
+from elysium_migration.migration.scheduler import ExportTask
+from elysium_migration.migration.streaming import StreamLoadTask
+
+
+class FifoExtractor:
+    def __init__(self, rows, fail=False):
+        self.rows = rows
+        self.fail = fail
+
+    def extract(self, query, output_path, field_delimiter, codec=None, table=None):
+        with open(output_path, "w") as f:
+            f.write(self.rows)
+            f.flush()
+            if self.fail:
+                raise RuntimeError("vsql failed")
+
+
+@pytest.fixture
+def loaded(tmp_path, monkeypatch):
+    # stands in for ybload, only keeps what it read when the pipe ends without an error
+    out = tmp_path / "loaded.csv"
+
+    def ybload_process(table, input_path, output=None, **kwargs):
+        return subprocess.Popen(
+            f"cat '{input_path}' > '{input_path}.out' && mv '{input_path}.out' '{out}'",
+            shell=True,
+            stdout=output,
+            stderr=subprocess.STDOUT,
+        )
+
+    monkeypatch.setattr(Execution, "ybload_process", staticmethod(ybload_process))
+    return out
+
+
+def test_stream_into_the_loader(tmp_path, loaded):
+    task = StreamLoadTask.of(ExportTask("Elysium.T0", "SELECT 1", str(tmp_path / "T0_0.csv.gz")))
+    task.run(FifoExtractor("1\ta\n2\tb\n"))
+
+    assert loaded.read_text() == "1\ta\n2\tb\n"
+    assert not os.path.exists(task.fifo_path)
+    assert not os.path.exists(task.output_path)
+
+
+def test_failed_extract_stops_the_loader(tmp_path, loaded):
+    task = StreamLoadTask.of(ExportTask("Elysium.T0", "SELECT 1", str(tmp_path / "T0_0.csv.gz")))
+    with pytest.raises(RuntimeError):
+        task.run(FifoExtractor("1\ta\n", fail=True))
+
+    assert not loaded.exists()
+    assert not os.path.exists(task.fifo_path)
+
+
+def test_interrupted_extract_stops_the_loader(tmp_path, loaded):
+    class InterruptedExtractor(FifoExtractor):
+        def extract(self, query, output_path, field_delimiter, codec=None, table=None):
+            with open(output_path, "w") as f:
+                f.write(self.rows)
+                f.flush()
+                raise KeyboardInterrupt
+
+    task = StreamLoadTask.of(ExportTask("Elysium.T0", "SELECT 1", str(tmp_path / "T0_0.csv.gz")))
+    with pytest.raises(KeyboardInterrupt):
+        task.run(InterruptedExtractor("1\ta\n"))
+
+    assert not loaded.exists()
+    assert not os.path.exists(task.fifo_path)
+
+
+def test_failed_loader(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        Execution,
+        "ybload_process",
+        staticmethod(
+            lambda table, input_path, output=None, **kwargs: subprocess.Popen(
+                "echo 'no such table'; exit 3", shell=True, stdout=output, stderr=subprocess.STDOUT
+            )
+        ),
+    )
+    task = StreamLoadTask("Elysium.T0", "SELECT 1", str(tmp_path / "T0_0.csv.gz"))
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        task.run(FifoExtractor("1\ta\n"))
+
+    assert e.value.returncode == 3
+    assert b"no such table" in e.value.output
+    assert not os.path.exists(task.fifo_path)
+
+
+def test_stream_with_a_disk_budget(tmp_path, loaded):
+    pipeline = SimpleNamespace(
+        importer=SimpleNamespace(load_log_file_path=None, load_tuner=None),
+        submit=lambda table, path: None,
+    )
+    budget = DiskBudget(tmp_path, budget_mb=1)
+    exporter = Exporter(
+        {"tables": ["Elysium.T0"]},
+        tmp_path,
+        tmp_path,
+        pipeline=pipeline,
+        extractor=FifoExtractor("1\ta\n"),
+        resume=True,
+        disk_budget=budget,
+        stream=True,
+    )
+    # every chunk is estimated above the budget, a streamed chunk must not wait on it
+    tasks = [
+        ExportTask("Elysium.T0", "SELECT 1", str(tmp_path / f"T0_{i}.csv"), estimated_mb=10)
+        for i in range(4)
+    ]
+    errors = []
+
+    def run_tasks():
+        try:
+            exporter._run_tasks(tasks)
+        except Exception as e:
+            errors.append(e)
+
+    run = threading.Thread(target=run_tasks, daemon=True)
+    run.start()
+    run.join(30)
+
+    assert not run.is_alive()
+    assert errors == []
+    assert loaded.read_text() == "1\ta\n"
+    assert budget.staged_bytes == 0
@@ -0,0 +1,173 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+from elysium_migration.migration.execute import Execution
+from elysium_migration.migration.extractor import VsqlExtractor
+from elysium_migration.migration.metrics import RunMetrics
+from elysium_migration.migration.throttle import Throttle, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_bucket_waits_off_the_debt():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=100, clock=clock, sleep=clock.sleep)
+
+    # the first second of tokens is there already
+    assert bucket.acquire(100) == 0
+    assert bucket.acquire(50) == 0.5
+    clock.now += 1
+    assert bucket.acquire(50) == 0
+    assert clock.slept == [0.5]
+
+
+def test_unlimited_bucket_never_waits():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=0, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire(10 ** 9) == 0
+    assert clock.slept == []
+
+
+def test_schedule_limits():
+    schedule = [
+        {"start": "07:00", "end": "19:00", "mb_per_s": 50, "max_queries": 4},
+        {"start": "22:00", "end": "02:00", "mb_per_s": 200, "max_queries": 0},
+    ]
+    throttle = Throttle(host="vertica", schedule=schedule, mb_per_s=100, max_queries=8)
+
+    assert throttle.limits(datetime(2021, 6, 1, 12, 30)) == (50, 4)
+    assert throttle.limits(datetime(2021, 6, 1, 19, 0)) == (100, 8)
+    # the entry crosses midnight
+    assert throttle.limits(datetime(2021, 6, 1, 23, 0)) == (200, 0)
+    assert throttle.limits(datetime(2021, 6, 1, 1, 0)) == (200, 0)
+    assert throttle.limits(datetime(2021, 6, 1, 3, 0)) == (100, 8)
+
+
+def test_table_limit_and_metrics():
+    metrics = RunMetrics()
+    slept = []
+    throttle = Throttle.from_config(
+        "vertica",
+        {"throttled_tables": ["Elysium.T0.0.5"]},
+        metrics=metrics,
+    )
+    throttle._table_buckets["Elysium.T0"].sleep = slept.append
+    throttle._bucket.sleep = slept.append
+
+    throttle.consume(1024 ** 2, "Elysium.T1")
+    assert slept == []
+    throttle.consume(1024 ** 2, "Elysium.T0")
+    assert len(slept) == 1 and slept[0] > 0.9
+
+    assert metrics.get("throttle_bytes") == 2 * 1024 ** 2
+    assert metrics.get("throttle_bytes_wait_s") == slept[0]
+
+
+def test_max_queries():
+    throttle = Throttle(schedule=[], max_queries=2)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def query():
+        with throttle.query():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            threading.Event().wait(0.02)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=query) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert peak[0] == 2
+
+
+def test_execution_without_throttle():
+    Execution.set_throttle(None)
+    with Execution.throttled("Elysium.T0"):
+        Execution.throttle_bytes(10, "Elysium.T0")
+
+
+def test_what_a_throttle_limits():
+    assert not Throttle(schedule=[], mb_per_s=0, max_queries=0).limited()
+    assert not Throttle(schedule=[{"start": "07:00", "end": "19:00"}], mb_per_s=0, max_queries=0).limited()
+
+    queries = Throttle(schedule=[], mb_per_s=0, max_queries=4)
+    assert queries.limited() and not queries.limits_bytes()
+
+    scheduled = Throttle(schedule=[{"start": "07:00", "end": "19:00", "mb_per_s": 50}], mb_per_s=0, max_queries=0)
+    assert scheduled.limited() and scheduled.limits_bytes("Elysium.T0")
+
+    tables = Throttle.from_config("vertica", {"throttled_tables": ["Elysium.T0.0.5"]})
+    assert tables.limited() and tables.limits_bytes("Elysium.T0")
+    assert not tables.limits_bytes("Elysium.T1")
+
+
+def test_export_without_a_bytes_limit_pipes_vsql(tmp_path, monkeypatch):
+    piped = []
+    monkeypatch.setenv("VSQL_HOST", "vertica")
+    monkeypatch.setattr(Execution, "vsql", lambda query, **kwargs: piped.append(kwargs["codec"]))
+    monkeypatch.setattr(Execution, "vsql_stream", lambda *args, **kwargs: pytest.fail("streamed"))
+    Execution.set_throttle(Throttle(host="vertica", schedule=[], mb_per_s=0, max_queries=4))
+    try:
+        VsqlExtractor(block_compression=False).extract("SELECT 1", str(tmp_path / "0.csv"))
+    finally:
+        Execution.set_throttle(None)
+
+    assert piped == [None]
+
+
+def test_throttles_are_keyed_by_host(monkeypatch):
+    first, second = Throttle(host="vertica-1", schedule=[]), Throttle(host="vertica-2", schedule=[])
+    Execution.set_throttle(first)
+    Execution.set_throttle(second)
+    try:
+        monkeypatch.setenv("VSQL_HOST", "vertica-2")
+        assert Execution.throttle_of() is second
+        assert Execution.throttle_of("vertica-1") is first
+        assert Execution.throttle_of("vertica-3") is None
+    finally:
+        Execution.set_throttle(None)
+    assert Execution.throttle_of("vertica-1") is None
+
+
+def test_throttled_export_is_streamed(tmp_path, monkeypatch):
+    consumed = []
+    throttle = Throttle(host="vertica", schedule=[], mb_per_s=10)
+    monkeypatch.setattr(throttle, "consume", lambda num_bytes, table=None: consumed.append(num_bytes))
+    monkeypatch.setenv("VSQL_HOST", "vertica")
+
+    def vsql_stream(query, write, field_delimiter=",", table=None):
+        for chunk in (b"ID\n", b"1\n", b"2\n"):
+            Execution.throttle_bytes(len(chunk), table)
+            write(chunk)
+
+    monkeypatch.setattr(Execution, "vsql_stream", vsql_stream)
+    monkeypatch.setattr(Execution, "vsql", lambda *args, **kwargs: pytest.fail("not streamed"))
+    Execution.set_throttle(throttle)
+    try:
+        output_path = tmp_path / "0.csv"
+        VsqlExtractor(block_compression=False).extract("SELECT ID FROM orders", str(output_path))
+    finally:
+        Execution.set_throttle(None)
+
+    # every chunk is throttled while it is read, not the file after the fact
+    assert consumed == [3, 2, 2]
+    assert output_path.read_bytes() == b"ID\n1\n2\n"
@@ -0,0 +1,143 @@
+import pytest
+
+from elysium_migration.configuration.constants import ConstantCatalog
+from elysium_migration.migration.execute import Execution
+from elysium_migration.migration.exporter import Exporter
+from elysium_migration.migration.importer import Importer
+from elysium_migration.migration.manifest import ExportManifest
+from elysium_migration.migration.watermark import WatermarkStore
+
+
+def _exporter(export_objects):
+    exporter = Exporter.__new__(Exporter)
+    exporter.export_objects = export_objects
+    return exporter
+
+
+def test_store_persists_between_instances(tmp_path):
+    path = tmp_path / "cache" / "watermarks.sqlite"
+    WatermarkStore(path).commit("Elysium.T0", "CLOCK_TIMESTAMP", "2021-06-15 00:00:00")
+
+    store = WatermarkStore(path)
+    assert store.get("Elysium.T0", "CLOCK_TIMESTAMP") == "2021-06-15 00:00:00"
+    # a mark of another column doesn't count
+    assert store.get("Elysium.T0", "Id") is None
+    assert store.get("Elysium.T1", "CLOCK_TIMESTAMP") is None
+
+    store.reset("Elysium.T0")
+    assert store.get("Elysium.T0", "CLOCK_TIMESTAMP") is None
+
+
+def test_watermark_column():
+    exporter = _exporter({"watermark_columns": ["Elysium.T1.UpdatedAt"]})
+
+    assert exporter.watermark_column("Elysium.T0", "Id") == "CLOCK_TIMESTAMP"
+    assert exporter.watermark_column("Compliance.T0", "Id") == "MartModifiedDate"
+    assert exporter.watermark_column("Elysium.Sweeper_Bookmark", "Id") == "Id"
+    assert exporter.watermark_column("Elysium.T1", "Id") == "UpdatedAt"
+
+
+def test_incremental_window(monkeypatch):
+    monkeypatch.setattr(
+        Execution, "vsql_get_max_col_val", lambda table, column: "2021-06-16 10:00:00"
+    )
+    exporter = _exporter({})
+
+    predicate, target = exporter.incremental_window(
+        "Elysium.T0", "Id", "2021-06-15 00:00:00"
+    )
+    assert (
+        predicate
+        == "CLOCK_TIMESTAMP >= '2021-06-15 00:00:00' AND CLOCK_TIMESTAMP <= '2021-06-16 10:00:00'"
+    )
+    assert target == {"column": "CLOCK_TIMESTAMP", "value": "2021-06-16 10:00:00"}
+
+    # an empty target is loaded whole
+    monkeypatch.setattr(Execution, "ybsql_get_max_col_val", lambda table, column: "")
+    predicate, target = exporter.incremental_window("Elysium.T0", "Id", None)
+    assert predicate == "CLOCK_TIMESTAMP <= '2021-06-16 10:00:00'"
+
+    # rows at the mark can still come in, they are exported again
+    predicate, target = exporter.incremental_window(
+        "Elysium.T0", "Id", "2021-06-16 10:00:00"
+    )
+    assert (
+        predicate
+        == "CLOCK_TIMESTAMP >= '2021-06-16 10:00:00' AND CLOCK_TIMESTAMP <= '2021-06-16 10:00:00'"
+    )
+    assert target["value"] == "2021-06-16 10:00:00"
+
+    monkeypatch.setattr(Execution, "vsql_get_max_col_val", lambda table, column: "")
+    predicate, target = exporter.incremental_window("Elysium.T0", "Id", None)
+    assert predicate == "1 = 0"
+    assert target["value"] is None
+
+
+def test_incremental_window_deletes_the_rows_at_the_mark(monkeypatch):
+    monkeypatch.setattr(
+        Execution, "vsql_get_max_col_val", lambda table, column: "2021-06-16 10:00:00"
+    )
+    deletes = []
+    monkeypatch.setattr(
+        Execution,
+        "ybsql_delete_date_range",
+        lambda table, predicate: deletes.append((table, predicate)),
+    )
+    monkeypatch.setattr(ConstantCatalog, "IDEMPOTENT_EXPORT", False)
+
+    _exporter({}).incremental_window("Elysium.T0", "Id", "2021-06-15 00:00:00")
+    assert deletes == [("Elysium.T0", " AND CLOCK_TIMESTAMP = '2021-06-15 00:00:00'")]
+
+
+def test_first_incremental_window_starts_at_the_max_of_the_target(monkeypatch):
+    monkeypatch.setattr(
+        Execution, "vsql_get_max_col_val", lambda table, column: "2021-06-16 10:00:00"
+    )
+    monkeypatch.setattr(
+        Execution, "ybsql_get_max_col_val", lambda table, column: "2021-06-15 00:00:00"
+    )
+    deletes = []
+    monkeypatch.setattr(
+        Execution,
+        "ybsql_delete_date_range",
+        lambda table, predicate: deletes.append((table, predicate)),
+    )
+
+    monkeypatch.setattr(ConstantCatalog, "IDEMPOTENT_EXPORT", False)
+    predicate, target = _exporter({}).incremental_window("Elysium.T0", "Id", None)
+    assert (
+        predicate
+        == "CLOCK_TIMESTAMP >= '2021-06-15 00:00:00' AND CLOCK_TIMESTAMP <= '2021-06-16 10:00:00'"
+    )
+    assert target["value"] == "2021-06-16 10:00:00"
+    # only the rows at the seeded mark are replaced, not the whole table
+    assert deletes == [("Elysium.T0", " AND CLOCK_TIMESTAMP = '2021-06-15 00:00:00'")]
+
+
+def test_incremental_window_needs_a_watermark_column():
+    # a NO_DATE_TABLES table without a partitioning column
+    with pytest.raises(ValueError, match="no watermark column"):
+        _exporter({}).incremental_window("Elysium.Sweeper_Bookmark", None, None)
+
+
+def test_import_commits_the_marks_of_the_manifest(tmp_path):
+    run = {"tables": ["Elysium.T0", "Elysium.T1"], "watermarks": {"Elysium.T0": None, "Elysium.T1": "5"}}
+    manifest = ExportManifest(tmp_path, dict(run))
+    manifest.run["watermark_targets"] = {
+        "Elysium.T0": {"column": "CLOCK_TIMESTAMP", "value": "2021-06-16 10:00:00"},
+        "Elysium.T1": {"column": "Id", "value": None},
+    }
+    manifest.add_tasks([])
+    assert manifest.matches(run)
+
+    importer = Importer(
+        {"tables": ["Elysium.T0", "Elysium.T1"]}, tmp_path, tmp_path, tmp_path / "validation"
+    )
+    store = WatermarkStore(tmp_path / "watermarks.sqlite")
+    store.commit("Elysium.T1", "Id", "5")
+
+    assert importer.is_incremental()
+    importer.commit_watermarks(store)
+
+    assert store.get("Elysium.T0", "CLOCK_TIMESTAMP") == "2021-06-16 10:00:00"
+    assert store.get("Elysium.T1", "Id") == "5"